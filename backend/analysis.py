@@ -1,9 +1,61 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import pandas as pd
-from risk import calculate_volatility, calculate_drawdown, calculate_sharpe_ratio
-from forecast import arima_forecast, lstm_forecast_placeholder, prophet_forecast, xgboost_forecast
+from risk import calculate_volatility, calculate_drawdown, calculate_sharpe_ratio, batch_risk_metrics, pad_series, rolling_risk_metrics, monte_carlo_risk, SIMULATION_MODELS, MAX_SIMULATED_STEPS
+from forecast import arima_forecast, lstm_forecast_placeholder, prophet_forecast, xgboost_forecast, xgboost_forecast_many
+from arima import incremental_arima_forecast, auto_arima_order, search_arima_order, candidate_orders
+from backtest import run_backtest, forecast_origins, validate_settings, METHODS, MAX_BACKTEST_FITS
 from sentiment import batch_sentiment_analysis
-from utils import log_event, validate_prices
+from price_store import load_prices
+from portfolio import ShrunkCovariance, efficient_frontier, align_returns, MAX_FRONTIER_POINTS
+from covariance import EWMA_STATES, EWMA_DECAY, DTYPES, TOP_K, correlation_rows, top_peers
+from series import PriceSeries, as_float_array
+from utils import log_event
+
+def _resolve_prices(data):
+    """
+    Ingest the price series for a request.
+    Args:
+        data (dict): Data with 'prices', or a 'ticker' in the local price store with
+            optional 'start', 'end' and 'interval'.
+    Returns:
+        PriceSeries: Validated prices; stored prices stay a zero-copy memory-mapped array.
+    Raises:
+        ValueError: If the prices are missing or invalid.
+    """
+    prices = data.get('prices')
+    if prices is None and data.get('ticker'):
+        prices = load_prices(data['ticker'], data.get('start'), data.get('end'), data.get('interval', '1d'))
+    return PriceSeries.ingest([] if prices is None else prices)
+
+def _resolve_series(data):
+    """
+    Ingest several named price series for a request.
+    Args:
+        data (dict): Data with 'series' ({name: prices}), or 'tickers' in the local price
+            store with optional 'start', 'end' and 'interval'.
+    Returns:
+        dict: Series name -> PriceSeries.
+    Raises:
+        ValueError: If there are no series or any of them is invalid (named in the message).
+    """
+    raw = data.get('series')
+    if raw is None:
+        raw = {}
+        for ticker in data.get('tickers', []):
+            raw[ticker] = load_prices(ticker, data.get('start'), data.get('end'), data.get('interval', '1d'))
+    if not isinstance(raw, dict) or not raw:
+        raise ValueError('No price series given')
+    series = {}
+    for name, prices in raw.items():
+        try:
+            series[name] = PriceSeries.ingest(prices)
+        except ValueError as e:
+            raise ValueError(f'{name}: {e}') from None
+    return series
 
 def analyze_financials(data):
     """
@@ -27,29 +79,117 @@ def analyze_financials(data):
     log_event('Financial analysis performed', {'ratios': ratios, 'trend': trend})
     return {'financial_ratios': ratios, 'trend': trend, 'explanation': explanation}
 
-def forecast_prices(data, method='arima', steps=5):
+def forecast_prices(data, method='arima', steps=5, window=5, order=(1,1,1), strategy='recursive'):
     """
     Forecast future prices using ARIMA or LSTM placeholder.
     Args:
-        data (dict): Data with 'prices'.
-        method (str): 'arima' or 'lstm'.
+        data (dict): Data with 'prices' (or a stored 'ticker'), and an optional
+            'series_id' identifying the series for 'arima_incremental'.
+        method (str): 'arima', 'arima_incremental', 'prophet', 'xgboost' or 'lstm'.
         steps (int): Forecast horizon.
+        window (int): Feature window size for 'xgboost'.
+        order (tuple or str): (p, d, q) order for the ARIMA methods, or 'auto' to use
+            the order with the lowest AIC (searched once per series).
+        strategy (str): 'recursive' or 'direct' multi-horizon for 'xgboost'.
     Returns:
-        dict: Forecasted prices.
+        dict: Forecasted prices ('order' and the incremental 'state' for ARIMA modes).
     """
-    prices = data.get('prices', [])
-    if not validate_prices(prices):
-        return {'error': 'Invalid price data'}
+    try:
+        prices = _resolve_prices(data).values
+    except ValueError as e:
+        return {'error': f'Invalid price data: {e}'}
+    result = {}
+    if method.startswith('arima') and order == 'auto':
+        order = auto_arima_order(prices)
+        result['order'] = list(order)
     if method == 'lstm':
         forecast = lstm_forecast_placeholder(prices, steps)
     elif method == 'prophet':
         forecast = prophet_forecast(prices, steps)
     elif method == 'xgboost':
-        forecast = xgboost_forecast(prices, steps)
+        forecast = xgboost_forecast(prices, steps, window, strategy)
+    elif method == 'arima_incremental':
+        incremental = incremental_arima_forecast(prices, steps, order, series_id=data.get('series_id') or data.get('ticker'))
+        forecast, result['state'] = incremental['forecast'], incremental['state']
     else:
-        forecast = arima_forecast(prices, steps)
+        forecast = arima_forecast(prices, steps, order)
     log_event('Forecast performed', {'method': method, 'forecast': forecast})
-    return {'forecast': forecast}
+    return {'forecast': forecast, **result}
+
+def arima_order_search(data, max_p=2, max_d=1, max_q=2):
+    """
+    Search ARIMA orders for a series in parallel processes.
+    Args:
+        data (dict): Data with 'prices' (or a stored 'ticker').
+        max_p, max_d, max_q (int): Largest orders tried.
+    Returns:
+        dict: Best order by AIC and the AIC and fit time of every candidate.
+    """
+    try:
+        prices = _resolve_prices(data).values
+    except ValueError as e:
+        return {'error': f'Invalid price data: {e}'}
+    result = search_arima_order(prices, candidate_orders(max_p, max_d, max_q))
+    log_event('ARIMA order search performed', {'best_order': result['best_order'], 'candidates': len(result['candidates'])})
+    return result
+
+def forecast_prices_bulk(data, steps=5, window=5):
+    """
+    Forecast many series with one global XGBoost model.
+    Args:
+        data (dict): Data with 'series' ({name: prices}), or 'tickers' in the local
+            price store with optional 'start', 'end' and 'interval'.
+        steps (int): Forecast horizon.
+        window (int): Feature window size.
+    Returns:
+        dict: Forecasted prices per series name.
+    """
+    try:
+        series = _resolve_series(data)
+    except ValueError as e:
+        return {'error': f'Invalid price data: {e}'}
+    forecasts = xgboost_forecast_many([s.values for s in series.values()], steps, window)
+    log_event('Bulk forecast performed', {'series': len(series), 'steps': steps})
+    return {'forecasts': dict(zip(series, forecasts))}
+
+def backtest_forecasts(data, methods=METHODS, horizon=5, mode='expanding', initial=None, step=None, window=5,
+                       order=(1,1,1)):
+    """
+    Walk-forward backtest of forecast methods over one or many series.
+    Args:
+        data (dict): Data with 'prices', 'series' ({name: prices}) or stored 'ticker'/'tickers'.
+        methods (list): Methods to compare.
+        horizon (int): Steps forecast from each origin.
+        mode (str): 'expanding' or 'rolling' training window.
+        initial (int, optional): Size of the first training window.
+        step (int, optional): Distance between origins.
+        window (int): Feature window size for 'xgboost'.
+        order (tuple): (p, d, q) order for 'arima'.
+    Returns:
+        dict: Per-series, per-method error and latency metrics and the best method per series.
+    """
+    try:
+        if 'series' in data or 'tickers' in data:
+            series = _resolve_series(data)
+        else:
+            series = {data.get('ticker', 'series'): _resolve_prices(data)}
+    except ValueError as e:
+        return {'error': f'Invalid price data: {e}'}
+    try:
+        validate_settings(methods, horizon, mode, initial, step)
+    except ValueError as e:
+        return {'error': str(e)}
+    origins = {name: len(forecast_origins(len(prices), horizon, initial, step)) for name, prices in series.items()}
+    too_short = [name for name, count in origins.items() if not count]
+    if too_short:
+        return {'error': f"Series too short to backtest: {', '.join(too_short)}"}
+    if len(set(methods)) * sum(origins.values()) > MAX_BACKTEST_FITS:
+        return {'error': f'Series x methods x origins must be <= {MAX_BACKTEST_FITS}; '
+                         'use fewer series or methods, or a larger step'}
+    result = run_backtest({name: s.values for name, s in series.items()}, methods, horizon, initial, step, mode,
+                          window, order)
+    log_event('Backtest performed', {'series': len(series), 'methods': list(methods), 'best': result['best']})
+    return result
 
 def analyze_sentiment(data):
     """
@@ -69,30 +209,332 @@ def risk_metrics(data):
     """
     Calculate risk metrics for price series.
     Args:
-        data (dict): Data with 'prices'.
+        data (dict): Data with 'prices' (or a stored 'ticker').
     Returns:
         dict: Risk metrics.
     """
-    prices = data.get('prices', [])
-    if not validate_prices(prices):
-        return {'error': 'Invalid price data'}
-    volatility = calculate_volatility(prices)
-    drawdown = calculate_drawdown(prices)
-    sharpe = calculate_sharpe_ratio(prices)
+    try:
+        series = _resolve_prices(data)
+    except ValueError as e:
+        return {'error': f'Invalid price data: {e}'}
+    # The three metrics share the series' cached returns and running max
+    volatility = calculate_volatility(series)
+    drawdown = calculate_drawdown(series)
+    sharpe = calculate_sharpe_ratio(series)
     log_event('Risk metrics calculated', {'volatility': volatility, 'drawdown': drawdown, 'sharpe': sharpe})
     return {'volatility': volatility, 'max_drawdown': drawdown, 'sharpe_ratio': sharpe}
 
+def risk_metrics_batch(data):
+    """
+    Calculate risk metrics for many price series in one vectorized pass.
+    Args:
+        data (dict): Data with 'prices' (list of price lists or arrays, one per asset;
+            lengths may differ and missing values may be null or NaN) and optional 'assets' names.
+    Returns:
+        dict: Asset names and per-asset lists of metrics (None where not computable).
+    """
+    series = data.get('prices', [])
+    if not isinstance(series, list) or not all(isinstance(s, (list, np.ndarray)) for s in series):
+        return {'error': 'Invalid price data'}
+    try:
+        matrix = pad_series(series)
+    except (TypeError, ValueError):
+        return {'error': 'Invalid price data'}
+    assets = data.get('assets') or [f'asset_{i}' for i in range(len(series))]
+    if len(assets) != len(series):
+        return {'error': 'Number of assets does not match number of price series'}
+    metrics = batch_risk_metrics(matrix)
+    result = {'assets': assets}
+    for name in ('volatility', 'max_drawdown', 'sharpe_ratio'):
+        result[name] = [None if np.isnan(v) else float(v) for v in metrics[name]]
+    log_event('Batch risk metrics calculated', {'assets': len(assets)})
+    return result
+
+def rolling_risk(data, window=20):
+    """
+    Calculate rolling risk metrics over a full price history.
+    Args:
+        data (dict): Data with 'prices' (or a stored 'ticker').
+        window (int): Number of returns per window.
+    Returns:
+        dict: Rolling volatility, Sharpe ratio and drawdown lists aligned to price
+        indices window..len(prices)-1 (None where not computable).
+    """
+    try:
+        series = _resolve_prices(data)
+    except ValueError as e:
+        return {'error': f'Invalid price data: {e}'}
+    if window < 1:
+        return {'error': 'Window must be positive'}
+    metrics = rolling_risk_metrics(series, window)
+    result = {'window': window}
+    for name, values in metrics.items():
+        result[name] = [None if np.isnan(v) else float(v) for v in values]
+    log_event('Rolling risk metrics calculated', {'window': window, 'points': len(result['volatility'])})
+    return result
+
+def simulate_risk(data, paths=10000, horizon=10, model='gbm', seed=None, confidence=(0.95, 0.99),
+                  drawdown_threshold=0.1):
+    """
+    Monte Carlo VaR, CVaR and drawdown breach probability of one asset or a portfolio.
+    Args:
+        data (dict): Data with 'returns' or 'price_history' ({asset: [values]}) and
+            optional 'weights' ({asset: weight}, default equal) for a portfolio, or
+            'prices' (or a stored 'ticker') for a single asset.
+        paths (int): Number of simulated paths (paths * horizon * assets is capped at
+            MAX_SIMULATED_STEPS).
+        horizon (int): Steps per path.
+        model (str): 'gbm' (correlated geometric Brownian motion) or 'bootstrap'
+            (resampled historical days).
+        seed (int, optional): Seed for reproducible results.
+        confidence (tuple): VaR/CVaR confidence levels.
+        drawdown_threshold (float): Drawdown whose breach probability is reported.
+    Returns:
+        dict: Losses as fractions of the initial value (see monte_carlo_risk), plus
+        'assets' and 'weights' for a portfolio.
+    """
+    if model not in SIMULATION_MODELS:
+        return {'error': f"Unknown model: {model} (expected one of {', '.join(SIMULATION_MODELS)})"}
+    if paths < 1 or horizon < 1:
+        return {'error': 'Paths and horizon must be positive'}
+    if not all(0 < level < 1 for level in confidence):
+        return {'error': 'Confidence levels must be between 0 and 1'}
+    try:
+        assets, matrix = _return_matrix(data)
+    except ValueError as e:
+        return {'error': str(e)}
+    if assets is None:
+        try:
+            series = _resolve_prices(data)
+        except ValueError as e:
+            return {'error': f'Invalid price data: {e}'}
+        if len(series) < 3:
+            return {'error': 'At least 3 prices are required'}
+        matrix = series.returns
+    n_assets = 1 if matrix.ndim == 1 else matrix.shape[1]
+    if paths * horizon * n_assets > MAX_SIMULATED_STEPS:
+        return {'error': f'paths * horizon * assets must be <= {MAX_SIMULATED_STEPS}'}
+    weights = None
+    if assets is not None:
+        given = data.get('weights') or {}
+        weights = np.array([float(given.get(asset, 0.0)) for asset in assets]) if given else np.ones(len(assets))
+        if weights.sum() <= 0:
+            return {'error': 'Weights must sum to a positive value'}
+        weights = weights / weights.sum()
+    result = monte_carlo_risk(matrix, paths, horizon, weights=weights, model=model, seed=seed,
+                              confidence=confidence, drawdown_threshold=drawdown_threshold)
+    if assets is not None:
+        result.update(assets=assets, weights=weights.tolist())
+    log_event('Monte Carlo risk simulated', {'model': model, 'paths': paths, 'horizon': horizon, 'var': result['var']})
+    return result
+
+def _return_matrix(data):
+    """
+    Build a T x N return matrix from per-asset 'returns' or 'price_history' in data.
+    Args:
+        data (dict): Data with 'returns' or 'price_history' ({asset: [values]}).
+    Returns:
+        tuple: (assets, matrix) or (None, None) when neither key holds usable histories.
+    """
+    kind = 'returns' if data.get('returns') else 'prices'
+    histories = data.get('returns') or data.get('price_history')
+    if not isinstance(histories, dict) or not histories:
+        return None, None
+    try:
+        arrays = [as_float_array(h, min_length=1, positive=kind == 'prices') for h in histories.values()]
+    except ValueError as e:
+        raise ValueError(f'Invalid price data: {e}') from None
+    matrix = align_returns(arrays, kind)
+    if matrix.shape[0] < 2:
+        raise ValueError('Not enough history to estimate covariance')
+    return list(histories), matrix
+
 def optimize_portfolio(data, risk_aversion=0.5):
     """
     Optimize portfolio weights with a risk aversion parameter.
+    With per-asset 'returns' or 'price_history' this solves long-only mean-variance on a
+    Ledoit-Wolf shrunk covariance; otherwise weights are drawn at random.
     Args:
-        data (dict): Data with 'assets'.
-        risk_aversion (float): Risk aversion parameter (0-1).
+        data (dict): Data with 'assets', and optionally 'returns' or 'price_history'
+            ({asset: [values]}, aligned on their most recent common length).
+        risk_aversion (float): Risk aversion parameter (0-1 for random weights; the
+            mean-variance coefficient on annualized returns otherwise).
     Returns:
         dict: Portfolio weights.
     """
+    try:
+        assets, matrix = _return_matrix(data)
+    except ValueError as e:
+        return {'error': str(e)}
+    if assets is not None:
+        cov = ShrunkCovariance(matrix)
+        result = efficient_frontier(cov, [risk_aversion])
+        weights = dict(zip(assets, result['weights'][0].tolist()))
+        log_event('Portfolio optimized', {'assets': len(assets), 'risk_aversion': risk_aversion, 'shrinkage': cov.shrinkage})
+        return {
+            'weights': weights,
+            'risk_aversion': risk_aversion,
+            'expected_return': float(result['expected_return'][0]),
+            'volatility': float(result['volatility'][0]),
+            'shrinkage': cov.shrinkage
+        }
     assets = data.get('assets', ['AAPL', 'GOOG', 'TSLA'])
     n = len(assets)
     weights = np.random.dirichlet(np.ones(n) * (1 - risk_aversion + 0.1), size=1)[0]
     log_event('Portfolio optimized', {'weights': dict(zip(assets, weights)), 'risk_aversion': risk_aversion})
-    return {'weights': dict(zip(assets, weights)), 'risk_aversion': risk_aversion} 
\ No newline at end of file
+    return {'weights': dict(zip(assets, weights)), 'risk_aversion': risk_aversion}
+
+def portfolio_frontier(data, points=20, min_risk_aversion=0.1, max_risk_aversion=1000.0):
+    """
+    Compute the long-only efficient frontier over a log-spaced risk aversion grid.
+    Args:
+        data (dict): Data with 'returns' or 'price_history' ({asset: [values]}).
+        points (int): Number of frontier points (1 to MAX_FRONTIER_POINTS).
+        min_risk_aversion (float): Smallest risk aversion in the grid (positive).
+        max_risk_aversion (float): Largest risk aversion in the grid (at least the smallest).
+    Returns:
+        dict: Assets, shrinkage and one entry per risk aversion with weights, expected
+        return and volatility.
+    """
+    if not 1 <= points <= MAX_FRONTIER_POINTS:
+        return {'error': f'Points must be between 1 and {MAX_FRONTIER_POINTS}'}
+    if not 0 < min_risk_aversion <= max_risk_aversion:
+        return {'error': 'Risk aversions must satisfy 0 < min_risk_aversion <= max_risk_aversion'}
+    try:
+        assets, matrix = _return_matrix(data)
+    except ValueError as e:
+        return {'error': str(e)}
+    if assets is None:
+        return {'error': 'Frontier needs per-asset returns or price_history'}
+    grid = np.logspace(np.log10(min_risk_aversion), np.log10(max_risk_aversion), points)
+    cov = ShrunkCovariance(matrix)
+    result = efficient_frontier(cov, grid)
+    frontier = [
+        {'risk_aversion': float(lam), 'expected_return': float(ret), 'volatility': float(vol), 'weights': w.tolist()}
+        for lam, ret, vol, w in zip(grid, result['expected_return'], result['volatility'], result['weights'])
+    ]
+    log_event('Efficient frontier computed', {'assets': len(assets), 'points': points})
+    return {'assets': assets, 'shrinkage': cov.shrinkage, 'frontier': frontier}
+
+def correlation_peers(data, tickers=None, k=TOP_K, method='sample', decay=EWMA_DECAY, dtype='float64'):
+    """
+    Find the most correlated peers of tickers across a (possibly large) asset universe.
+    Sample correlations are computed only for the query rows; EWMA correlations come from
+    a covariance kept between calls and updated in place as the histories grow.
+    Args:
+        data (dict): Data with 'returns' or 'price_history' ({asset: [values]}).
+        tickers (list, optional): Query assets (default every asset).
+        k (int): Peers per ticker.
+        method (str): 'sample' or 'ewma'.
+        decay (float): EWMA decay factor per observation.
+        dtype (str): 'float64' or 'float32' (halves memory on large universes).
+    Returns:
+        dict: 'peers' ({ticker: [{'asset', 'correlation'}, ...]}, highest first), plus
+        method, observations and, for EWMA, the state 'action'.
+    """
+    if method not in ('sample', 'ewma'):
+        return {'error': f'Unknown method: {method}'}
+    if dtype not in DTYPES:
+        return {'error': f"Unknown dtype: {dtype} (expected one of {', '.join(DTYPES)})"}
+    if not 0 < decay < 1:
+        return {'error': 'Decay must be between 0 and 1'}
+    try:
+        assets, matrix = _return_matrix(data)
+    except ValueError as e:
+        return {'error': str(e)}
+    if assets is None:
+        return {'error': 'Peers need per-asset returns or price_history'}
+    position = {asset: i for i, asset in enumerate(assets)}
+    tickers = list(tickers) if tickers else assets
+    unknown = [t for t in tickers if t not in position]
+    if unknown:
+        return {'error': f"Unknown tickers: {', '.join(map(str, unknown))}"}
+    columns = [position[t] for t in tickers]
+    result = {'method': method, 'observations': len(matrix)}
+    if method == 'ewma':
+        _, result['action'], rows = EWMA_STATES.update(assets, matrix, decay, DTYPES[dtype], columns=columns)
+    else:
+        rows = correlation_rows(matrix, columns, DTYPES[dtype])
+    indices, values = top_peers(rows, columns, k)
+    result['peers'] = {
+        ticker: [{'asset': assets[j], 'correlation': float(v)} for j, v in zip(idx, vals)]
+        for ticker, idx, vals in zip(tickers, indices.tolist(), values.tolist())
+    }
+    log_event('Correlation peers computed', {'assets': len(assets), 'tickers': len(tickers), 'method': method})
+    return result
+
+REPORT_SECTIONS = ('analysis', 'forecast', 'sentiment', 'risk', 'optimize')
+REPORT_WORKERS = len(REPORT_SECTIONS)  # Threads running report sections concurrently
+_report_pool = None
+_report_pool_lock = threading.Lock()
+
+def _report_executor():
+    global _report_pool
+    with _report_pool_lock:
+        if _report_pool is None:
+            _report_pool = ThreadPoolExecutor(REPORT_WORKERS, thread_name_prefix='report')
+        return _report_pool
+
+def _reset_report_pool():
+    # A forked job worker inherits the pool object but not its threads
+    global _report_pool, _report_pool_lock
+    _report_pool, _report_pool_lock = None, threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_report_pool)
+
+def _timed_section(fn, *args, **kwargs):
+    start = time.perf_counter()
+    try:
+        result = fn(*args, **kwargs)
+    except Exception as e:
+        result = {'error': str(e)}
+    return result, time.perf_counter() - start
+
+def build_report(data, sections=REPORT_SECTIONS, method='arima', steps=5, window=5, order=(1,1,1),
+                 strategy='recursive', risk_aversion=0.5):
+    """
+    Run several analyses on one payload, ingesting the prices once and running the
+    sections concurrently. The forecast and risk sections share one PriceSeries (and its
+    cached returns); model fits, NumPy and the sentiment regex release the GIL for most
+    of their work, so a thread pool overlaps them.
+    Args:
+        data (dict): Payload accepted by the individual analyses.
+        sections (list): Subset of REPORT_SECTIONS to compute.
+        method, steps, window, order, strategy: Forecast options (see forecast_prices).
+        risk_aversion (float): Portfolio risk aversion (see optimize_portfolio).
+    Returns:
+        dict: Each section's usual response under its name, plus 'timings' (seconds per
+        section and 'total').
+    """
+    start = time.perf_counter()
+    sections = list(dict.fromkeys(sections))
+    unknown = [name for name in sections if name not in REPORT_SECTIONS]
+    if unknown:
+        return {'error': f"Unknown report section: {', '.join(unknown)}"}
+    shared, report, timings = dict(data), {}, {}
+    if 'forecast' in sections or 'risk' in sections:
+        try:
+            shared['prices'] = _resolve_prices(data)
+        except ValueError as e:
+            for name in ('forecast', 'risk'):
+                if name in sections:
+                    sections.remove(name)
+                    report[name], timings[name] = {'error': f'Invalid price data: {e}'}, 0.0
+    calls = {
+        'analysis': (analyze_financials, {}),
+        'forecast': (forecast_prices, {'method': method, 'steps': steps, 'window': window, 'order': order,
+                                       'strategy': strategy}),
+        'sentiment': (analyze_sentiment, {}),
+        'risk': (risk_metrics, {}),
+        'optimize': (optimize_portfolio, {'risk_aversion': risk_aversion}),
+    }
+    pool = _report_executor()
+    futures = {name: pool.submit(_timed_section, calls[name][0], shared, **calls[name][1])
+               for name in sections}
+    for name, future in futures.items():
+        report[name], timings[name] = future.result()
+    timings['total'] = time.perf_counter() - start
+    report['timings'] = timings
+    log_event('Report built', {'sections': sections, 'timings': timings})
+    return report
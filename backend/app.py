@@ -1,18 +1,133 @@
-from flask import Flask, request, jsonify
-from analysis import analyze_financials, forecast_prices, analyze_sentiment, optimize_portfolio, risk_metrics
+import os
+import time
+_START = time.perf_counter()
+from flask import Flask, Response, g, request, jsonify, url_for
+from flask.json.provider import DefaultJSONProvider
+from analysis import analyze_financials, forecast_prices, forecast_prices_bulk, backtest_forecasts, analyze_sentiment, optimize_portfolio, risk_metrics, risk_metrics_batch, rolling_risk, simulate_risk, portfolio_frontier, correlation_peers, arima_order_search, build_report, REPORT_SECTIONS
 from data_gen import generate_synthetic_data
-from utils import setup_logging
-from data_sources import fetch_stock_data, fetch_news
-from llm import summarize_text
+from utils import setup_logging, parse_sample_rates
+from data_sources import fetch_stock_data, fetch_stock_data_bulk, fetch_news
+from llm import summarize_text, summarize_batch
 from explain import explain_xgboost_forecast
+from lazy import warm_up, import_report
+from forecast import MODEL_CACHE
+from jobs import JobQueue, QueueFull
+from price_store import validate_symbol
+from backtest import validate_settings as validate_backtest
+from arima import MAX_P, MAX_D, MAX_Q
+from streaming import StreamHub, ReplaySource, HEARTBEAT_SECONDS
+from metrics import REGISTRY, stage
+from payloads import JSON, MEDIA_TYPES, HAS_ORJSON, PayloadError, UnsupportedMediaType, decode_payload, encode_payload, json_dumps, json_loads
+
+# Comma-separated heavy modules to import at startup instead of on first use,
+# e.g. PRELOAD_MODULES=prophet,xgboost
+PRELOAD_MODULES = os.environ.get('PRELOAD_MODULES', '')
+# Log file and per-event sampling, e.g. LOG_SAMPLE_RATES='Forecast performed=0.1,Risk metrics calculated=0.5'
+LOG_FILE = os.environ.get('LOG_FILE', 'backend.log')
+LOG_SAMPLE_RATES = os.environ.get('LOG_SAMPLE_RATES', '')
+MAX_GENERATED_PRICES = 2000000  # Largest n_prices * n_assets served by /generate-data
+MAX_GENERATED_NEWS = 100000  # Largest n_news served by /generate-data
+MAX_GENERATED_ASSETS = 1000  # Largest n_assets served by /generate-data (dense N x N covariance and Cholesky)
+MAX_SUMMARY_TEXTS = 500  # Texts accepted by one /summarize/batch request
+MAX_REPLAY_ASSETS = 500  # Tickers simulated by one /stream/replay source
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider that uses orjson when installed (NumPy values included) and records
+    request parsing and response serialization time.
+    """
+
+    def dumps(self, obj, **kwargs):
+        with stage('serialize'):
+            if HAS_ORJSON and set(kwargs) <= {'indent', 'separators'}:
+                return json_dumps(obj, indent=kwargs.get('indent'), sort_keys=self.sort_keys, default=self.default)
+            return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        with stage('parse'):
+            return json_loads(s) if not kwargs else super().loads(s, **kwargs)
 
 app = Flask(__name__)
-setup_logging()
+app.json = TimedJSONProvider(app)
+setup_logging(LOG_FILE, sample_rates=parse_sample_rates(LOG_SAMPLE_RATES))
+JOBS = JobQueue()
+STREAM = StreamHub()
+REPLAY = {'source': None}
+STARTUP_SECONDS = time.perf_counter() - _START
+if PRELOAD_MODULES:
+    warm_up(PRELOAD_MODULES.split(','))
+
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    # Label by route template (not the concrete path) to keep label cardinality bounded
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    elapsed = time.perf_counter() - g.get('request_start', time.perf_counter())
+    REGISTRY.observe('http_request_duration_seconds', elapsed, route=route, method=request.method)
+    REGISTRY.inc('http_requests_total', route=route, method=request.method, status=response.status_code)
+    if response.status_code >= 400:
+        REGISTRY.inc('http_request_errors_total', route=route, method=request.method)
+    return response
+
+@app.errorhandler(PayloadError)
+def payload_error(e):
+    return jsonify({'error': str(e)}), e.status
+
+def parse_order(value):
+    """ARIMA order from a query string: 'p,d,q' or 'auto'."""
+    return 'auto' if value == 'auto' else tuple(int(x) for x in value.split(','))
+
+def read_payload():
+    """
+    Decode the request body by its Content-Type (JSON, MessagePack, Arrow IPC or .npy).
+    Stored-price references ('ticker', or 'tickers' without inline series) are validated
+    here, so an invalid symbol or interval is a 400 before any file name is built.
+    """
+    data = decode_payload(request.get_data(), request.content_type)
+    if isinstance(data, dict):
+        interval = data.get('interval', '1d')
+        symbols = []
+        if data.get('prices') is None and data.get('ticker'):
+            symbols.append(data['ticker'])
+        if not any(k in data for k in ('series', 'returns', 'price_history')) and isinstance(data.get('tickers'), list):
+            symbols.extend(data['tickers'])
+        try:
+            for symbol in symbols:
+                validate_symbol(symbol, interval)
+        except ValueError as e:
+            raise PayloadError(str(e)) from None
+    return data
+
+def respond(result):
+    """
+    Return result in the best media type the client accepts (JSON by default), or 406
+    if the requested binary type cannot represent it. Errors are always sent as JSON.
+    """
+    mimetype = request.accept_mimetypes.best_match(MEDIA_TYPES, default=JSON)
+    if mimetype == JSON or (isinstance(result, dict) and 'error' in result):
+        return jsonify(result)
+    try:
+        body = encode_payload(result, mimetype)
+    except UnsupportedMediaType as e:
+        return jsonify({'error': str(e)}), 406
+    return Response(body, mimetype=mimetype)
 
 @app.route('/generate-data', methods=['GET'])
 def generate_data():
     """Generate synthetic financial data."""
-    data = generate_synthetic_data()
+    n_prices = request.args.get('n_prices', 30, type=int)
+    n_news = request.args.get('n_news', 5, type=int)
+    n_assets = request.args.get('n_assets', 3, type=int)
+    seed = request.args.get('seed', type=int)
+    if min(n_prices, n_news, n_assets) < 0 or n_prices * n_assets > MAX_GENERATED_PRICES or \
+            n_news > MAX_GENERATED_NEWS or n_assets > MAX_GENERATED_ASSETS:
+        return jsonify({'error': f'Sizes must be non-negative with n_prices * n_assets <= {MAX_GENERATED_PRICES}, '
+                                 f'n_assets <= {MAX_GENERATED_ASSETS} and n_news <= {MAX_GENERATED_NEWS}'}), 400
+    data = generate_synthetic_data(n_prices, n_news, n_assets, seed)
     return jsonify(data)
 
 @app.route('/stock', methods=['GET'])
@@ -21,8 +136,26 @@ def get_stock():
     ticker = request.args.get('ticker', 'AAPL')
     period = request.args.get('period', '1y')
     interval = request.args.get('interval', '1d')
+    try:
+        validate_symbol(ticker, interval)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     data = fetch_stock_data(ticker, period, interval)
-    return jsonify(data)
+    return respond(data)
+
+@app.route('/stock/bulk', methods=['GET'])
+def get_stock_bulk():
+    """Fetch stock data for several comma-separated tickers concurrently."""
+    tickers = [t.strip() for t in request.args.get('tickers', 'AAPL').split(',') if t.strip()]
+    period = request.args.get('period', '1y')
+    interval = request.args.get('interval', '1d')
+    try:
+        for ticker in tickers:
+            validate_symbol(ticker, interval)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    data = fetch_stock_data_bulk(tickers, period, interval)
+    return respond(data)
 
 @app.route('/news', methods=['GET'])
 def get_news():
@@ -53,11 +186,60 @@ def analyze():
 @app.route('/forecast', methods=['POST'])
 def forecast():
     """Forecast future prices using selected method."""
-    data = request.json
+    data = read_payload()
     method = request.args.get('method', 'arima')
     steps = int(request.args.get('steps', 5))
-    result = forecast_prices(data, method=method, steps=steps)
-    return jsonify(result)
+    window = int(request.args.get('window', 5))
+    order = parse_order(request.args.get('order', '1,1,1'))
+    strategy = request.args.get('strategy', 'recursive')
+    if request.args.get('async'):
+        return submit_job(f'forecast:{method}', forecast_prices, data, method=method, steps=steps, window=window,
+                          order=order, strategy=strategy)
+    result = forecast_prices(data, method=method, steps=steps, window=window, order=order, strategy=strategy)
+    return respond(result)
+
+@app.route('/forecast/arima-order', methods=['POST'])
+def forecast_arima_order():
+    """Search (p, d, q) orders in parallel and return the best by AIC with per-candidate timings."""
+    data = read_payload()
+    limits = {'max_p': MAX_P, 'max_d': MAX_D, 'max_q': MAX_Q}
+    bounds = {name: request.args.get(name, limit, type=int) for name, limit in limits.items()}
+    if any(not 0 <= bounds[name] <= limit for name, limit in limits.items()):
+        return jsonify({'error': f'Orders must be within 0..{MAX_P} (p), 0..{MAX_D} (d) and 0..{MAX_Q} (q)'}), 400
+    if request.args.get('async'):
+        return submit_job('arima:order', arima_order_search, data, **bounds)
+    return respond(arima_order_search(data, **bounds))
+
+@app.route('/forecast/bulk', methods=['POST'])
+def forecast_bulk():
+    """Forecast many series with one global XGBoost model."""
+    data = read_payload()
+    steps = int(request.args.get('steps', 5))
+    window = int(request.args.get('window', 5))
+    if request.args.get('async'):
+        return submit_job('forecast:bulk', forecast_prices_bulk, data, steps, window)
+    result = forecast_prices_bulk(data, steps=steps, window=window)
+    return respond(result)
+
+@app.route('/backtest', methods=['POST'])
+def backtest():
+    """Walk-forward backtest forecast methods and report accuracy and latency."""
+    data = read_payload()
+    methods = request.args.get('methods', 'arima,prophet,xgboost,lstm').split(',')
+    horizon = request.args.get('horizon', 5, type=int)
+    mode = request.args.get('mode', 'expanding')
+    initial = request.args.get('initial', type=int)
+    step = request.args.get('step', type=int)
+    try:
+        validate_backtest(methods, horizon, mode, initial, step)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if request.args.get('async'):
+        return submit_job('backtest', backtest_forecasts, data, methods, horizon, mode, initial, step)
+    result = backtest_forecasts(data, methods=methods, horizon=horizon, mode=mode, initial=initial, step=step)
+    if 'error' in result:
+        return jsonify(result), 400
+    return respond(result)
 
 @app.route('/sentiment', methods=['POST'])
 def sentiment():
@@ -69,9 +251,41 @@ def sentiment():
 @app.route('/risk', methods=['POST'])
 def risk():
     """Calculate risk metrics for price series."""
-    data = request.json
+    data = read_payload()
     result = risk_metrics(data)
-    return jsonify(result)
+    return respond(result)
+
+@app.route('/risk/batch', methods=['POST'])
+def risk_batch():
+    """Calculate risk metrics for many assets (NaN/null-padded or ragged price series)."""
+    data = read_payload()
+    result = risk_metrics_batch(data)
+    return respond(result)
+
+@app.route('/risk/rolling', methods=['POST'])
+def risk_rolling():
+    """Calculate rolling risk metrics over the full price series."""
+    data = read_payload()
+    window = int(request.args.get('window', 20))
+    result = rolling_risk(data, window=window)
+    return respond(result)
+
+@app.route('/risk/simulate', methods=['POST'])
+def risk_simulate():
+    """Monte Carlo VaR, CVaR and drawdown breach probability for an asset or portfolio."""
+    data = read_payload()
+    paths = request.args.get('paths', 10000, type=int)
+    horizon = request.args.get('horizon', 10, type=int)
+    try:
+        confidence = tuple(float(c) for c in request.args.get('confidence', '0.95,0.99').split(','))
+    except ValueError:
+        return jsonify({'error': 'Invalid confidence levels'}), 400
+    result = simulate_risk(data, paths=paths, horizon=horizon, model=request.args.get('model', 'gbm'),
+                           seed=request.args.get('seed', type=int), confidence=confidence,
+                           drawdown_threshold=request.args.get('drawdown', 0.1, type=float))
+    if 'error' in result:
+        return jsonify(result), 400
+    return respond(result)
 
 @app.route('/optimize', methods=['POST'])
 def optimize():
@@ -81,6 +295,29 @@ def optimize():
     result = optimize_portfolio(data, risk_aversion=risk_aversion)
     return jsonify(result)
 
+@app.route('/optimize/frontier', methods=['POST'])
+def optimize_frontier():
+    """Compute the efficient frontier over a grid of risk aversions."""
+    data = request.json
+    points = request.args.get('points', 20, type=int)
+    min_ra = request.args.get('min_risk_aversion', 0.1, type=float)
+    max_ra = request.args.get('max_risk_aversion', 1000.0, type=float)
+    result = portfolio_frontier(data, points=points, min_risk_aversion=min_ra, max_risk_aversion=max_ra)
+    return jsonify(result), 400 if 'error' in result else 200
+
+@app.route('/correlation/peers', methods=['POST'])
+def peers():
+    """Most correlated peers per ticker over 'returns' or 'price_history'."""
+    data = read_payload()
+    tickers = request.args.get('tickers') or data.get('tickers')
+    if isinstance(tickers, str):
+        tickers = [t.strip() for t in tickers.split(',') if t.strip()]
+    result = correlation_peers(data, tickers=tickers, k=request.args.get('k', 10, type=int),
+                               method=request.args.get('method', 'sample'),
+                               decay=request.args.get('decay', 0.94, type=float),
+                               dtype=request.args.get('dtype', 'float64'))
+    return respond(result)
+
 @app.route('/summarize', methods=['POST'])
 def summarize():
     """Summarize provided text using LLM."""
@@ -89,15 +326,171 @@ def summarize():
     summary = summarize_text(text)
     return jsonify({'summary': summary})
 
+@app.route('/summarize/batch', methods=['POST'])
+def summarize_many():
+    """Summarize many texts (e.g. headlines), packing short ones into shared LLM requests."""
+    data = request.json
+    texts = data.get('texts') if isinstance(data, dict) else None
+    if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+        return jsonify({'error': "'texts' must be a list of strings"}), 400
+    if len(texts) > MAX_SUMMARY_TEXTS:
+        return jsonify({'error': f'At most {MAX_SUMMARY_TEXTS} texts per request'}), 400
+    return jsonify({'summaries': summarize_batch(texts)})
+
 @app.route('/explain-forecast', methods=['POST'])
 def explain_forecast():
-    """Explain XGBoost forecast using SHAP and ELI5."""
+    """Explain XGBoost forecasts using SHAP, with optional ELI5 HTML."""
     data = request.json
     prices = data.get('prices', []) if data else []
     steps = int(data.get('steps', 5)) if data else 5
     window = int(data.get('window', 5)) if data else 5
-    result = explain_xgboost_forecast(prices, steps, window)
+    scope = data.get('scope', 'last') if data else 'last'
+    html = bool(data.get('html', True)) if data else True
+    if request.args.get('async'):
+        return submit_job('explain:xgboost', explain_xgboost_forecast, prices, steps, window, scope, html)
+    result = explain_xgboost_forecast(prices, steps, window, scope, html)
     return jsonify(result)
 
+@app.route('/report', methods=['POST'])
+def report():
+    """Run several analyses on one payload concurrently, with per-section timings."""
+    data = read_payload()
+    sections = request.args.get('sections', ','.join(REPORT_SECTIONS)).split(',')
+    options = {
+        'method': request.args.get('method', 'arima'),
+        'steps': int(request.args.get('steps', 5)),
+        'window': int(request.args.get('window', 5)),
+        'order': parse_order(request.args.get('order', '1,1,1')),
+        'strategy': request.args.get('strategy', 'recursive'),
+        'risk_aversion': float(request.args.get('risk_aversion', 0.5)),
+    }
+    if request.args.get('async'):
+        return submit_job('report', build_report, data, sections, **options)
+    result = build_report(data, sections, **options)
+    if 'error' in result:
+        return jsonify(result), 400
+    return respond(result)
+
+def submit_job(label, fn, *args, **kwargs):
+    """Queue a background job and return its id (202), or 503 if the queue is full."""
+    try:
+        job_id = JOBS.submit(label, fn, *args, **kwargs)
+    except QueueFull as e:
+        return jsonify({'error': str(e)}), 503
+    return jsonify({'job_id': job_id, 'status_url': url_for('job_status', job_id=job_id)}), 202
+
+@app.route('/jobs', methods=['GET'])
+def jobs_stats():
+    """Report job queue depth and per-method runtimes."""
+    return jsonify(JOBS.stats())
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """Poll a background job's status and result."""
+    info = JOBS.status(job_id)
+    if info is None:
+        return jsonify({'error': 'Unknown job id'}), 404
+    return jsonify(info)
+
+@app.route('/jobs/<job_id>', methods=['DELETE'])
+def job_cancel(job_id):
+    """Cancel a job that has not started yet."""
+    info = JOBS.status(job_id)
+    if info is None:
+        return jsonify({'error': 'Unknown job id'}), 404
+    return jsonify({'id': job_id, 'cancelled': JOBS.cancel(job_id)})
+
+@app.route('/stream/ticks', methods=['POST'])
+def stream_ticks():
+    """Push ticks ({ticker: [prices]}) and headlines into the live stream."""
+    data = read_payload()
+    ticks, news = data.get('ticks') or {}, data.get('news') or []
+    if not isinstance(ticks, dict) or not isinstance(news, list) or not all(isinstance(n, dict) for n in news):
+        return jsonify({'error': "'ticks' must map tickers to prices and 'news' be a list of headlines"}), 400
+    try:
+        result = STREAM.ingest(ticks, news)
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(result)
+
+@app.route('/stream/events', methods=['GET'])
+def stream_events():
+    """Server-Sent Events with the latest snapshot of each updated ticker (coalesced for slow clients)."""
+    tickers = request.args.get('tickers')
+    subscriber = STREAM.subscribe([t.strip() for t in tickers.split(',') if t.strip()] if tickers else None)
+
+    def events():
+        try:
+            while not subscriber.closed:
+                updates = subscriber.get(timeout=HEARTBEAT_SECONDS)
+                if not updates:
+                    yield ': keepalive\n\n'
+                    continue
+                STREAM.record_delivery(updates)
+                for update in updates:
+                    yield f"event: update\ndata: {json_dumps(update, sort_keys=False)}\n\n"
+        finally:
+            STREAM.unsubscribe(subscriber)
+    return Response(events(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/stream/snapshot/<ticker>', methods=['GET'])
+def stream_snapshot(ticker):
+    """Current live analytics of one ticker."""
+    snapshot = STREAM.snapshot(ticker)
+    if snapshot is None:
+        return jsonify({'error': 'Unknown ticker'}), 404
+    return jsonify(snapshot)
+
+@app.route('/stream/stats', methods=['GET'])
+def stream_stats():
+    """Stream throughput, coalescing and delivery lag, plus the replay source status."""
+    stats = STREAM.stats()
+    stats['replay'] = REPLAY['source'].status() if REPLAY['source'] else None
+    return jsonify(stats)
+
+@app.route('/stream/replay', methods=['POST'])
+def stream_replay():
+    """Start feeding the stream from simulated prices and headlines (replaces a running replay)."""
+    n_assets = request.args.get('n_assets', 3, type=int)
+    if not 1 <= n_assets <= MAX_REPLAY_ASSETS:
+        return jsonify({'error': f'n_assets must be between 1 and {MAX_REPLAY_ASSETS}'}), 400
+    try:
+        source = ReplaySource(STREAM, n_assets=n_assets, n_ticks=request.args.get('ticks', type=int),
+                              rate=request.args.get('rate', 10.0, type=float),
+                              batch=request.args.get('batch', 10, type=int),
+                              seed=request.args.get('seed', type=int))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if REPLAY['source']:
+        REPLAY['source'].stop()
+    REPLAY['source'] = source.start()
+    return jsonify(REPLAY['source'].status()), 202
+
+@app.route('/stream/replay', methods=['DELETE'])
+def stream_replay_stop():
+    """Stop the replay source."""
+    if not REPLAY['source']:
+        return jsonify({'error': 'No replay running'}), 404
+    REPLAY['source'].stop()
+    return jsonify(REPLAY['source'].status())
+
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    """Report fitted-model cache hits, misses and evictions."""
+    return jsonify(MODEL_CACHE.stats())
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Request counts, errors and route/stage latency histograms in Prometheus text format."""
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/startup-report', methods=['GET'])
+def startup_report():
+    """Report app startup time and the import cost of each lazily loaded module."""
+    report = import_report()
+    report['startup_seconds'] = STARTUP_SECONDS
+    return jsonify(report)
+
 if __name__ == '__main__':
     app.run(debug=True) 
\ No newline at end of file
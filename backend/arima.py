@@ -0,0 +1,172 @@
+import itertools
+import threading
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from cache import ModelCache, series_key
+from forecast import cached_fit, fit_arima, MODEL_CACHE_SIZE, MODEL_CACHE_TTL
+from metrics import stage
+
+REFIT_EVERY = 250  # New observations absorbed by state updates before parameters are re-estimated
+DRIFT_Z = 3.0  # Refit when the CUSUM of standardized one-step errors since the last fit exceeds this many sigmas
+ANCHOR_PRICES = 32  # Leading prices that identify a growing series when no series id is given
+MAX_P, MAX_D, MAX_Q = 2, 1, 2  # Largest orders tried by the auto-order search
+ORDER_SEARCH_WORKERS = 4  # Worker processes for the auto-order search
+LOCK_STRIPES = 64  # Locks shared by hash across series; bounds lock memory however many series pass through
+
+
+class ArimaStateStore:
+    """
+    Fitted ARIMA results per series, kept between calls. When a series has only grown,
+    the new observations are filtered through the stored state-space results with the
+    parameters held fixed; the model is re-estimated every `refit_every` new observations
+    or when the one-step forecast errors drift.
+    Args:
+        refit_every (int): New observations between scheduled refits.
+        drift_z (float): CUSUM threshold (in standard deviations) that triggers a refit.
+        maxsize (int): Series kept.
+        ttl (float): Seconds before a series is refit from scratch.
+    """
+
+    def __init__(self, refit_every=REFIT_EVERY, drift_z=DRIFT_Z, maxsize=MODEL_CACHE_SIZE, ttl=MODEL_CACHE_TTL):
+        self.refit_every = refit_every
+        self.drift_z = drift_z
+        self._states = ModelCache(maxsize=maxsize, ttl=ttl)
+        self._locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+
+    def _lock(self, key):
+        return self._locks[hash(key) % len(self._locks)]
+
+    def _fit(self, prices, order, reason):
+        with stage('fit', method='arima'):
+            results = fit_arima(prices, order=order)
+        return {'results': results, 'nobs': len(prices), 'digest': series_key(prices, 'arima'), 'order': order,
+                'since_fit': 0, 'cusum': 0.0, 'action': 'fit', 'reason': reason}
+
+    def update(self, series_id, prices, order=(1,1,1)):
+        """
+        Bring the stored results for a series up to date with its prices.
+        Args:
+            series_id (str): Series identity (e.g. a ticker).
+            prices (np.array): Full price history; normally the previous history plus new ticks.
+        Returns:
+            dict: State with 'results' (statsmodels results ending at the last price),
+            'action' ('fit', 'update' or 'unchanged') and 'reason'.
+        """
+        order = tuple(order)
+        key = (series_id, order)
+        with self._lock(key):
+            state = self._states.get(key)
+            if state is None:
+                state = self._fit(prices, order, 'new series')
+            elif len(prices) < state['nobs'] or series_key(prices[:state['nobs']], 'arima') != state['digest']:
+                state = self._fit(prices, order, 'history changed')
+            elif len(prices) == state['nobs']:
+                state = dict(state, action='unchanged', reason=None)
+            else:
+                new = prices[state['nobs']:]
+                with stage('update', method='arima'):
+                    results = state['results'].extend(new)
+                errors = np.ravel(results.standardized_forecasts_error)
+                since_fit = state['since_fit'] + len(new)
+                cusum = state['cusum'] + float(np.nansum(errors))
+                if since_fit >= self.refit_every:
+                    state = self._fit(prices, order, 'schedule')
+                elif abs(cusum) > self.drift_z * np.sqrt(since_fit):
+                    state = self._fit(prices, order, 'drift')
+                else:
+                    state = {'results': results, 'nobs': len(prices), 'digest': series_key(prices, 'arima'),
+                             'order': order, 'since_fit': since_fit, 'cusum': cusum, 'action': 'update',
+                             'reason': None}
+            self._states.put(key, state)
+            return state
+
+    def clear(self):
+        self._states.clear()
+
+    def stats(self):
+        return self._states.stats()
+
+
+ARIMA_STATES = ArimaStateStore()
+
+
+def incremental_arima_forecast(prices, steps=5, order=(1,1,1), series_id=None, store=None):
+    """
+    Forecast with ARIMA results carried over from earlier calls on the same series.
+    Args:
+        prices (list or np.array): Full price history.
+        steps (int): Number of periods to forecast.
+        order (tuple): ARIMA (p, d, q) order.
+        series_id (str, optional): Series identity; by default the series is identified
+            by its first ANCHOR_PRICES prices, so appending ticks keeps the same state.
+        store (ArimaStateStore, optional): State store (default ARIMA_STATES).
+    Returns:
+        dict: 'forecast' and 'state' ('action', 'reason', 'observations_since_fit').
+    """
+    prices = np.asarray(prices, dtype=float)
+    store = ARIMA_STATES if store is None else store
+    if series_id is None:
+        series_id = series_key(prices[:ANCHOR_PRICES], 'arima-anchor')
+    try:
+        state = store.update(series_id, prices, order)
+        with stage('predict', method='arima'):
+            forecast = state['results'].forecast(steps=steps).tolist()
+    except Exception as e:
+        return {'forecast': [float(prices[-1])] * steps, 'state': {'action': 'failed', 'reason': str(e)}}
+    return {'forecast': forecast, 'state': {'action': state['action'], 'reason': state['reason'],
+                                            'observations_since_fit': state['since_fit']}}
+
+
+def _fit_candidate(prices, order):
+    start = time.perf_counter()
+    try:
+        with warnings.catch_warnings():
+            # Poor candidates routinely warn about start parameters and convergence
+            warnings.simplefilter('ignore')
+            aic = float(fit_arima(prices, order=order).aic)
+        error = None if np.isfinite(aic) else 'Non-finite AIC'
+    except Exception as e:
+        aic, error = None, str(e)
+    return {'order': list(order), 'aic': aic if error is None else None, 'seconds': time.perf_counter() - start,
+            'error': error}
+
+
+def candidate_orders(max_p=MAX_P, max_d=MAX_D, max_q=MAX_Q):
+    """All (p, d, q) orders up to the given maxima."""
+    return list(itertools.product(range(max_p + 1), range(max_d + 1), range(max_q + 1)))
+
+
+def search_arima_order(prices, orders=None, processes=ORDER_SEARCH_WORKERS):
+    """
+    Fit candidate ARIMA orders in parallel processes and pick the lowest AIC.
+    Args:
+        prices (list or np.array): Historical prices.
+        orders (list, optional): (p, d, q) candidates (default candidate_orders()).
+        processes (int): Worker processes; None or 1 fits in-process.
+    Returns:
+        dict: 'best_order', 'best_aic' and 'candidates' (order, aic, seconds and error
+        per candidate, best first).
+    """
+    prices = np.asarray(prices, dtype=float)
+    orders = [tuple(o) for o in (orders or candidate_orders())]
+    if not processes or processes <= 1:
+        candidates = [_fit_candidate(prices, order) for order in orders]
+    else:
+        with ProcessPoolExecutor(min(processes, len(orders))) as pool:
+            futures = [pool.submit(_fit_candidate, prices, order) for order in orders]
+            candidates = [future.result() for future in as_completed(futures)]
+    candidates.sort(key=lambda c: (c['aic'] is None, c['aic'] if c['aic'] is not None else 0.0))
+    best = candidates[0] if candidates and candidates[0]['aic'] is not None else None
+    return {
+        'best_order': best['order'] if best else None,
+        'best_aic': best['aic'] if best else None,
+        'candidates': candidates
+    }
+
+
+def auto_arima_order(prices, processes=ORDER_SEARCH_WORKERS):
+    """Best (p, d, q) order by AIC, searched once per series content through the model cache."""
+    result = cached_fit('arima_order', lambda p: search_arima_order(p, processes=processes), prices)
+    return tuple(result['best_order']) if result['best_order'] else (1, 1, 1)
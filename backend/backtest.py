@@ -0,0 +1,209 @@
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from forecast import (fit_arima, fit_prophet, fit_xgboost, predict_arima, predict_prophet, predict_xgboost,
+                      lstm_forecast_placeholder)
+
+METHODS = ('arima', 'prophet', 'xgboost', 'lstm')
+MODES = ('expanding', 'rolling')
+BACKTEST_WORKERS = 4  # Worker processes for (series, method) tasks
+MAX_BACKTEST_FITS = 2000  # Largest series x methods x origins fitted by one backtest_forecasts call
+
+
+def _fit_predict(method, train, horizon, window, order):
+    """Fit one method on a training window and forecast; returns (forecast, fit_s, predict_s)."""
+    start = time.perf_counter()
+    if method == 'arima':
+        model = fit_arima(train, order=order)
+    elif method == 'prophet':
+        model = fit_prophet(train)
+    elif method == 'xgboost':
+        model = fit_xgboost(train, window=window)
+    else:
+        model = None
+    fitted = time.perf_counter()
+    if method == 'arima':
+        forecast = predict_arima(model, horizon)
+    elif method == 'prophet':
+        forecast = predict_prophet(model, horizon)
+    elif method == 'xgboost':
+        forecast = predict_xgboost(model, train, horizon, window)
+    else:
+        forecast = lstm_forecast_placeholder(train, horizon)
+    return np.asarray(forecast, dtype=float), fitted - start, time.perf_counter() - fitted
+
+
+def validate_settings(methods, horizon=5, mode='expanding', initial=None, step=None):
+    """
+    Check backtest settings before any model is fitted.
+    Args:
+        methods (list): Methods to evaluate.
+        horizon, mode, initial, step: See evaluate_series.
+    Raises:
+        ValueError: If a method or the mode is unknown, or horizon, initial or step is below 1.
+    """
+    unknown = [m for m in methods if m not in METHODS]
+    if unknown:
+        raise ValueError(f"Unknown forecast method: {', '.join(unknown)} (expected some of {', '.join(METHODS)})")
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode: {mode} (expected one of {', '.join(MODES)})")
+    if horizon < 1 or (initial is not None and initial < 1) or (step is not None and step < 1):
+        raise ValueError('Horizon, initial and step must be at least 1')
+
+
+def forecast_origins(length, horizon=5, initial=None, step=None):
+    """
+    Forecast origins (training end indices) for a walk-forward backtest.
+    Args:
+        length (int): Series length.
+        horizon (int): Forecast horizon.
+        initial (int, optional): Size of the first training window (default half the series).
+        step (int, optional): Distance between origins (default horizon).
+    Returns:
+        list: Origin indices; the training set is prices[:origin] (or its tail when rolling).
+    """
+    initial = initial or length // 2
+    step = step or horizon
+    return list(range(initial, length - horizon + 1, step))
+
+
+def evaluate_series(prices, method, horizon=5, initial=None, step=None, mode='expanding', window=5, order=(1,1,1)):
+    """
+    Walk-forward evaluation of one forecast method on one series.
+    Args:
+        prices (list or np.array): Historical prices.
+        method (str): 'arima', 'prophet', 'xgboost' or 'lstm'.
+        horizon (int): Steps forecast from each origin.
+        initial (int, optional): Size of the first training window.
+        step (int, optional): Distance between origins.
+        mode (str): 'expanding' trains on all data up to the origin; 'rolling' on the
+            last `initial` prices only.
+        window (int): Feature window size for 'xgboost'.
+        order (tuple): (p, d, q) order for 'arima'.
+    Returns:
+        dict: 'mae', 'mape', 'directional_accuracy', mean 'fit_seconds' and
+        'predict_seconds', 'origins' and 'failures' (origins whose fit raised).
+    """
+    prices = np.asarray(prices, dtype=float)
+    origins = forecast_origins(len(prices), horizon, initial, step)
+    initial = initial or len(prices) // 2
+    abs_err, pct_err, hits, fit_s, predict_s = [], [], [], [], []
+    failures = 0
+    for origin in origins:
+        train = prices[max(0, origin - initial) if mode == 'rolling' else 0:origin]
+        actual = prices[origin:origin + horizon]
+        try:
+            forecast, fit_time, predict_time = _fit_predict(method, train, horizon, window, order)
+        except Exception:
+            failures += 1
+            continue
+        fit_s.append(fit_time)
+        predict_s.append(predict_time)
+        abs_err.append(np.abs(forecast - actual))
+        pct_err.append(np.abs(forecast - actual) / np.abs(actual))
+        hits.append(np.sign(forecast - train[-1]) == np.sign(actual - train[-1]))
+    if not abs_err:
+        return {'mae': None, 'mape': None, 'directional_accuracy': None, 'fit_seconds': None,
+                'predict_seconds': None, 'origins': len(origins), 'failures': failures}
+    return {
+        'mae': float(np.mean(abs_err)),
+        'mape': float(np.mean(pct_err) * 100),
+        'directional_accuracy': float(np.mean(hits)),
+        'fit_seconds': float(np.mean(fit_s)),
+        'predict_seconds': float(np.mean(predict_s)),
+        'origins': len(origins),
+        'failures': failures
+    }
+
+
+def _run_task(name, prices, method, config):
+    return name, method, evaluate_series(prices, method, **config)
+
+
+def _load_checkpoint(path, config):
+    done = {}
+    if not path or not os.path.exists(path):
+        return done
+    with open(path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # Partially written last line from an interrupted run
+            if record.get('config') == config:
+                done[(record['series'], record['method'])] = record['metrics']
+    return done
+
+
+def run_backtest(series, methods=METHODS, horizon=5, initial=None, step=None, mode='expanding', window=5,
+                 order=(1,1,1), processes=BACKTEST_WORKERS, checkpoint=None):
+    """
+    Backtest forecast methods across many series, one worker task per (series, method).
+    Args:
+        series (dict): Series name -> prices.
+        methods (list): Methods to evaluate.
+        horizon, initial, step, mode, window, order: See evaluate_series.
+        processes (int): Worker processes; None or 1 runs in-process.
+        checkpoint (str, optional): JSON-lines file; finished tasks are appended as they
+            complete and skipped when a run with the same configuration is resumed.
+    Returns:
+        dict: 'results' ({series: {method: metrics}}) and 'best' ({series: method with the lowest MAE}).
+    Raises:
+        ValueError: If the settings are invalid (see validate_settings).
+    """
+    validate_settings(methods, horizon, mode, initial, step)
+    config = {'horizon': horizon, 'initial': initial, 'step': step, 'mode': mode, 'window': window,
+              'order': list(order)}
+    results = {name: {} for name in series}
+    for (name, method), metrics in _load_checkpoint(checkpoint, config).items():
+        if name in results and method in methods:
+            results[name][method] = metrics
+    tasks = [(name, method) for name in series for method in methods if method not in results[name]]
+    out = open(checkpoint, 'a') if checkpoint else None
+
+    def record(name, method, metrics):
+        results[name][method] = metrics
+        if out:
+            out.write(json.dumps({'series': name, 'method': method, 'config': config, 'metrics': metrics}) + '\n')
+            out.flush()
+
+    try:
+        if not processes or processes <= 1:
+            for name, method in tasks:
+                record(*_run_task(name, series[name], method, config))
+        elif tasks:
+            with ProcessPoolExecutor(processes) as pool:
+                futures = [pool.submit(_run_task, name, np.asarray(series[name], dtype=float), method, config)
+                           for name, method in tasks]
+                for future in as_completed(futures):
+                    record(*future.result())
+    finally:
+        if out:
+            out.close()
+    best = {}
+    for name, by_method in results.items():
+        scored = {m: r['mae'] for m, r in by_method.items() if r['mae'] is not None}
+        best[name] = min(scored, key=scored.get) if scored else None
+    return {'results': results, 'best': best}
+
+
+if __name__ == '__main__':
+    import argparse
+    from price_store import load_prices
+
+    parser = argparse.ArgumentParser(description='Walk-forward backtest of forecast methods on stored prices.')
+    parser.add_argument('tickers', nargs='+')
+    parser.add_argument('--methods', default=','.join(METHODS))
+    parser.add_argument('--horizon', type=int, default=5)
+    parser.add_argument('--mode', choices=MODES, default='expanding')
+    parser.add_argument('--initial', type=int)
+    parser.add_argument('--step', type=int)
+    parser.add_argument('--processes', type=int, default=BACKTEST_WORKERS)
+    parser.add_argument('--checkpoint', help='JSON-lines file to resume from and append to')
+    args = parser.parse_args()
+    series = {t: np.array(load_prices(t)) for t in args.tickers}
+    report = run_backtest(series, args.methods.split(','), args.horizon, args.initial, args.step, args.mode,
+                          processes=args.processes, checkpoint=args.checkpoint)
+    print(json.dumps(report, indent=2))
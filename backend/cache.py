@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+def series_key(prices, method, **params):
+    """
+    Build a cache key from the content of a price series plus method and hyperparameters.
+    Args:
+        prices (list or np.array): Price series.
+        method (str): Model name, e.g. 'arima'.
+        **params: Hyperparameters that change the fitted model (order, window, ...).
+    Returns:
+        str: Hex digest identifying the fitted model.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(np.ascontiguousarray(prices, dtype=np.float64).tobytes())
+    h.update(method.encode())
+    h.update(repr(sorted(params.items())).encode())
+    return h.hexdigest()
+
+
+class ModelCache:
+    """
+    Bounded LRU cache with a time-to-live for fitted models.
+    Args:
+        maxsize (int): Maximum number of entries kept.
+        ttl (float): Seconds an entry stays valid (None for no expiry).
+    """
+
+    def __init__(self, maxsize=128, ttl=3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss or expired entry."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, stored_at = entry
+                if self.ttl is None or time.monotonic() - stored_at < self.ttl:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+                self.expirations += 1
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        """Store value under key, evicting the least recently used entries if full."""
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_fit(self, key, fit):
+        """
+        Return the cached model for key, fitting and storing it on a miss.
+        Args:
+            key (str): Cache key (see series_key).
+            fit (callable): Zero-argument function returning the fitted model.
+        Returns:
+            object: Fitted model.
+        """
+        model = self.get(key)
+        if model is None:
+            # Fit outside the lock so slow fits do not block other requests.
+            model = fit()
+            self.put(key, model)
+        return model
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        """
+        Return cache counters.
+        Returns:
+            dict: size, maxsize, ttl, hits, misses, evictions, expirations.
+        """
+        with self._lock:
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+
+class DiskCache:
+    """
+    On-disk JSON cache with a time-to-live, one file per key.
+    Args:
+        directory (str): Cache directory (created on first write).
+        ttl (float): Seconds an entry stays fresh (None for no expiry).
+    """
+
+    def __init__(self, directory, ttl=None):
+        self.directory = directory
+        self.ttl = ttl
+
+    def _path(self, key):
+        digest = hashlib.sha1(json.dumps(key).encode()).hexdigest()
+        return os.path.join(self.directory, digest + '.json')
+
+    def get(self, key):
+        """Return the cached value for key, or None if missing or stale."""
+        try:
+            with open(self._path(key)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if self.ttl is not None and time.time() - entry['stored_at'] > self.ttl:
+            return None
+        return entry['value']
+
+    def set(self, key, value):
+        """Store value under key, atomically replacing any previous entry."""
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'key': key, 'stored_at': time.time(), 'value': value}, f)
+        os.replace(tmp, self._path(key))
@@ -0,0 +1,240 @@
+import threading
+import numpy as np
+from cache import ModelCache, series_key
+from metrics import stage
+
+BLOCK_SIZE = 512  # Assets per block; bounds temporaries to block x N instead of N x N
+EWMA_DECAY = 0.94  # RiskMetrics daily decay factor
+TOP_K = 10  # Peers returned per ticker
+DTYPES = {'float64': np.float64, 'float32': np.float32}
+EWMA_STATE_SIZE = 16  # Universes whose EWMA covariance is kept between calls
+EWMA_STATE_TTL = 24 * 3600  # Seconds an EWMA state is kept without updates
+
+
+def _blocks(n, block):
+    return [(start, min(start + block, n)) for start in range(0, n, block)]
+
+
+def _gram(x, y, block=BLOCK_SIZE, dtype=np.float64, out=None):
+    """x.T @ y computed block by block into an N x N output (symmetric when x is y)."""
+    n = x.shape[1]
+    out = np.empty((n, n), dtype=dtype) if out is None else out
+    symmetric = x is y
+    for i, j in _blocks(n, block):
+        for k, l in _blocks(n, block):
+            if symmetric and k < i:
+                continue
+            out[i:j, k:l] = x[:, i:j].T @ y[:, k:l]
+            if symmetric and k > i:
+                out[k:l, i:j] = out[i:j, k:l].T
+    return out
+
+
+def sample_covariance(returns, block=BLOCK_SIZE, dtype=np.float64):
+    """
+    Sample covariance of N assets, computed in blocks of assets.
+    Args:
+        returns (np.array): T x N matrix of returns (rows = observations).
+        block (int): Assets per block.
+        dtype: np.float64, or np.float32 to halve memory on large universes.
+    Returns:
+        np.array: N x N covariance.
+    """
+    x = np.asarray(returns, dtype=dtype)
+    x = x - x.mean(axis=0)
+    with stage('covariance', method='sample'):
+        cov = _gram(x, x, block, dtype)
+    cov /= max(len(x) - 1, 1)
+    return cov
+
+
+def ewma_weights(n_obs, decay=EWMA_DECAY):
+    """Observation weights (1 - decay) * decay ** age, newest last, matching the recursive update."""
+    return (1 - decay) * decay ** np.arange(n_obs - 1, -1, -1)
+
+
+def ewma_covariance(returns, decay=EWMA_DECAY, block=BLOCK_SIZE, dtype=np.float64):
+    """
+    Exponentially weighted (zero-mean, RiskMetrics) covariance of N assets.
+    Equal to starting from zeros and applying EwmaCovariance.update for every row.
+    Args:
+        returns (np.array): T x N matrix of returns.
+        decay (float): Decay factor per observation.
+        block (int): Assets per block.
+        dtype: np.float64 or np.float32.
+    Returns:
+        np.array: N x N covariance.
+    """
+    x = np.asarray(returns, dtype=dtype)
+    weighted = x * ewma_weights(len(x), decay).astype(dtype)[:, np.newaxis]
+    with stage('covariance', method='ewma'):
+        return _gram(weighted, x, block, dtype)
+
+
+def correlation(cov, out=None):
+    """
+    Correlation matrix of a covariance matrix.
+    Args:
+        cov (np.array): N x N covariance.
+        out (np.array, optional): Output array; pass cov itself to convert in place.
+    Returns:
+        np.array: N x N correlation (0 for assets with zero variance).
+    """
+    std = np.sqrt(np.diag(cov)).astype(cov.dtype)
+    inv = np.divide(1, std, out=np.zeros_like(std), where=std > 0)
+    out = np.multiply(cov, inv[:, np.newaxis], out=out)
+    out *= inv
+    np.fill_diagonal(out, np.where(std > 0, 1, 0))
+    return out
+
+
+class EwmaCovariance:
+    """
+    Exponentially weighted covariance kept up to date in place. Each new bar is a
+    rank-one step S = decay * S + (1 - decay) * r r', applied block by block so no N x N
+    temporary is created.
+    Args:
+        n_assets (int): Number of assets.
+        decay (float): Decay factor per observation.
+        dtype: np.float64 or np.float32.
+        block (int): Assets per block.
+    """
+
+    def __init__(self, n_assets, decay=EWMA_DECAY, dtype=np.float64, block=BLOCK_SIZE):
+        self.decay = decay
+        self.block = block
+        self.n_obs = 0
+        self.matrix = np.zeros((n_assets, n_assets), dtype=dtype)
+
+    def update(self, r):
+        """
+        Absorb one bar of returns.
+        Args:
+            r (np.array): N returns.
+        """
+        r = np.asarray(r, dtype=self.matrix.dtype)
+        scaled = (1 - self.decay) * r
+        for i, j in _blocks(len(r), self.block):
+            rows = self.matrix[i:j]
+            rows *= self.decay
+            rows += np.multiply.outer(scaled[i:j], r)
+        self.n_obs += 1
+
+    def extend(self, returns):
+        """
+        Absorb several bars at once; same result as calling update for each row.
+        Args:
+            returns (np.array): K x N returns, oldest first.
+        """
+        x = np.asarray(returns, dtype=self.matrix.dtype)
+        if len(x) <= 1:
+            return self.update(x[0]) if len(x) else None
+        # Rank-len(x) step: older weight decays by decay ** len(x), new bars enter with EWMA weights
+        weighted = x * ewma_weights(len(x), self.decay).astype(x.dtype)[:, np.newaxis]
+        for i, j in _blocks(self.matrix.shape[1], self.block):
+            rows = self.matrix[i:j]
+            rows *= self.decay ** len(x)
+            rows += weighted[:, i:j].T @ x
+        self.n_obs += len(x)
+
+    def correlation(self):
+        """Correlation matrix of the current estimate (a new array)."""
+        return correlation(self.matrix)
+
+    def correlation_rows(self, columns):
+        """Correlations of the selected assets against every asset (len(columns) x N)."""
+        std = np.sqrt(np.diag(self.matrix))
+        inv = np.divide(1, std, out=np.zeros_like(std), where=std > 0)
+        return self.matrix[columns] * inv[columns][:, np.newaxis] * inv
+
+
+class EwmaStateStore:
+    """
+    EWMA covariance per asset universe, kept between calls. When the return history has
+    only grown, the new bars are applied as in-place updates; otherwise it is rebuilt.
+    Args:
+        maxsize (int): Universes kept.
+        ttl (float): Seconds a state is kept without use.
+    """
+
+    def __init__(self, maxsize=EWMA_STATE_SIZE, ttl=EWMA_STATE_TTL):
+        self._states = ModelCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def update(self, assets, returns, decay=EWMA_DECAY, dtype=np.float64, columns=None):
+        """
+        Bring the EWMA covariance of a universe up to date with its return history.
+        Args:
+            assets (list): Asset names, in column order.
+            returns (np.array): Full T x N return history.
+            decay (float): Decay factor per observation.
+            dtype: np.float64 or np.float32.
+            columns (list, optional): Query assets whose correlation rows are returned,
+                read before any other caller can update the shared matrix.
+        Returns:
+            tuple: (EwmaCovariance, action, rows) where action is 'fit', 'update' or
+            'unchanged' and rows the correlation rows of columns (None without columns).
+        """
+        key = (tuple(assets), decay, np.dtype(dtype).name)
+        with self._lock:
+            state = self._states.get(key)
+            if state is not None and len(returns) >= state['model'].n_obs and \
+                    series_key(returns[:state['model'].n_obs], 'ewma') == state['digest']:
+                model = state['model']
+                action = 'update' if len(returns) > model.n_obs else 'unchanged'
+                model.extend(returns[model.n_obs:])
+            else:
+                model = EwmaCovariance(len(assets), decay, dtype)
+                model.extend(returns)
+                action = 'fit'
+            self._states.put(key, {'model': model, 'digest': series_key(returns, 'ewma')})
+            rows = None if columns is None else model.correlation_rows(columns)
+            return model, action, rows
+
+    def clear(self):
+        self._states.clear()
+
+
+EWMA_STATES = EwmaStateStore()
+
+
+def correlation_rows(returns, columns, dtype=np.float64):
+    """
+    Sample correlation of selected assets against every asset, without the N x N matrix.
+    Args:
+        returns (np.array): T x N matrix of returns.
+        columns (list): Column indices of the query assets.
+        dtype: np.float64 or np.float32.
+    Returns:
+        np.array: len(columns) x N correlations.
+    """
+    x = np.asarray(returns, dtype=dtype)
+    x = x - x.mean(axis=0)
+    std = np.sqrt(np.einsum('ij,ij->j', x, x))
+    inv = np.divide(1, std, out=np.zeros_like(std), where=std > 0)
+    with stage('covariance', method='rows'):
+        rows = x[:, columns].T @ x
+    rows *= inv[columns][:, np.newaxis]
+    rows *= inv
+    return rows
+
+
+def top_peers(rows, columns, k=TOP_K):
+    """
+    Most correlated peers of each query asset.
+    Args:
+        rows (np.array): Q x N correlations of the query assets against all assets.
+        columns (list): Column index of each query asset (excluded from its own peers).
+        k (int): Peers per asset.
+    Returns:
+        tuple: (Q x k peer indices, Q x k correlations), highest correlation first.
+    """
+    rows = np.array(rows, dtype=float)
+    rows[np.arange(len(columns)), columns] = -np.inf
+    k = min(k, rows.shape[1] - 1)
+    if k <= 0:
+        return np.empty((len(columns), 0), dtype=int), np.empty((len(columns), 0))
+    part = np.argpartition(-rows, k - 1, axis=1)[:, :k]
+    values = np.take_along_axis(rows, part, axis=1)
+    order = np.argsort(-values, axis=1, kind='stable')
+    return np.take_along_axis(part, order, axis=1), np.take_along_axis(values, order, axis=1)
@@ -1,26 +1,236 @@
+import json
+import os
 import numpy as np
 import pandas as pd
-import random
-
-def generate_synthetic_data():
-    # Synthetic financials
-    financials = {
-        'revenue': np.random.randint(100000, 1000000),
-        'expenses': np.random.randint(50000, 900000),
-        'net_income': np.random.randint(10000, 100000)
-    }
-    # Synthetic stock prices
-    prices = list(np.cumsum(np.random.normal(0, 1, 30)) + 100)
-    # Synthetic news
-    news = [
-        {'headline': random.choice([
-            'Company X beats earnings expectations',
-            'Market volatility increases',
-            'New product launch boosts stock',
-            'Regulatory changes impact sector',
-            'Analysts predict growth'])}
-        for _ in range(5)
+
+DEFAULT_ASSETS = ['AAPL', 'GOOG', 'TSLA']
+HEADLINES = {
+    'positive': [
+        '{asset} beats earnings expectations',
+        'New product launch boosts {asset} stock',
+        'Analysts predict growth for {asset}',
+        '{asset} shares gain on record revenue',
+    ],
+    'negative': [
+        'Market volatility increases',
+        'Regulatory changes impact {asset} sector',
+        '{asset} shares down after quarterly loss',
+        'Investors fear crash as {asset} slides',
+    ],
+}
+DRIFT = 0.07 / 252  # Expected log return per tick before volatility drag
+REGIME_VOL = np.array([1.0, 2.5])  # Volatility multiplier in the calm and stressed regimes
+REGIME_DURATION = np.array([120.0, 20.0])  # Mean ticks spent in each regime
+SHOCK_PROB = 0.005  # Per-tick probability of a market-wide shock
+SHOCK_SIZE = -4.0  # Mean shock in units of each asset's daily volatility
+CHUNK_TICKS = 100000  # Ticks generated per chunk when streaming to disk
+
+
+def asset_names(n_assets):
+    """Default ticker names: the classic three, then SYN0003, SYN0004, ..."""
+    return DEFAULT_ASSETS[:n_assets] + [f'SYN{i:04d}' for i in range(len(DEFAULT_ASSETS), n_assets)]
+
+
+def random_covariance(n_assets, rng):
+    """
+    One-factor daily return covariance: beta_i * beta_j * market_var + idiosyncratic variance.
+    Args:
+        n_assets (int): Number of assets.
+        rng (np.random.Generator): Random generator.
+    Returns:
+        np.array: N x N covariance matrix.
+    """
+    beta = rng.uniform(0.5, 1.5, n_assets)
+    idio = rng.uniform(0.005, 0.02, n_assets)
+    return np.outer(beta, beta) * 0.01 ** 2 + np.diag(idio ** 2)
+
+
+def generate_fundamentals(n_assets, rng):
+    """
+    Revenue, expenses and net income per asset.
+    Returns:
+        dict: Column name -> array of length n_assets.
+    """
+    revenue = rng.lognormal(np.log(500000), 0.5, n_assets).round()
+    margin = rng.uniform(0.02, 0.3, n_assets)
+    net_income = (revenue * margin).round()
+    return {'revenue': revenue, 'expenses': revenue - net_income, 'net_income': net_income}
+
+
+class MarketSimulator:
+    """
+    Correlated log-normal price paths with Markov volatility regimes and market-wide shocks.
+    Paths are produced in chunks that carry prices and the regime state across calls, so
+    arbitrarily long series can be streamed; a fixed seed and chunk size reproduce the
+    same paths.
+    Args:
+        n_assets (int): Number of assets.
+        cov (np.array, optional): N x N daily return covariance (random one-factor model if None).
+        seed (int or np.random.Generator, optional): Seed for np.random.default_rng.
+        start_price (float): Price of every asset at tick 0.
+    """
+
+    def __init__(self, n_assets=3, cov=None, seed=None, start_price=100.0):
+        self.rng = np.random.default_rng(seed)
+        self.cov = random_covariance(n_assets, self.rng) if cov is None else np.asarray(cov, dtype=float)
+        if self.cov.shape != (n_assets, n_assets):
+            raise ValueError(f'Covariance must be {n_assets} x {n_assets}')
+        self.n_assets = n_assets
+        self.chol = np.linalg.cholesky(self.cov)
+        self.vol = np.sqrt(np.diag(self.cov))
+        # Per-regime log drift; expected shocks are compensated so they add risk, not trend
+        self.drift = DRIFT - 0.5 * (REGIME_VOL[:, np.newaxis] * self.vol) ** 2 - SHOCK_PROB * SHOCK_SIZE * self.vol
+        self.log_price = np.full(n_assets, np.log(start_price))
+        self._states, self._lengths = [0], [int(self.rng.geometric(1 / REGIME_DURATION[0]))]
+
+    def _regime_path(self, n_ticks):
+        # Draw whole regime spells (geometric durations) instead of stepping the chain per tick;
+        # the unfinished spell and any spells drawn beyond n_ticks carry over to the next chunk
+        states, lengths = self._states, self._lengths
+        while sum(lengths) < n_ticks:
+            spells = int((n_ticks - sum(lengths)) / REGIME_DURATION.sum()) * 2 + 2
+            next_states = (1 - states[-1] + np.arange(spells)) % 2
+            states = states + next_states.tolist()
+            lengths = lengths + self.rng.geometric(1 / REGIME_DURATION[next_states]).tolist()
+        ends = np.cumsum(lengths)
+        last = int(np.searchsorted(ends, n_ticks))
+        path = np.repeat(states[:last + 1], lengths[:last + 1])[:n_ticks]
+        self._states, self._lengths = states[last:], [int(ends[last]) - n_ticks] + lengths[last + 1:]
+        return path
+
+    def step(self, n_ticks):
+        """
+        Simulate the next n_ticks.
+        Returns:
+            tuple: (prices T x N, returns T x N simple returns, regimes T).
+        """
+        if n_ticks == 0:
+            empty = np.empty((0, self.n_assets))
+            return empty, empty, np.empty(0, dtype=int)
+        regimes = self._regime_path(n_ticks)
+        z = self.rng.standard_normal((n_ticks, self.n_assets)) @ self.chol.T
+        log_returns = self.drift[regimes] + z * REGIME_VOL[regimes][:, np.newaxis]
+        shocked = self.rng.random(n_ticks) < SHOCK_PROB
+        if shocked.any():
+            size = self.rng.normal(SHOCK_SIZE, 1.0, shocked.sum())
+            log_returns[shocked] += size[:, np.newaxis] * self.vol
+        log_prices = self.log_price + np.cumsum(log_returns, axis=0)
+        self.log_price = log_prices[-1]
+        return np.exp(log_prices), np.expm1(log_returns), regimes
+
+
+def generate_headlines(returns, n_news, assets, rng, tick_offset=0):
+    """
+    Headlines whose tone follows the sign of the sampled asset's return (with 20% noise).
+    Args:
+        returns (np.array): T x N returns.
+        n_news (int): Number of headlines.
+        assets (list): Asset names.
+        rng (np.random.Generator): Random generator.
+        tick_offset (int): Index of the first tick in returns.
+    Returns:
+        list: Dicts with 'tick', 'asset' and 'headline', ordered by tick.
+    """
+    if n_news == 0 or returns.size == 0:
+        return []
+    ticks = np.sort(rng.integers(0, len(returns), n_news))
+    cols = rng.integers(0, len(assets), n_news)
+    positive = (returns[ticks, cols] > 0) ^ (rng.random(n_news) < 0.2)
+    choice = rng.integers(0, len(HEADLINES['positive']), n_news)
+    return [
+        {'tick': int(t) + tick_offset, 'asset': assets[c],
+         'headline': HEADLINES['positive' if p else 'negative'][k].format(asset=assets[c])}
+        for t, c, p, k in zip(ticks, cols, positive, choice)
     ]
-    # Synthetic assets
-    assets = ['AAPL', 'GOOG', 'TSLA']
-    return {'financials': financials, 'prices': prices, 'news': news, 'assets': assets} 
\ No newline at end of file
+
+
+def generate_market(n_assets=3, n_ticks=30, n_news=5, cov=None, seed=None):
+    """
+    Generate an in-memory market of correlated price paths, fundamentals and headlines.
+    Args:
+        n_assets (int): Number of assets.
+        n_ticks (int): Number of ticks per asset.
+        n_news (int): Number of headlines.
+        cov (np.array, optional): N x N daily return covariance.
+        seed (int, optional): Seed for reproducible output.
+    Returns:
+        dict: 'assets', 'prices' (T x N), 'returns' (T x N), 'regimes' (T),
+        'fundamentals' (column -> N array) and 'news'.
+    """
+    sim = MarketSimulator(n_assets, cov, seed)
+    assets = asset_names(n_assets)
+    prices, returns, regimes = sim.step(n_ticks)
+    return {
+        'assets': assets,
+        'prices': prices,
+        'returns': returns,
+        'regimes': regimes,
+        'fundamentals': generate_fundamentals(n_assets, sim.rng),
+        'news': generate_headlines(returns, n_news, assets, sim.rng),
+    }
+
+
+def generate_market_to_disk(directory, n_assets=3, n_ticks=1000000, news_per_chunk=1000, cov=None, seed=None,
+                            chunk_ticks=CHUNK_TICKS):
+    """
+    Stream a market larger than memory to disk, one chunk of ticks at a time.
+    Writes prices.npy (T x N float64, written through a memory map), regimes.npy,
+    news.jsonl and meta.json (assets, fundamentals, covariance).
+    Args:
+        directory (str): Output directory (created if missing).
+        n_assets (int): Number of assets.
+        n_ticks (int): Total ticks per asset.
+        news_per_chunk (int): Headlines generated per chunk.
+        cov (np.array, optional): N x N daily return covariance.
+        seed (int, optional): Seed for reproducible output.
+        chunk_ticks (int): Ticks held in memory at once.
+    Returns:
+        dict: Paths of the written files.
+    """
+    os.makedirs(directory, exist_ok=True)
+    sim = MarketSimulator(n_assets, cov, seed)
+    assets = asset_names(n_assets)
+    paths = {name: os.path.join(directory, name) for name in ('prices.npy', 'regimes.npy', 'news.jsonl', 'meta.json')}
+    prices = np.lib.format.open_memmap(paths['prices.npy'], mode='w+', dtype=np.float64, shape=(n_ticks, n_assets))
+    regimes = np.lib.format.open_memmap(paths['regimes.npy'], mode='w+', dtype=np.int8, shape=(n_ticks,))
+    with open(paths['news.jsonl'], 'w') as news:
+        for start in range(0, n_ticks, chunk_ticks):
+            stop = min(start + chunk_ticks, n_ticks)
+            chunk_prices, chunk_returns, chunk_regimes = sim.step(stop - start)
+            prices[start:stop] = chunk_prices
+            regimes[start:stop] = chunk_regimes
+            for item in generate_headlines(chunk_returns, news_per_chunk, assets, sim.rng, tick_offset=start):
+                news.write(json.dumps(item) + '\n')
+    prices.flush()
+    regimes.flush()
+    del prices, regimes
+    fundamentals = generate_fundamentals(n_assets, sim.rng)
+    with open(paths['meta.json'], 'w') as f:
+        json.dump({'assets': assets, 'n_ticks': n_ticks, 'seed': seed, 'cov': sim.cov.tolist(),
+                   'fundamentals': {k: v.tolist() for k, v in fundamentals.items()}}, f)
+    return paths
+
+
+def generate_synthetic_data(n_prices=30, n_news=5, n_assets=3, seed=None):
+    """
+    Generate a sample request payload of financials, prices, news and assets.
+    Args:
+        n_prices (int): Length of each price series.
+        n_news (int): Number of news headlines.
+        n_assets (int): Number of assets.
+        seed (int, optional): Seed for reproducible output.
+    Returns:
+        dict: 'financials' and 'prices' of the first asset, 'news', 'assets' and
+        'price_history' ({asset: prices}).
+    """
+    market = generate_market(n_assets, n_prices, n_news, seed=seed)
+    assets = market['assets']
+    financials = {k: int(v[0]) for k, v in market['fundamentals'].items()} if n_assets else {}
+    prices = market['prices']
+    return {
+        'financials': financials,
+        'prices': prices[:, 0].tolist() if n_assets else [],
+        'news': [{'headline': item['headline']} for item in market['news']],
+        'assets': assets,
+        'price_history': {asset: prices[:, i].tolist() for i, asset in enumerate(assets)},
+    }
@@ -1,48 +1,244 @@
-import yfinance as yf
 import requests
 import datetime
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from lazy import lazy_import
+from cache import DiskCache
+from metrics import stage
+from price_store import STORE
+
+yf = lazy_import('yfinance')
 
 NEWS_API_KEY = 'your_api_key'  # Replace with your NewsAPI key
+NEWS_API_URL = 'https://newsapi.org/v2/everything'
+REQUEST_TIMEOUT = 10  # Seconds per HTTP request
+MAX_RETRIES = 3  # Attempts after the first failure
+RETRY_BACKOFF = 0.5  # Seconds; doubles after every failed attempt
+MAX_WORKERS = 8  # Parallel fetches for bulk requests (also the HTTP pool size)
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache')
+CACHE_TTL = 900  # Seconds a cached response stays fresh
+
+
+class YFinanceProvider:
+    """Stock price provider backed by yfinance."""
+
+    def ohlcv(self, ticker, interval='1d', start=None, period=None):
+        """
+        Download OHLCV bars for one ticker, either for a period or from a start date.
+        Returns:
+            dict: Column name -> array ('date' as datetime64[s]), or None when no data exists.
+        Raises:
+            Exception: Network or provider errors (retried by the caller).
+        """
+        if start is not None:
+            data = yf.download(ticker, start=start, interval=interval, progress=False)
+        else:
+            data = yf.download(ticker, period=period, interval=interval, progress=False)
+        if data is None or data.empty:
+            return None
+        if isinstance(data.columns, pd.MultiIndex):
+            data = data.xs(ticker, axis=1, level=-1) if ticker in data.columns.get_level_values(-1) else data.droplevel(-1, axis=1)
+        data = data.dropna(subset=['Close'])
+        index = data.index.tz_localize(None) if data.index.tz is not None else data.index
+        bars = {'date': index.values.astype('datetime64[s]')}
+        for name in ('Open', 'High', 'Low', 'Close', 'Volume'):
+            bars[name.lower()] = data[name].to_numpy(dtype=float)
+        return bars
+
+
+def period_start(period, now=None):
+    """
+    Start date of a yfinance-style period ('5d', '6mo', '1y', 'ytd', 'max').
+    Args:
+        period (str): Period string.
+        now (datetime, optional): Reference time (default now).
+    Returns:
+        np.datetime64: Start date, or None for 'max'.
+    """
+    now = pd.Timestamp(now or datetime.datetime.now()).normalize()
+    if period == 'max':
+        return None
+    if period == 'ytd':
+        return np.datetime64(now.replace(month=1, day=1).date(), 's')
+    match = re.fullmatch(r'(\d+)(d|wk|mo|y)', period)
+    if not match:
+        raise ValueError(f'Unsupported period: {period}')
+    n, unit = int(match.group(1)), match.group(2)
+    offset = {'d': pd.DateOffset(days=n), 'wk': pd.DateOffset(weeks=n),
+              'mo': pd.DateOffset(months=n), 'y': pd.DateOffset(years=n)}[unit]
+    return np.datetime64((now - offset).date(), 's')
+
 
+CACHE = DiskCache(CACHE_DIR, CACHE_TTL)
+_provider = YFinanceProvider()
+_session = None
+_session_lock = threading.Lock()
 
-def fetch_stock_data(ticker, period='1y', interval='1d'):
+
+def set_stock_provider(provider):
     """
-    Fetch historical stock price data using yfinance.
+    Replace the stock data provider (e.g. with a fake for offline tests).
+    Args:
+        provider: Object with an ohlcv(ticker, interval, start=None, period=None) method.
+    """
+    global _provider
+    _provider = provider
+
+
+def get_session():
+    """
+    Return the shared HTTP session with a connection pool and retry/backoff policy.
+    Returns:
+        requests.Session: Pooled session.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(total=MAX_RETRIES, backoff_factor=RETRY_BACKOFF,
+                          status_forcelist=(429, 500, 502, 503, 504), allowed_methods=('GET',))
+            adapter = HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS, max_retries=retry)
+            session = requests.Session()
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _session = session
+    return _session
+
+
+def _fetch_bars(ticker, interval, **kwargs):
+    with stage('fetch', source='stock'):
+        return _provider.ohlcv(ticker, interval, **kwargs)
+
+
+def with_retry(fn, retries=None, backoff=None):
+    """
+    Call fn, retrying with exponential backoff when it raises.
+    Args:
+        fn (callable): Zero-argument function.
+        retries (int, optional): Extra attempts after the first (default MAX_RETRIES).
+        backoff (float, optional): Initial delay in seconds, doubled after each failure
+            (default RETRY_BACKOFF).
+    Returns:
+        object: fn's return value.
+    """
+    retries = MAX_RETRIES if retries is None else retries
+    backoff = RETRY_BACKOFF if backoff is None else backoff
+    for attempt in range(retries + 1):
+        try:
+            return fn()
+        except Exception:
+            if attempt == retries:
+                raise
+            time.sleep(backoff * 2 ** attempt)
+
+
+def sync_stock_data(ticker, period='1y', interval='1d'):
+    """
+    Bring the local price store up to date for a ticker and period.
+    Only bars from the day of the last stored one on are downloaded (replacing that bar,
+    which may have been partial); the full period is fetched only when the store does not
+    yet cover its start.
     Args:
         ticker (str): Stock ticker symbol.
         period (str): Data period (e.g., '1y', '6mo').
         interval (str): Data interval (e.g., '1d', '1wk').
+    Returns:
+        dict: Memory-mapped column views for the period (empty if no data exists).
+    """
+    start = period_start(period)
+    covered, last = STORE.date_range(ticker, interval)
+    if last is None or (covered is not None and (start is None or covered > start)):
+        bars = with_retry(lambda: _fetch_bars(ticker, interval, period=period))
+        if bars is None:
+            return {}
+        STORE.write(ticker, bars, interval, covered_from=start)
+    else:
+        # Refetch from the day of the last stored bar: it may have been stored while still forming
+        tail_start = str(last.astype('datetime64[D]'))
+        bars = with_retry(lambda: _fetch_bars(ticker, interval, start=tail_start))
+        if bars is not None:
+            STORE.append(ticker, bars, interval)
+    return STORE.read(ticker, interval, start=start)
+
+
+def fetch_stock_data(ticker, period='1y', interval='1d', use_cache=True):
+    """
+    Fetch historical stock price data through the local price store.
+    Args:
+        ticker (str): Stock ticker symbol.
+        period (str): Data period (e.g., '1y', '6mo').
+        interval (str): Data interval (e.g., '1d', '1wk').
+        use_cache (bool): Serve and store responses through the on-disk cache.
     Returns:
         dict: { 'prices': [...], 'dates': [...] }
     """
+    key = ['stock', ticker, period, interval]
+    if use_cache:
+        cached = CACHE.get(key)
+        if cached is not None:
+            return cached
     try:
-        data = yf.download(ticker, period=period, interval=interval, progress=False)
-        if data is None or data.empty:
-            return {'error': 'No data returned for ticker.'}
-        prices = data['Close']
-        if isinstance(prices, pd.DataFrame):
-            prices = prices.iloc[:, 0]
-        prices = prices.dropna().tolist()
-        dates = [str(d.date()) for d in data.index]
-        return {'prices': prices, 'dates': dates}
+        columns = sync_stock_data(ticker, period, interval)
     except Exception as e:
         return {'error': str(e)}
+    if not columns or len(columns['close']) == 0:
+        return {'error': 'No data returned for ticker.'}
+    unit = 'D' if interval[-1] in 'dko' else 'm'
+    data = {'prices': columns['close'].tolist(), 'dates': np.datetime_as_string(columns['date'], unit=unit).tolist()}
+    if use_cache:
+        CACHE.set(key, data)
+    return data
+
+
+def fetch_stock_data_bulk(tickers, period='1y', interval='1d', max_workers=MAX_WORKERS):
+    """
+    Fetch several tickers concurrently with bounded parallelism.
+    Args:
+        tickers (list): Ticker symbols.
+        period (str): Data period.
+        interval (str): Data interval.
+        max_workers (int): Maximum concurrent fetches.
+    Returns:
+        dict: Ticker -> result of fetch_stock_data.
+    """
+    tickers = list(dict.fromkeys(tickers))
+    if not tickers:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(tickers))) as pool:
+        results = pool.map(lambda t: fetch_stock_data(t, period, interval), tickers)
+        return dict(zip(tickers, results))
 
 
-def fetch_news(query='stock market', page_size=5):
+def fetch_news(query='stock market', page_size=5, use_cache=True):
     """
     Fetch latest news headlines using NewsAPI.
     Args:
         query (str): Search query.
         page_size (int): Number of articles.
+        use_cache (bool): Serve and store responses through the on-disk cache.
     Returns:
         list: List of dicts with 'headline' and 'url'.
     """
-    url = f'https://newsapi.org/v2/everything?q={query}&pageSize={page_size}&apiKey={NEWS_API_KEY}'
+    key = ['news', query, page_size]
+    if use_cache:
+        cached = CACHE.get(key)
+        if cached is not None:
+            return cached
+    params = {'q': query, 'pageSize': page_size, 'apiKey': NEWS_API_KEY}
     try:
-        resp = requests.get(url)
+        with stage('fetch', source='news'):
+            resp = get_session().get(NEWS_API_URL, params=params, timeout=REQUEST_TIMEOUT)
+        resp.raise_for_status()
         articles = resp.json().get('articles', [])
-        return [{'headline': a['title'], 'url': a['url']} for a in articles]
+        news = [{'headline': a['title'], 'url': a['url']} for a in articles]
     except Exception as e:
-        return [{'headline': f'Error: {e}', 'url': ''}] 
+        return [{'headline': f'Error: {e}', 'url': ''}]
+    if use_cache:
+        CACHE.set(key, news)
+    return news
@@ -1,39 +1,128 @@
-import xgboost as xgb
-import shap
-import eli5
 import numpy as np
-import pandas as pd
-# from eli5.sklearn import explain_prediction_df  # Unused, remove
+from lazy import lazy_import
+from cache import ModelCache, series_key
+from forecast import cached_fit, fit_xgboost, lag_features, predict_xgboost, MODEL_CACHE_SIZE, MODEL_CACHE_TTL
+from metrics import stage
 
+shap = lazy_import('shap')
+eli5 = lazy_import('eli5')
 
-def explain_xgboost_forecast(prices, steps=5, window=5):
+SCOPES = ('last', 'horizons', 'series')
+EXPLAIN_MAX_ROWS = 2000  # Windows explained for scope='series'; longer series are sampled evenly
+EXPLAINER_CACHE = ModelCache(maxsize=MODEL_CACHE_SIZE, ttl=MODEL_CACHE_TTL)  # Tree explainers per fitted model
+HTML_CACHE = ModelCache(maxsize=256, ttl=MODEL_CACHE_TTL)  # Rendered ELI5 explanations
+
+
+def get_explainer(model, key):
+    """
+    Return the SHAP tree explainer for a fitted model, building it on first use.
+    Args:
+        model (XGBRegressor): Fitted model.
+        key (str): Cache key of the model (see series_key).
+    Returns:
+        shap.TreeExplainer: Explainer reused for every call on the same model.
+    """
+    def build():
+        with stage('shap', step='explainer'):
+            return shap.TreeExplainer(model)
+    return EXPLAINER_CACHE.get_or_fit(key, build)
+
+
+def explain_windows(explainer, windows):
+    """
+    SHAP values of many feature windows in one vectorized call.
+    Args:
+        explainer (shap.TreeExplainer): Explainer of the model.
+        windows (np.array): N x window matrix of lagged prices.
+    Returns:
+        tuple: (N x window SHAP values, base value).
+    """
+    with stage('shap'):
+        values = np.asarray(explainer.shap_values(np.ascontiguousarray(windows, dtype=float)))
+    return values.reshape(len(windows), -1), float(np.ravel(explainer.expected_value)[0])
+
+
+def feature_importance(values, feature_names):
     """
-    Train XGBoost on price series and return SHAP values and ELI5 explanation for the last prediction.
+    Global aggregates of per-window SHAP values.
+    Args:
+        values (np.array): N x window SHAP values.
+        feature_names (list): One name per column.
+    Returns:
+        dict: Per feature 'mean_abs' (average impact) and 'mean' (average direction),
+        plus the features ranked by mean_abs.
+    """
+    mean_abs = np.abs(values).mean(axis=0)
+    mean = values.mean(axis=0)
+    return {
+        'mean_abs': dict(zip(feature_names, mean_abs.tolist())),
+        'mean': dict(zip(feature_names, mean.tolist())),
+        'ranking': [feature_names[i] for i in np.argsort(-mean_abs)]
+    }
+
+
+def render_eli5(model, key, last_window, feature_names):
+    """Render the ELI5 HTML explanation of one window, cached per model and window."""
+    html_key = series_key(last_window, 'eli5', model=key)
+
+    def render():
+        try:
+            with stage('eli5'):
+                explanation = eli5.explain_prediction(model, last_window, feature_names=feature_names)
+                return eli5.format_as_html(explanation)
+        except Exception as e:
+            return f'ELI5 explanation error: {e}'
+    return HTML_CACHE.get_or_fit(html_key, render)
+
+
+def explain_xgboost_forecast(prices, steps=5, window=5, scope='last', html=True):
+    """
+    Explain XGBoost forecasts on a price series with SHAP (and optionally ELI5).
+    The fitted model and its tree explainer are cached, so repeated calls only pay for
+    the SHAP values themselves.
     Args:
         prices (list): Historical prices.
         steps (int): Number of forecast steps.
         window (int): Feature window size.
+        scope (str): 'last' explains the window after the last price; 'horizons' the
+            input window of every recursive forecast step; 'series' every historical
+            window (up to EXPLAIN_MAX_ROWS, sampled evenly).
+        html (bool): Also render the ELI5 HTML explanation of the last window.
     Returns:
-        dict: SHAP values and ELI5 HTML explanation.
-    """
-    X, y = [], []
-    for i in range(len(prices) - window):
-        X.append(prices[i:i+window])
-        y.append(prices[i+window])
-    X, y = np.array(X), np.array(y)
-    model = xgb.XGBRegressor(objective='reg:squarederror')
-    model.fit(X, y)
-    last_window = np.array(prices[-window:]).reshape(1, -1)
-    # SHAP explanation
-    explainer = shap.Explainer(model)
-    shap_values = explainer(last_window)
-    # ELI5 explanation
-    try:
-        explanation = eli5.explain_prediction(model, last_window[0], feature_names=[f'lag_{i+1}' for i in range(window)])
-        html_str = eli5.format_as_html(explanation)
-    except Exception as e:
-        html_str = f'ELI5 explanation error: {e}'
-    return {
-        'shap_values': shap_values.values.tolist() if hasattr(shap_values, 'values') else [],
-        'eli5_html': html_str
-    } 
\ No newline at end of file
+        dict: 'shap_values' (one row per explained window), 'base_value',
+        'feature_names', global 'importance' over the explained windows, and
+        'eli5_html' when html is set.
+    """
+    if scope not in SCOPES:
+        return {'error': f"Unknown scope: {scope} (expected one of {', '.join(SCOPES)})"}
+    if steps < 1 or window < 1:
+        return {'error': 'Steps and window must be at least 1'}
+    prices = np.asarray(prices, dtype=float)
+    if len(prices) < window + 1:
+        return {'error': f'At least {window + 1} prices are required'}
+    # Shares fitted models with xgboost_forecast through the model cache
+    key = series_key(prices, 'xgboost', window=window)
+    model = cached_fit('xgboost', fit_xgboost, prices, window=window)
+    explainer = get_explainer(model, key)
+    feature_names = [f'lag_{i+1}' for i in range(window)]
+    last_window = prices[-window:]
+    if scope == 'last':
+        windows = last_window.reshape(1, -1)
+    elif scope == 'horizons':
+        path = np.concatenate([last_window, predict_xgboost(model, prices, steps, window)])
+        windows = np.lib.stride_tricks.sliding_window_view(path, window)[:steps]
+    else:
+        X, _ = lag_features(prices, window)
+        windows = np.vstack([X, last_window])
+        if len(windows) > EXPLAIN_MAX_ROWS:
+            windows = windows[np.linspace(0, len(windows) - 1, EXPLAIN_MAX_ROWS).astype(int)]
+    values, base_value = explain_windows(explainer, windows)
+    result = {
+        'shap_values': values.tolist(),
+        'base_value': base_value,
+        'feature_names': feature_names,
+        'importance': feature_importance(values, feature_names)
+    }
+    if html:
+        result['eli5_html'] = render_eli5(model, key, last_window, feature_names)
+    return result
@@ -1,23 +1,158 @@
 import numpy as np
 import pandas as pd
-from statsmodels.tsa.arima.model import ARIMA
-from prophet import Prophet
-import xgboost as xgb
+from lazy import lazy_import
+from cache import ModelCache, series_key
+from metrics import stage
 
-def arima_forecast(prices, steps=5):
+arima_model = lazy_import('statsmodels.tsa.arima.model')
+prophet = lazy_import('prophet')
+xgb = lazy_import('xgboost')
+
+MODEL_CACHE_SIZE = 128  # Max fitted models kept in memory
+MODEL_CACHE_TTL = 3600  # Seconds before a fitted model is refit
+MODEL_CACHE = ModelCache(maxsize=MODEL_CACHE_SIZE, ttl=MODEL_CACHE_TTL)
+
+def cached_fit(method, fit, prices, **params):
+    """
+    Fit a model through the shared model cache.
+    Args:
+        method (str): Model name used in the cache key.
+        fit (callable): Fit function called as fit(prices, **params) on a miss.
+        prices (list or np.array): Historical prices.
+        **params: Hyperparameters that change the fitted model.
+    Returns:
+        object: Fitted model.
+    """
+    key = series_key(prices, method, **params)
+    def timed_fit():
+        with stage('fit', method=method):
+            return fit(prices, **params)
+    return MODEL_CACHE.get_or_fit(key, timed_fit)
+
+def fit_arima(prices, order=(1,1,1)):
+    """
+    Fit an ARIMA model.
+    Args:
+        prices (list or np.array): Historical prices.
+        order (tuple): ARIMA (p, d, q) order.
+    Returns:
+        ARIMAResults: Fitted model.
+    """
+    return arima_model.ARIMA(prices, order=order).fit()
+
+def fit_prophet(prices):
+    """
+    Fit a Prophet model on a daily index starting 2020-01-01.
+    Args:
+        prices (list or np.array): Historical prices.
+    Returns:
+        Prophet: Fitted model.
+    """
+    df = pd.DataFrame({'ds': pd.date_range(start='2020-01-01', periods=len(prices), freq='D'), 'y': prices})
+    model = prophet.Prophet()
+    model.fit(df)
+    return model
+
+def lag_features(prices, window=5, horizon=1):
+    """
+    Build lag features and targets as strided views, without copying the series.
+    Args:
+        prices (list or np.array): Historical prices.
+        window (int): Number of lagged prices per row.
+        horizon (int): Number of future prices per target row.
+    Returns:
+        tuple: (X, y) with X of shape (n, window) and y of shape (n,) for horizon 1,
+        otherwise (n, horizon), where n = len(prices) - window - horizon + 1.
+    """
+    prices = np.asarray(prices, dtype=float)
+    X = np.lib.stride_tricks.sliding_window_view(prices[:len(prices) - horizon], window)
+    y = np.lib.stride_tricks.sliding_window_view(prices[window:], horizon)
+    return X, (y[:, 0] if horizon == 1 else y)
+
+def fit_xgboost(prices, window=5, horizon=1):
+    """
+    Fit an XGBoost regressor predicting the next `horizon` prices from the previous `window` prices.
+    Args:
+        prices (list or np.array): Historical prices.
+        window (int): Window size for features.
+        horizon (int): Prices predicted per row (one output per step for horizon > 1).
+    Returns:
+        XGBRegressor: Fitted model.
+    """
+    X, y = lag_features(prices, window, horizon)
+    model = xgb.XGBRegressor(objective='reg:squarederror')
+    model.fit(X, y)
+    return model
+
+def fit_global_xgboost(series_list, window=5, horizon=1):
+    """
+    Fit one XGBoost model on the windows of many series at once.
+    Every window and its targets are divided by the window's last price, so series on
+    different price scales share one model of relative moves.
+    Args:
+        series_list (list): One price series per ticker.
+        window (int): Window size for features.
+        horizon (int): Prices predicted per row.
+    Returns:
+        XGBRegressor: Fitted model.
+    """
+    features, targets = [], []
+    for prices in series_list:
+        if len(prices) < window + horizon:
+            continue
+        X, y = lag_features(prices, window, horizon)
+        scale = X[:, -1:]
+        features.append(X / scale)
+        targets.append(y.reshape(len(X), horizon) / scale)
+    X, y = np.concatenate(features), np.concatenate(targets)
+    model = xgb.XGBRegressor(objective='reg:squarederror')
+    model.fit(X, y[:, 0] if horizon == 1 else y)
+    return model
+
+def predict_arima(model, steps=5):
+    """Forecast `steps` prices from a fitted ARIMA model."""
+    return model.forecast(steps=steps).tolist()
+
+def predict_prophet(model, steps=5):
+    """Forecast `steps` daily prices past the end of a fitted Prophet model's history."""
+    future = model.make_future_dataframe(periods=steps)
+    return model.predict(future)['yhat'][-steps:].tolist()
+
+def predict_xgboost(model, prices, steps=5, window=5, direct=False):
+    """
+    Forecast `steps` prices from a fitted XGBoost model and the last `window` prices.
+    Args:
+        model (XGBRegressor): Model from fit_xgboost (horizon=steps when direct).
+        prices (list or np.array): Historical prices.
+        steps (int): Number of periods to forecast.
+        window (int): Window size for features.
+        direct (bool): Model predicts all steps at once instead of one step at a time.
+    Returns:
+        list: Forecasted prices.
+    """
+    if direct:
+        last_window = np.asarray(prices[-window:], dtype=float).reshape(1, -1)
+        return np.ravel(model.predict(last_window))[:steps].astype(float).tolist()
+    buffer = np.empty(window + steps)
+    buffer[:window] = prices[-window:]
+    for i in range(steps):
+        buffer[window + i] = model.predict(buffer[i:i + window].reshape(1, -1))[0]
+    return buffer[window:].tolist()
+
+def arima_forecast(prices, steps=5, order=(1,1,1)):
     """
     Forecast future prices using ARIMA model.
     Args:
         prices (list or np.array): Historical prices.
         steps (int): Number of periods to forecast.
+        order (tuple): ARIMA (p, d, q) order.
     Returns:
         list: Forecasted prices.
     """
     try:
-        model = ARIMA(prices, order=(1,1,1))
-        model_fit = model.fit()
-        forecast = model_fit.forecast(steps=steps)
-        return forecast.tolist()
+        model_fit = cached_fit('arima', fit_arima, prices, order=tuple(order))
+        with stage('predict', method='arima'):
+            return predict_arima(model_fit, steps)
     except Exception as e:
         return [float(prices[-1])] * steps
 
@@ -43,39 +178,57 @@ def prophet_forecast(prices, steps=5):
         list: Forecasted prices.
     """
     try:
-        df = pd.DataFrame({'ds': pd.date_range(start='2020-01-01', periods=len(prices), freq='D'), 'y': prices})
-        model = Prophet()
-        model.fit(df)
-        future = model.make_future_dataframe(periods=steps)
-        forecast = model.predict(future)
-        return forecast['yhat'][-steps:].tolist()
+        model = cached_fit('prophet', fit_prophet, prices)
+        with stage('predict', method='prophet'):
+            return predict_prophet(model, steps)
     except Exception as e:
         return [float(prices[-1])] * steps
 
-def xgboost_forecast(prices, steps=5, window=5):
+def xgboost_forecast(prices, steps=5, window=5, strategy='recursive'):
     """
     Forecast future prices using XGBoost regression.
     Args:
         prices (list or np.array): Historical prices.
         steps (int): Number of periods to forecast.
         window (int): Window size for features.
+        strategy (str): 'recursive' feeds each one-step prediction back as a lag;
+            'direct' fits one output per horizon and predicts all steps in one call.
     Returns:
         list: Forecasted prices.
     """
     try:
-        X, y = [], []
-        for i in range(len(prices) - window):
-            X.append(prices[i:i+window])
-            y.append(prices[i+window])
-        X, y = np.array(X), np.array(y)
-        model = xgb.XGBRegressor(objective='reg:squarederror')
-        model.fit(X, y)
-        last_window = prices[-window:]
-        preds = []
-        for _ in range(steps):
-            pred = model.predict(np.array(last_window).reshape(1, -1))[0]
-            preds.append(pred)
-            last_window = np.append(last_window[1:], pred)
-        return preds
+        if strategy == 'direct':
+            model = cached_fit('xgboost', fit_xgboost, prices, window=window, horizon=steps)
+            with stage('predict', method='xgboost'):
+                return predict_xgboost(model, prices, steps, window, direct=True)
+        model = cached_fit('xgboost', fit_xgboost, prices, window=window)
+        with stage('predict', method='xgboost'):
+            return predict_xgboost(model, prices, steps, window)
     except Exception as e:
-        return [float(prices[-1])] * steps 
\ No newline at end of file
+        return [float(prices[-1])] * steps
+
+def xgboost_forecast_many(series_list, steps=5, window=5):
+    """
+    Forecast many series with one global direct multi-horizon model.
+    Args:
+        series_list (list): One price series per ticker.
+        steps (int): Number of periods to forecast.
+        window (int): Window size for features.
+    Returns:
+        list: Forecasted prices per series (a flat last-price forecast for series
+        shorter than `window`).
+    """
+    usable = [i for i, prices in enumerate(series_list) if len(prices) >= window]
+    forecasts = [[float(prices[-1])] * steps if len(prices) else [] for prices in series_list]
+    if not usable:
+        return forecasts
+    try:
+        model = fit_global_xgboost(series_list, window=window, horizon=steps)
+    except ValueError:
+        return forecasts
+    last_windows = np.array([np.asarray(series_list[i][-window:], dtype=float) for i in usable])
+    scale = last_windows[:, -1:]
+    preds = model.predict(last_windows / scale).reshape(len(usable), steps) * scale
+    for i, row in zip(usable, preds):
+        forecasts[i] = row.astype(float).tolist()
+    return forecasts
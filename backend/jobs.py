@@ -0,0 +1,148 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+JOB_WORKERS = 2  # Worker processes for background fits
+MAX_PENDING_JOBS = 32  # Queued + running jobs accepted before new submissions are refused
+JOB_RETENTION = 3600  # Seconds finished jobs stay available for polling
+
+
+class QueueFull(Exception):
+    """Raised when the job queue already holds its maximum number of unfinished jobs."""
+
+
+def _timed_call(fn, args, kwargs):
+    # Runs in the worker process so the measured runtime excludes queueing
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+class JobQueue:
+    """
+    Bounded queue of background jobs executed on a process pool.
+    Args:
+        max_workers (int): Worker processes.
+        max_pending (int): Maximum unfinished (queued or running) jobs.
+        retention (float): Seconds finished jobs are kept for polling.
+    """
+
+    def __init__(self, max_workers=JOB_WORKERS, max_pending=MAX_PENDING_JOBS, retention=JOB_RETENTION):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.retention = retention
+        self._pool = None
+        self._jobs = {}
+        self._runtimes = {}
+        self._lock = threading.Lock()
+
+    def _executor(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._pool
+
+    def submit(self, label, fn, *args, **kwargs):
+        """
+        Queue fn(*args, **kwargs) for background execution.
+        Args:
+            label (str): Method label used for runtime statistics (e.g. 'forecast:arima').
+            fn (callable): Picklable top-level function.
+        Returns:
+            str: Job id.
+        Raises:
+            QueueFull: If max_pending jobs are already unfinished.
+        """
+        with self._lock:
+            self._prune()
+            if sum(1 for job in self._jobs.values() if not job['future'].done()) >= self.max_pending:
+                raise QueueFull(f'Job queue is full ({self.max_pending} pending jobs)')
+            job_id = uuid.uuid4().hex
+            future = self._executor().submit(_timed_call, fn, args, kwargs)
+            self._jobs[job_id] = {'method': label, 'future': future, 'submitted_at': time.time(), 'finished_at': None}
+        future.add_done_callback(lambda f: self._finish(job_id, f))
+        return job_id
+
+    def _finish(self, job_id, future):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job['finished_at'] = time.time()
+            if future.cancelled() or future.exception() is not None:
+                return
+            runtime = future.result()[1]
+            stats = self._runtimes.setdefault(job['method'], {'count': 0, 'total_seconds': 0.0, 'max_seconds': 0.0})
+            stats['count'] += 1
+            stats['total_seconds'] += runtime
+            stats['max_seconds'] = max(stats['max_seconds'], runtime)
+
+    def _prune(self):
+        cutoff = time.time() - self.retention
+        for job_id in [j for j, job in self._jobs.items() if job['finished_at'] and job['finished_at'] < cutoff]:
+            del self._jobs[job_id]
+
+    def status(self, job_id):
+        """
+        Report a job's state and, once finished, its result or error.
+        Args:
+            job_id (str): Job id returned by submit.
+        Returns:
+            dict: 'id', 'method', 'status' (queued/running/done/failed/cancelled),
+            'submitted_at', plus 'result' and 'runtime' or 'error'; None if unknown.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        future = job['future']
+        info = {'id': job_id, 'method': job['method'], 'submitted_at': job['submitted_at']}
+        if future.cancelled():
+            info['status'] = 'cancelled'
+        elif future.done():
+            error = future.exception()
+            if error is not None:
+                info['status'] = 'failed'
+                info['error'] = str(error)
+            else:
+                info['status'] = 'done'
+                info['result'], info['runtime'] = future.result()
+        else:
+            info['status'] = 'running' if future.running() else 'queued'
+        return info
+
+    def cancel(self, job_id):
+        """
+        Cancel a job that has not started yet.
+        Args:
+            job_id (str): Job id.
+        Returns:
+            bool: True if the job was cancelled, False if unknown, running or finished.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+        return job is not None and job['future'].cancel()
+
+    def stats(self):
+        """
+        Report queue depth and per-method runtimes.
+        Returns:
+            dict: 'queued', 'running', 'max_pending', 'workers' and 'methods'
+            ({method: {'count', 'mean_seconds', 'max_seconds'}}).
+        """
+        with self._lock:
+            futures = [job['future'] for job in self._jobs.values()]
+            runtimes = {m: dict(s) for m, s in self._runtimes.items()}
+        running = sum(1 for f in futures if f.running())
+        pending = sum(1 for f in futures if not f.done())
+        methods = {
+            m: {'count': s['count'], 'mean_seconds': s['total_seconds'] / s['count'], 'max_seconds': s['max_seconds']}
+            for m, s in runtimes.items()
+        }
+        return {'queued': pending - running, 'running': running, 'max_pending': self.max_pending,
+                'workers': self.max_workers, 'methods': methods}
+
+    def shutdown(self, wait=True):
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,93 @@
+import importlib
+import threading
+import time
+
+_IMPORT_TIMES = {}
+_LOCK = threading.Lock()
+
+
+class LazyModule:
+    """
+    Module proxy that defers the real import until an attribute is first accessed.
+    Args:
+        name (str): Dotted module name, e.g. 'statsmodels.tsa.arima.model'.
+    """
+
+    def __init__(self, name):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+
+    def _load(self):
+        module = self.__dict__['_module']
+        if module is not None:
+            return module
+        with _LOCK:
+            module = self.__dict__['_module']
+            if module is None:
+                start = time.perf_counter()
+                module = importlib.import_module(self._name)
+                _IMPORT_TIMES[self._name] = time.perf_counter() - start
+                self.__dict__['_module'] = module
+        return module
+
+    @property
+    def loaded(self):
+        return self.__dict__['_module'] is not None
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __repr__(self):
+        state = 'loaded' if self.loaded else 'not loaded'
+        return f"<LazyModule '{self._name}' ({state})>"
+
+
+_REGISTRY = {}
+
+
+def lazy_import(name):
+    """
+    Return a shared lazy proxy for a module.
+    Args:
+        name (str): Dotted module name.
+    Returns:
+        LazyModule: Proxy that imports the module on first attribute access.
+    """
+    with _LOCK:
+        proxy = _REGISTRY.get(name)
+        if proxy is None:
+            proxy = _REGISTRY[name] = LazyModule(name)
+    return proxy
+
+
+def warm_up(names=None):
+    """
+    Preload lazily imported modules so the first request does not pay for them.
+    Args:
+        names (list, optional): Module names to load; defaults to every registered module.
+    Returns:
+        dict: Import report (see import_report).
+    """
+    if names is None:
+        names = list(_REGISTRY)
+    for name in names:
+        name = name.strip()
+        if name:
+            lazy_import(name)._load()
+    return import_report()
+
+
+def import_report():
+    """
+    Report which lazy modules are loaded and what each one cost to import.
+    Returns:
+        dict: {'modules': {name: {'loaded': bool, 'seconds': float or None}}, 'total_seconds': float}
+    """
+    with _LOCK:
+        names = sorted(_REGISTRY)
+        times = dict(_IMPORT_TIMES)
+    modules = {name: {'loaded': name in times, 'seconds': times.get(name)} for name in names}
+    return {'modules': modules, 'total_seconds': sum(times.values())}
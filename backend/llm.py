@@ -1,41 +1,215 @@
-import openai
-import sys
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from cache import DiskCache
+from metrics import stage
 
-OPENAI_API_KEY = 'YOUR_OPENAI_API_KEY'  # Replace with your OpenAI API key
-openai.api_key = OPENAI_API_KEY
+OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY', 'YOUR_OPENAI_API_KEY')  # Replace with your OpenAI API key
+# OpenAI-compatible API root, e.g. http://localhost:8001/v1 for backend/mock_llm.py
+LLM_BASE_URL = os.environ.get('OPENAI_BASE_URL', 'https://api.openai.com/v1')
+LLM_MODEL = 'gpt-3.5-turbo'
+LLM_TIMEOUT = (5, 60)  # Connect and read timeouts in seconds
+LLM_MAX_RETRIES = 3  # Retries on connection errors, 429 and 5xx responses
+LLM_RETRY_BACKOFF = 0.5  # Seconds; doubles after every failed attempt
+LLM_MAX_CONCURRENCY = 4  # Completion requests in flight at once, across all callers
+SYSTEM_PROMPT = 'Summarize the following financial text for an investor.'
+BATCH_PROMPT = ('Summarize each numbered financial text below for an investor in one sentence. '
+                'Reply with only a JSON array of strings, one summary per text, in the same order.')
+SHORT_TEXT_CHARS = 300  # Texts up to this length (e.g. headlines) are packed into shared requests
+MAX_BATCH_ITEMS = 20  # Texts packed into one request
+MAX_BATCH_CHARS = 4000  # Characters of text packed into one request
+BATCH_TOKENS_PER_ITEM = 48  # Completion tokens allowed per packed text
+SUMMARY_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'summaries')
+SUMMARY_CACHE_TTL = 30 * 24 * 3600  # Seconds a cached summary is reused
 
-def summarize_text(text, max_tokens=128):
+SUMMARY_CACHE = DiskCache(SUMMARY_CACHE_DIR, SUMMARY_CACHE_TTL)
+_client = None
+_client_lock = threading.Lock()
+
+
+class CompletionClient:
+    """
+    Chat completion client with a pooled session, timeouts, retries with backoff and a
+    cap on concurrent requests.
+    Args:
+        base_url (str): OpenAI-compatible API root.
+        api_key (str): Bearer token.
+        model (str): Model name.
+        timeout (tuple): Connect and read timeouts in seconds.
+        max_retries (int): Retries on connection errors, 429 and 5xx responses.
+        max_concurrency (int): Requests in flight at once; further callers wait.
+    """
+
+    def __init__(self, base_url=LLM_BASE_URL, api_key=OPENAI_API_KEY, model=LLM_MODEL, timeout=LLM_TIMEOUT,
+                 max_retries=LLM_MAX_RETRIES, max_concurrency=LLM_MAX_CONCURRENCY):
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+        self.model = model
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        retry = Retry(total=max_retries, backoff_factor=LLM_RETRY_BACKOFF, status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=('POST',))
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+
+    def complete(self, system, text, max_tokens=128, temperature=0.5):
+        """
+        Request one chat completion.
+        Args:
+            system (str): System prompt.
+            text (str): User message.
+            max_tokens (int): Max tokens in the completion.
+            temperature (float): Sampling temperature.
+        Returns:
+            str: Completion text.
+        Raises:
+            requests.RequestException: If the request still fails after retries.
+        """
+        payload = {
+            'model': self.model,
+            'messages': [{'role': 'system', 'content': system}, {'role': 'user', 'content': text}],
+            'max_tokens': max_tokens,
+            'temperature': temperature
+        }
+        with self._slots, stage('llm'):
+            response = self.session.post(f'{self.base_url}/chat/completions', json=payload, timeout=self.timeout,
+                                         headers={'Authorization': f'Bearer {self.api_key}'})
+        response.raise_for_status()
+        return response.json()['choices'][0]['message']['content'].strip()
+
+
+def get_client():
+    """Return the shared completion client, creating it on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = CompletionClient()
+        return _client
+
+
+def set_client(client):
     """
-    Summarize the given text using OpenAI GPT-3/4 API.
+    Replace the shared completion client (e.g. with one pointed at a mock server).
+    Args:
+        client (CompletionClient): Client used by summarize_text and summarize_batch.
+    """
+    global _client
+    with _client_lock:
+        _client = client
+
+
+def _cache_key(text, model, max_tokens):
+    return ['summary', model, max_tokens, hashlib.sha256(text.encode()).hexdigest()]
+
+
+def _pack(texts):
+    """Group short texts into batches within MAX_BATCH_ITEMS and MAX_BATCH_CHARS; long texts go alone."""
+    batches, current, size = [], [], 0
+    for text in texts:
+        if len(text) > SHORT_TEXT_CHARS:
+            batches.append([text])
+            continue
+        if current and (len(current) == MAX_BATCH_ITEMS or size + len(text) > MAX_BATCH_CHARS):
+            batches.append(current)
+            current, size = [], 0
+        current.append(text)
+        size += len(text)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _parse_batch(content, count):
+    """Return the JSON array of count strings in a batch completion, or None if it has none."""
+    start, end = content.find('['), content.rfind(']')
+    try:
+        summaries = json.loads(content[start:end + 1]) if 0 <= start < end else None
+    except ValueError:
+        return None
+    if not isinstance(summaries, list) or len(summaries) != count or not all(isinstance(s, str) for s in summaries):
+        return None
+    return [s.strip() for s in summaries]
+
+
+def _summarize_one(client, text, max_tokens):
+    try:
+        return client.complete(SYSTEM_PROMPT, text, max_tokens), True
+    except Exception as e:
+        return f'Error: {e}', False
+
+
+def _summarize_packed(client, texts, max_tokens):
+    """Summarize a batch in one request; falls back to one request per text if the reply is malformed."""
+    if len(texts) == 1:
+        return [_summarize_one(client, texts[0], max_tokens)]
+    prompt = '\n'.join(f'{i}. {" ".join(text.split())}' for i, text in enumerate(texts, 1))
+    try:
+        content = client.complete(BATCH_PROMPT, prompt, min(max_tokens, BATCH_TOKENS_PER_ITEM) * len(texts))
+    except Exception as e:
+        return [(f'Error: {e}', False)] * len(texts)
+    summaries = _parse_batch(content, len(texts))
+    if summaries is None:
+        return [_summarize_one(client, text, max_tokens) for text in texts]
+    return [(summary, True) for summary in summaries]
+
+
+def summarize_batch(texts, max_tokens=128, client=None, cache=None):
+    """
+    Summarize many texts, reusing cached summaries and packing short texts (such as
+    headlines) into shared completion requests that run concurrently.
+    Args:
+        texts (list): Texts to summarize.
+        max_tokens (int): Max tokens per summary.
+        client (CompletionClient, optional): Client to use (default the shared one).
+        cache (DiskCache, optional): Summary cache keyed by a hash of model, max_tokens
+            and text (default SUMMARY_CACHE).
+    Returns:
+        list: One summary (or 'Error: ...' message) per text, in input order.
+    """
+    client = client or get_client()
+    cache = SUMMARY_CACHE if cache is None else cache
+    summaries = {}
+    for text in dict.fromkeys(texts):
+        cached = cache.get(_cache_key(text, client.model, max_tokens))
+        if cached is not None:
+            summaries[text] = cached
+    missing = [text for text in dict.fromkeys(texts) if text not in summaries]
+    batches = _pack(missing)
+    if batches:
+        with ThreadPoolExecutor(max_workers=min(client.max_concurrency, len(batches))) as pool:
+            for batch, results in zip(batches, pool.map(lambda b: _summarize_packed(client, b, max_tokens), batches)):
+                for text, (summary, ok) in zip(batch, results):
+                    summaries[text] = summary
+                    if ok:
+                        cache.set(_cache_key(text, client.model, max_tokens), summary)
+    return [summaries[text] for text in texts]
+
+
+def summarize_text(text, max_tokens=128, client=None, cache=None):
+    """
+    Summarize the given text with an OpenAI-compatible chat completion API.
     Args:
         text (str): Text to summarize.
         max_tokens (int): Max tokens for summary.
+        client (CompletionClient, optional): Client to use (default the shared one).
+        cache (DiskCache, optional): Summary cache (default SUMMARY_CACHE).
     Returns:
         str: Summary text or error message.
     """
-    try:
-        ChatCompletion = getattr(openai, 'ChatCompletion', None)
-        if ChatCompletion:
-            response = ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[{"role": "system", "content": "Summarize the following financial text for an investor."},
-                          {"role": "user", "content": text}],
-                max_tokens=max_tokens,
-                temperature=0.5
-            )
-            return response.choices[0].message['content'].strip()
-        else:
-            Completion = getattr(openai, 'Completion', None)
-            if Completion:
-                prompt = f"Summarize the following financial text for an investor:\n{text}"
-                response = Completion.create(
-                    engine="text-davinci-003",
-                    prompt=prompt,
-                    max_tokens=max_tokens,
-                    temperature=0.5
-                )
-                return response.choices[0].text.strip()
-            else:
-                return "OpenAI API does not support completion methods."
-    except Exception as e:
-        return f"Error: {e}" 
\ No newline at end of file
+    client = client or get_client()
+    cache = SUMMARY_CACHE if cache is None else cache
+    key = _cache_key(text, client.model, max_tokens)
+    summary = cache.get(key)
+    if summary is None:
+        summary, ok = _summarize_one(client, text, max_tokens)
+        if ok:
+            cache.set(key, summary)
+    return summary
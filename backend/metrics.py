@@ -0,0 +1,120 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels, extra=None):
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in items) + '}'
+
+
+class MetricsRegistry:
+    """
+    In-process counters and latency histograms rendered in Prometheus text format.
+    Recording is a dict lookup, a bisect and a few additions under one lock, so it is
+    cheap enough to leave on for every request.
+    Args:
+        buckets (tuple): Histogram bucket upper bounds in seconds.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._help = {}
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name, kind, help_text):
+        """Register the TYPE ('counter' or 'histogram') and HELP text of a metric."""
+        self._help[name] = (kind, help_text)
+
+    def inc(self, name, amount=1, **labels):
+        """Add amount to a counter."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        """Record one observation (in seconds) in a histogram."""
+        key = (name, tuple(sorted(labels.items())))
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            hist[0][index] += 1
+            hist[1] += value
+
+    @contextmanager
+    def time(self, name, **labels):
+        """Context manager observing the duration of its block in a histogram."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def render(self):
+        """
+        Render all metrics in the Prometheus text exposition format.
+        Returns:
+            str: Exposition text.
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {k: (list(v[0]), v[1]) for k, v in self._histograms.items()}
+        by_name = {}
+        for (name, labels), value in counters.items():
+            by_name.setdefault(name, []).append(f'{name}{_labels(labels)} {value}')
+        for (name, labels), (counts, total) in histograms.items():
+            lines = by_name.setdefault(name, [])
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{name}_bucket{_labels(labels, ("le", le))} {cumulative}')
+            lines.append(f'{name}_sum{_labels(labels)} {total}')
+            lines.append(f'{name}_count{_labels(labels)} {cumulative}')
+        out = []
+        for name in sorted(by_name):
+            if name in self._help:
+                kind, help_text = self._help[name]
+                out.append(f'# HELP {name} {help_text}')
+                out.append(f'# TYPE {name} {kind}')
+            out.extend(by_name[name])
+        return '\n'.join(out) + '\n'
+
+    def clear(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+REGISTRY = MetricsRegistry()
+REGISTRY.describe('http_requests_total', 'counter', 'HTTP requests handled, by route, method and status.')
+REGISTRY.describe('http_request_errors_total', 'counter', 'HTTP requests that raised or returned a 4xx/5xx status.')
+REGISTRY.describe('http_request_duration_seconds', 'histogram', 'HTTP request latency, by route and method.')
+REGISTRY.describe('stage_duration_seconds', 'histogram',
+                  'Latency of internal stages (validate, fit, predict, shap, fetch, llm, serialize).')
+
+
+def stage(name, **labels):
+    """
+    Time an internal stage of request handling.
+    Args:
+        name (str): Stage name, e.g. 'fit' or 'fetch'.
+        **labels: Extra labels, e.g. method='arima'.
+    Returns:
+        context manager: Observes the block's duration in stage_duration_seconds.
+    """
+    return REGISTRY.time('stage_duration_seconds', stage=name, **labels)
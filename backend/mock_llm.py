@@ -0,0 +1,100 @@
+"""
+Local stand-in for an OpenAI-compatible chat completion server, for tests and offline development.
+
+Usage:
+    python backend/mock_llm.py --port 8001
+    OPENAI_BASE_URL=http://localhost:8001/v1 python backend/app.py
+"""
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def mock_summary(text):
+    """Deterministic 'summary': the first sentence of text, cut to 80 characters."""
+    return 'Summary: ' + re.split(r'(?<=[.!?])\s', text.strip(), maxsplit=1)[0][:80]
+
+
+class MockCompletionServer(ThreadingHTTPServer):
+    """
+    Chat completion server answering POST /v1/chat/completions with mock_summary of the
+    user message; numbered lists ("1. ...") get a JSON array with one summary per item.
+    Args:
+        port (int): Port to listen on (0 picks a free one).
+        delay (float): Seconds to wait before answering each request.
+        fail_first (int): Number of initial requests answered with 503.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, port=0, delay=0.0, fail_first=0):
+        super().__init__(('127.0.0.1', port), _Handler)
+        self.delay = delay
+        self.fail_first = fail_first
+        self.requests = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}/v1'
+
+    def start(self):
+        """Serve on a daemon thread; returns self."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+        with server._lock:
+            server.requests.append(body)
+            failing = len(server.requests) <= server.fail_first
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+        try:
+            time.sleep(server.delay)
+            if self.path.rstrip('/') != '/v1/chat/completions':
+                return self._send(404, {'error': {'message': 'Not found'}})
+            if failing:
+                return self._send(503, {'error': {'message': 'Overloaded'}})
+            text = body['messages'][-1]['content']
+            items = re.findall(r'^\d+\. (.*)$', text, flags=re.MULTILINE)
+            content = json.dumps([mock_summary(item) for item in items]) if items else mock_summary(text)
+            self._send(200, {'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}}]})
+        finally:
+            with server._lock:
+                server.active -= 1
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--delay', type=float, default=0.0, help='Seconds to wait before each answer')
+    args = parser.parse_args()
+    server = MockCompletionServer(args.port, args.delay)
+    print(f'Serving mock completions at {server.base_url}')
+    server.serve_forever()
@@ -0,0 +1,232 @@
+import importlib.util
+import io
+import json
+import numpy as np
+from lazy import lazy_import
+from metrics import stage
+
+orjson = lazy_import('orjson')
+msgpack = lazy_import('msgpack')
+pa = lazy_import('pyarrow')
+
+JSON = 'application/json'
+NPY = 'application/x-npy'
+MSGPACK = 'application/msgpack'
+ARROW = 'application/vnd.apache.arrow.stream'
+MEDIA_TYPES = (JSON, MSGPACK, ARROW, NPY)  # Response types in order of preference for */*
+ALIASES = {'application/x-msgpack': MSGPACK, 'application/octet-stream': NPY}
+EXT_NDARRAY = 1  # MessagePack extension type carrying an .npy-encoded array
+ARROW_METADATA_KEY = b'payload'  # Schema metadata holding the non-column fields as JSON
+HAS_ORJSON = importlib.util.find_spec('orjson') is not None
+
+
+class PayloadError(ValueError):
+    """Raised for a request body that cannot be decoded."""
+    status = 400
+
+
+class UnsupportedMediaType(PayloadError):
+    """Raised for a body or Accept type that is not supported (or needs a missing package)."""
+    status = 415
+
+
+def media_type(content_type):
+    """Normalize a Content-Type header to one of MEDIA_TYPES (JSON when empty)."""
+    mimetype = (content_type or JSON).split(';')[0].strip().lower()
+    return ALIASES.get(mimetype, mimetype)
+
+
+def _require(module, mimetype):
+    try:
+        return module._load()
+    except ImportError:
+        raise UnsupportedMediaType(f'{mimetype} support requires the {module._name} package') from None
+
+
+def _array_to_npy(array):
+    buffer = io.BytesIO()
+    np.lib.format.write_array(buffer, np.ascontiguousarray(array), allow_pickle=False)
+    return buffer.getvalue()
+
+
+def _npy_to_array(data):
+    return np.lib.format.read_array(io.BytesIO(data), allow_pickle=False)
+
+
+def _msgpack_default(value):
+    if isinstance(value, np.ndarray):
+        return msgpack.ExtType(EXT_NDARRAY, _array_to_npy(value))
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f'Cannot serialize {type(value).__name__}')
+
+
+def _msgpack_ext_hook(code, data):
+    if code == EXT_NDARRAY:
+        return _npy_to_array(data)
+    return msgpack.ExtType(code, data)
+
+
+def _numeric_array(value):
+    """Return value as a 1-D numeric array if it is an array or a list of numbers, else None."""
+    if isinstance(value, np.ndarray):
+        return value if value.ndim == 1 and value.dtype.kind in 'iuf' else None
+    if isinstance(value, list) and value and all(
+            isinstance(v, (int, float)) and not isinstance(v, bool) for v in value):
+        return np.asarray(value, dtype=np.float64)
+    return None
+
+
+def _arrow_column(column):
+    """Arrow column -> ndarray (numbers), list of ndarrays (list columns) or list (other)."""
+    column = column.combine_chunks() if hasattr(column, 'combine_chunks') else column
+    if pa.types.is_list(column.type) or pa.types.is_large_list(column.type):
+        offsets = column.offsets.to_numpy()
+        values = column.values.to_numpy(zero_copy_only=False)
+        return [values[start:stop] for start, stop in zip(offsets[:-1], offsets[1:])]
+    if pa.types.is_integer(column.type) or pa.types.is_floating(column.type):
+        return column.to_numpy(zero_copy_only=False)
+    return column.to_pylist()
+
+
+def decode_payload(body, content_type):
+    """
+    Decode a request body into the dict the analysis functions take. Binary formats
+    carry price series as typed buffers that become NumPy arrays without creating a
+    Python float per element.
+    Args:
+        body (bytes): Raw request body.
+        content_type (str): Content-Type header:
+            application/json (default);
+            application/x-npy: one array, returned as {'prices': array} (a 2-D array
+            becomes a list of rows, one series per row);
+            application/msgpack: a map whose arrays may be EXT_NDARRAY extension values;
+            application/vnd.apache.arrow.stream: one table; each column becomes a field
+            (list columns a list of arrays) and JSON schema metadata under
+            ARROW_METADATA_KEY adds the remaining fields.
+    Returns:
+        dict: Payload.
+    Raises:
+        UnsupportedMediaType: For other content types or a missing optional package.
+        PayloadError: If the body cannot be decoded.
+    """
+    mimetype = media_type(content_type)
+    if mimetype not in MEDIA_TYPES:
+        raise UnsupportedMediaType(f'Unsupported content type: {content_type}')
+    try:
+        return _decode(body, mimetype)
+    except PayloadError:
+        raise
+    except Exception as e:
+        raise PayloadError(f'Invalid {mimetype} body: {e}') from None
+
+
+def _decode(body, mimetype):
+    with stage('parse', format=mimetype.rsplit('/', 1)[-1]):
+        if mimetype == JSON:
+            payload = json_loads(body) if body else {}
+            if not isinstance(payload, dict):
+                raise PayloadError('JSON body must be an object')
+            return payload
+        if mimetype == NPY:
+            array = _npy_to_array(body)
+            return {'prices': list(array) if array.ndim == 2 else array}
+        if mimetype == MSGPACK:
+            _require(msgpack, mimetype)
+            payload = msgpack.unpackb(body, ext_hook=_msgpack_ext_hook, raw=False, strict_map_key=False)
+            if not isinstance(payload, dict):
+                raise PayloadError('MessagePack body must be a map')
+            return payload
+        if mimetype == ARROW:
+            _require(pa, mimetype)
+            table = pa.ipc.open_stream(body).read_all()
+            metadata = table.schema.metadata or {}
+            payload = json.loads(metadata[ARROW_METADATA_KEY]) if ARROW_METADATA_KEY in metadata else {}
+            for name in table.column_names:
+                payload[name] = _arrow_column(table.column(name))
+            return payload
+
+
+def encode_payload(result, mimetype):
+    """
+    Encode a response dict in a negotiated media type.
+    Args:
+        result (dict): Response fields (lists, arrays, scalars, nested dicts).
+        mimetype (str): One of MEDIA_TYPES:
+            application/x-npy: the result's only numeric array field (e.g. 'forecast');
+            application/msgpack: the whole dict, arrays as EXT_NDARRAY values;
+            application/vnd.apache.arrow.stream: one table whose columns are the array
+            fields of the most common length, the other fields in JSON schema metadata.
+    Returns:
+        bytes: Encoded body.
+    Raises:
+        UnsupportedMediaType: If the result cannot be represented in the media type or a
+            needed optional package is missing.
+    """
+    with stage('serialize', format=mimetype.rsplit('/', 1)[-1]):
+        if mimetype == JSON:
+            return json_dumps(result).encode()
+        if mimetype == NPY:
+            arrays = {k: a for k, a in ((k, _numeric_array(v)) for k, v in result.items()) if a is not None}
+            if len(arrays) != 1:
+                raise UnsupportedMediaType('An .npy response needs exactly one numeric array; '
+                                           'use msgpack or arrow for this endpoint')
+            return _array_to_npy(next(iter(arrays.values())))
+        if mimetype == MSGPACK:
+            _require(msgpack, mimetype)
+            return msgpack.packb(result, default=_msgpack_default, use_bin_type=True)
+        if mimetype == ARROW:
+            _require(pa, mimetype)
+            lengths = [len(v) for v in result.values() if isinstance(v, (list, np.ndarray))]
+            length = max(set(lengths), key=lengths.count) if lengths else None
+            columns = {k: v for k, v in result.items() if isinstance(v, (list, np.ndarray)) and len(v) == length}
+            rest = {k: v for k, v in result.items() if k not in columns}
+            table = pa.table({k: pa.array(v) for k, v in columns.items()})
+            table = table.replace_schema_metadata({ARROW_METADATA_KEY: json_dumps(rest)})
+            sink = pa.BufferOutputStream()
+            with pa.ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+            return sink.getvalue().to_pybytes()
+    raise UnsupportedMediaType(f'Unsupported response type: {mimetype}')
+
+
+def json_dumps(obj, indent=None, sort_keys=True, default=None):
+    """
+    Serialize to JSON with orjson when it is installed (NumPy arrays are written
+    directly from their buffers), falling back to the standard library.
+    Args:
+        obj: Value to serialize.
+        indent (int, optional): Pretty-print (orjson supports 2 spaces only).
+        sort_keys (bool): Sort dict keys.
+        default (callable, optional): Converter for values neither encoder handles
+            natively (dates and datetimes are always passed to it).
+    Returns:
+        str: JSON text.
+    """
+    def convert(value):
+        if isinstance(value, np.ndarray):
+            return value.tolist()
+        if isinstance(value, np.generic):
+            return value.item()
+        if default is not None:
+            return default(value)
+        raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+    if HAS_ORJSON:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        option |= (orjson.OPT_SORT_KEYS if sort_keys else 0) | (orjson.OPT_INDENT_2 if indent else 0)
+        try:
+            return orjson.dumps(obj, default=convert, option=option).decode()
+        except TypeError:
+            pass  # e.g. integers beyond 64 bits; use the standard library
+    return json.dumps(obj, default=convert, indent=indent, sort_keys=sort_keys)
+
+
+def json_loads(s):
+    """Parse JSON with orjson when installed; NaN/Infinity literals fall back to the standard library."""
+    if HAS_ORJSON:
+        try:
+            return orjson.loads(s)
+        except ValueError:
+            pass
+    return json.loads(s)
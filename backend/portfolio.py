@@ -0,0 +1,131 @@
+import numpy as np
+from lazy import lazy_import
+
+optimize = lazy_import('scipy.optimize')
+
+TRADING_DAYS = 252
+MAX_FRONTIER_POINTS = 200  # Risk aversions solved by one efficient frontier request
+
+
+class ShrunkCovariance:
+    """
+    Ledoit-Wolf covariance estimate shrunk towards a scaled identity.
+    The annualized estimate is stored in factored form Sigma = ridge * I + F'F, where F has
+    min(N, T) rows: the centered returns when there are more assets than observations,
+    otherwise the eigen-factor of the sample covariance. It is never formed as a dense
+    N x N matrix, so memory and cost grow with N * min(N, T).
+    Args:
+        returns (np.array): T x N matrix of periodic returns (rows = observations).
+        annualize (int): Periods per year used to scale mean and covariance.
+    """
+
+    def __init__(self, returns, annualize=TRADING_DAYS):
+        returns = np.asarray(returns, dtype=float)
+        t, n = returns.shape
+        self.n_obs, self.n_assets = t, n
+        self.mean = returns.mean(axis=0) * annualize
+        x = returns - returns.mean(axis=0)
+        row_sq = np.einsum('ij,ij->i', x, x)
+        if n <= t:
+            sample = x.T @ x / t
+            s_norm2 = np.sum(sample ** 2)
+            eigvals, eigvecs = np.linalg.eigh(sample)
+            base = np.sqrt(np.maximum(eigvals, 0))[:, np.newaxis] * eigvecs.T
+        else:
+            s_norm2 = np.sum((x @ x.T) ** 2) / t ** 2
+            base = x / np.sqrt(t)
+        target = row_sq.sum() / (t * n)
+        d2 = s_norm2 - n * target ** 2
+        b2 = max((np.sum(row_sq ** 2) - t * s_norm2) / t ** 2, 0.0)
+        self.shrinkage = float(min(b2, d2) / d2) if d2 > 0 else 1.0
+        self.ridge = max(annualize * self.shrinkage * target, 1e-12)
+        self.factor = np.sqrt(annualize * (1 - self.shrinkage)) * base
+
+    def dot(self, weights):
+        """
+        Multiply row vectors of weights by the annualized covariance.
+        Args:
+            weights (np.array): K x N matrix (one portfolio per row).
+        Returns:
+            np.array: K x N matrix of weights @ covariance.
+        """
+        return self.ridge * weights + (weights @ self.factor.T) @ self.factor
+
+    def dense(self):
+        """Return the annualized shrunk covariance as a dense N x N matrix."""
+        return self.dot(np.eye(self.n_assets))
+
+
+def project_simplex(v):
+    """
+    Euclidean projection of each row onto the probability simplex (w >= 0, sum(w) = 1).
+    Args:
+        v (np.array): K x N matrix.
+    Returns:
+        np.array: K x N matrix of projected rows.
+    """
+    u = -np.sort(-v, axis=1)
+    css = np.cumsum(u, axis=1) - 1
+    ind = np.arange(1, v.shape[1] + 1)
+    rho = np.sum(u - css / ind > 0, axis=1) - 1
+    theta = css[np.arange(v.shape[0]), rho] / (rho + 1)
+    return np.maximum(v - theta[:, np.newaxis], 0)
+
+
+def efficient_frontier(cov, risk_aversions, max_iter=500, tol=1e-10):
+    """
+    Solve long-only mean-variance problems for several risk aversions in one batch.
+    Maximizes mu'w - (risk_aversion / 2) w'Sigma w subject to w >= 0 and sum(w) = 1.
+    With Sigma = ridge * I + F'F, each problem has a smooth dual over u = F w whose
+    inner maximization is a simplex projection; all duals are stacked (each rescaled to
+    the same conditioning) and solved together with L-BFGS, sharing every product with F.
+    Args:
+        cov (ShrunkCovariance): Covariance estimate (supplies expected returns too).
+        risk_aversions (list): Positive risk aversion coefficients.
+        max_iter (int): Maximum L-BFGS iterations.
+        tol (float): Gradient tolerance.
+    Returns:
+        dict: 'weights' (K x N), 'expected_return' (K), 'volatility' (K), 'iterations'.
+    """
+    lam = np.maximum(np.asarray(risk_aversions, dtype=float), 1e-8)[:, np.newaxis]
+    factor, ridge = cov.factor, cov.ridge
+    shape = (lam.shape[0], factor.shape[0])
+    offset = cov.mean[np.newaxis, :] / (lam * ridge)
+
+    def primal(u):
+        v = offset - (u @ factor) / ridge
+        return v, project_simplex(v)
+
+    def dual(flat):
+        u = flat.reshape(shape)
+        v, w = primal(u)
+        value = 0.5 * np.sum(u * u) + ridge * np.sum(v * w - 0.5 * w * w)
+        grad = u - w @ factor.T
+        return value, grad.ravel()
+
+    result = optimize.minimize(dual, np.zeros(shape).ravel(), jac=True, method='L-BFGS-B',
+                               options={'maxiter': max_iter, 'gtol': tol, 'ftol': 1e-15})
+    weights = primal(result.x.reshape(shape))[1]
+    variance = np.einsum('ij,ij->i', cov.dot(weights), weights)
+    return {
+        'weights': weights,
+        'expected_return': weights @ cov.mean,
+        'volatility': np.sqrt(np.maximum(variance, 0)),
+        'iterations': int(result.nit)
+    }
+
+
+def align_returns(histories, kind='prices'):
+    """
+    Turn per-asset histories into a T x N return matrix over their common recent tail.
+    Args:
+        histories (list): One list of prices (or returns) per asset.
+        kind (str): 'prices' or 'returns'.
+    Returns:
+        np.array: T x N return matrix.
+    """
+    length = min(len(h) for h in histories)
+    matrix = np.array([np.asarray(h[len(h) - length:], dtype=float) for h in histories]).T
+    if kind == 'prices':
+        matrix = np.diff(matrix, axis=0) / matrix[:-1]
+    return matrix
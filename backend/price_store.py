@@ -0,0 +1,208 @@
+import os
+import re
+import threading
+
+import numpy as np
+
+STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.store')
+COLUMNS = ('date', 'open', 'high', 'low', 'close', 'volume')
+DTYPES = {'date': np.dtype('datetime64[s]'), 'open': np.dtype('<f8'), 'high': np.dtype('<f8'),
+          'low': np.dtype('<f8'), 'close': np.dtype('<f8'), 'volume': np.dtype('<f8')}
+MAGIC = b'FAIPRICE'
+HEADER_SIZE = 64
+MIN_CAPACITY = 1024
+_HEADER = np.dtype([('magic', 'S8'), ('rows', '<i8'), ('capacity', '<i8'), ('covered_from', '<i8')])
+_NO_DATE = np.iinfo(np.int64).min
+TICKER_PATTERN = re.compile(r'^[A-Z0-9.^=-]{1,20}$')  # Upper-cased symbols accepted as file names
+INTERVALS = ('1m', '2m', '5m', '15m', '30m', '60m', '90m', '1h', '1d', '5d', '1wk', '1mo', '3mo')  # yfinance bar intervals
+
+
+def validate_symbol(ticker, interval='1d'):
+    """
+    Check a ticker and interval before they are used in a store file name.
+    Args:
+        ticker (str): Ticker symbol (case-insensitive).
+        interval (str): Bar interval.
+    Raises:
+        ValueError: If the ticker has characters outside TICKER_PATTERN or the interval
+            is not one of INTERVALS.
+    """
+    if not isinstance(ticker, str) or not TICKER_PATTERN.match(ticker.upper()):
+        raise ValueError(f'Invalid ticker: {ticker!r}')
+    if interval not in INTERVALS:
+        raise ValueError(f"Invalid interval: {interval!r} (expected one of {', '.join(INTERVALS)})")
+
+
+class PriceStore:
+    """
+    On-disk OHLCV store with one columnar file per ticker and interval.
+    File layout: a 64-byte header (magic, row count, capacity, start date the data is
+    complete from) followed by one fixed-capacity block per column. Appends write into
+    spare capacity in place and bump the row count last; reads memory-map the file and
+    return zero-copy column views.
+    Args:
+        directory (str): Directory holding the column files.
+    """
+
+    def __init__(self, directory=STORE_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+
+    def path(self, ticker, interval='1d'):
+        validate_symbol(ticker, interval)
+        return os.path.join(self.directory, f'{ticker.upper()}_{interval}.bin')
+
+    def _header(self, path):
+        if not os.path.exists(path):
+            return None
+        header = np.fromfile(path, dtype=_HEADER, count=1)[0]
+        if header['magic'] != MAGIC:
+            raise ValueError(f'Not a price store file: {path}')
+        return header
+
+    def _columns(self, mm, rows, capacity):
+        offset = HEADER_SIZE
+        columns = {}
+        for name in COLUMNS:
+            columns[name] = mm[offset:offset + rows * 8].view(DTYPES[name])
+            offset += capacity * 8
+        return columns
+
+    def read(self, ticker, interval='1d', start=None, end=None):
+        """
+        Return memory-mapped column views, optionally restricted to a date range.
+        Only the date column is searched; the other columns are sliced without being read.
+        Args:
+            ticker (str): Ticker symbol.
+            interval (str): Bar interval.
+            start (str or datetime, optional): First date to include.
+            end (str or datetime, optional): Last date to include.
+        Returns:
+            dict: Column name -> read-only NumPy view (empty dict if the ticker is not stored).
+        """
+        path = self.path(ticker, interval)
+        header = self._header(path)
+        if header is None or header['rows'] == 0:
+            return {}
+        mm = np.memmap(path, dtype=np.uint8, mode='r')
+        columns = self._columns(mm, int(header['rows']), int(header['capacity']))
+        dates = columns['date']
+        lo = 0 if start is None else np.searchsorted(dates, np.datetime64(start, 's'), side='left')
+        hi = len(dates) if end is None else np.searchsorted(dates, np.datetime64(end, 's'), side='right')
+        return {name: col[lo:hi] for name, col in columns.items()}
+
+    def date_range(self, ticker, interval='1d'):
+        """
+        Return (covered_from, last_date) for a stored ticker, or (None, None).
+        covered_from is the start of the period the stored data is known to be complete from.
+        """
+        path = self.path(ticker, interval)
+        header = self._header(path)
+        if header is None or header['rows'] == 0:
+            return None, None
+        mm = np.memmap(path, dtype=np.uint8, mode='r')
+        last = self._columns(mm, int(header['rows']), int(header['capacity']))['date'][-1]
+        covered = header['covered_from']
+        covered = None if covered == _NO_DATE else np.datetime64(int(covered), 's')
+        return covered, last
+
+    def write(self, ticker, data, interval='1d', covered_from=None):
+        """
+        Replace a ticker's file with the given columns.
+        Args:
+            ticker (str): Ticker symbol.
+            data (dict): Column name -> array (dates sorted ascending).
+            interval (str): Bar interval.
+            covered_from (str or datetime, optional): Start of the period the data covers
+                completely (None if it goes back as far as the provider has data).
+        """
+        rows = len(data['date'])
+        capacity = max(MIN_CAPACITY, 1 << int(rows).bit_length())
+        with self._lock:
+            self._create(self.path(ticker, interval), data, rows, capacity, covered_from)
+
+    def append(self, ticker, data, interval='1d'):
+        """
+        Append bars from the last stored date on. A fetched bar dated at the last stored
+        one replaces it, so a bar stored while still forming (e.g. today's close during
+        market hours) is corrected by the next refresh; older bars are ignored.
+        Args:
+            ticker (str): Ticker symbol.
+            data (dict): Column name -> array (dates sorted ascending).
+            interval (str): Bar interval.
+        Returns:
+            int: Number of rows added (a replaced last row is not counted).
+        """
+        path = self.path(ticker, interval)
+        with self._lock:
+            header = self._header(path)
+            if header is None:
+                self._create(path, data, len(data['date']), max(MIN_CAPACITY, 1 << len(data['date']).bit_length()), None)
+                return len(data['date'])
+            rows, capacity = int(header['rows']), int(header['capacity'])
+            mm = np.memmap(path, dtype=np.uint8, mode='r+')
+            dates = np.asarray(data['date'], dtype=DTYPES['date'])
+            start = rows
+            if rows:
+                last = self._columns(mm, rows, capacity)['date'][-1]
+                keep = dates >= last
+                if keep.any() and dates[keep][0] == last:
+                    start = rows - 1
+            else:
+                keep = np.ones(len(dates), dtype=bool)
+            total = start + int(keep.sum())
+            if total == start:
+                return 0
+            if total > capacity:
+                # Grow by rewriting into a larger file; old readers keep their mapping
+                existing = {k: np.array(v[:start]) for k, v in self._columns(mm, rows, capacity).items()}
+                del mm
+                merged = {k: np.concatenate([existing[k], np.asarray(data[k], dtype=DTYPES[k])[keep]]) for k in COLUMNS}
+                covered = None if header['covered_from'] == _NO_DATE else np.datetime64(int(header['covered_from']), 's')
+                self._create(path, merged, total, 1 << total.bit_length(), covered)
+                return total - rows
+            offset = HEADER_SIZE
+            for name in COLUMNS:
+                values = np.asarray(data[name], dtype=DTYPES[name])[keep]
+                mm[offset + start * 8:offset + total * 8] = values.view(np.uint8)
+                offset += capacity * 8
+            mm.flush()
+            # Publish the new rows only after their values are on disk
+            mm[:HEADER_SIZE].view(_HEADER)['rows'][0] = total
+            mm.flush()
+            return total - rows
+
+    def _create(self, path, data, rows, capacity, covered_from):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = path + '.tmp'
+        mm = np.memmap(tmp, dtype=np.uint8, mode='w+', shape=(HEADER_SIZE + len(COLUMNS) * capacity * 8,))
+        header = mm[:HEADER_SIZE].view(_HEADER)
+        covered = _NO_DATE if covered_from is None else np.datetime64(covered_from, 's').astype(np.int64)
+        header[0] = (MAGIC, rows, capacity, covered)
+        offset = HEADER_SIZE
+        for name in COLUMNS:
+            values = np.asarray(data[name], dtype=DTYPES[name])[:rows]
+            mm[offset:offset + rows * 8] = values.view(np.uint8)
+            offset += capacity * 8
+        mm.flush()
+        del mm
+        os.replace(tmp, path)
+
+
+STORE = PriceStore()
+
+
+def load_prices(ticker, start=None, end=None, interval='1d', store=None):
+    """
+    Return stored closing prices as a zero-copy memory-mapped array.
+    Args:
+        ticker (str): Ticker symbol.
+        start (str, optional): First date to include.
+        end (str, optional): Last date to include.
+        interval (str): Bar interval.
+        store (PriceStore, optional): Store to read from (default STORE).
+    Returns:
+        np.array: Closing prices (empty if the ticker is not stored).
+    """
+    columns = (store or STORE).read(ticker, interval, start, end)
+    return columns.get('close', np.empty(0))
@@ -1,42 +1,330 @@
+import warnings
+from collections import deque
 import numpy as np
 import pandas as pd
+from series import as_series
+
+SIMULATION_MODELS = ('gbm', 'bootstrap')
+SIMULATION_CHUNK_BYTES = 64 * 2 ** 20  # Memory budget for one chunk of simulated paths
+MAX_SIMULATED_STEPS = 50000000  # Largest paths * horizon * assets simulated in one call
 
 def calculate_volatility(prices):
     """
     Calculate annualized volatility of a price series.
     Args:
-        prices (list or np.array): List of prices.
+        prices (list or np.array or PriceSeries): List of prices.
     Returns:
         float: Annualized volatility.
     """
-    returns = np.diff(prices) / prices[:-1]
-    volatility = np.std(returns) * np.sqrt(252)
+    volatility = np.std(as_series(prices).returns) * np.sqrt(252)
     return float(volatility)
 
 def calculate_drawdown(prices):
     """
     Calculate the maximum drawdown of a price series.
     Args:
-        prices (list or np.array): List of prices.
+        prices (list or np.array or PriceSeries): List of prices.
     Returns:
         float: Maximum drawdown (as a positive number).
     """
-    prices = np.array(prices)
-    running_max = np.maximum.accumulate(prices)
-    drawdowns = (running_max - prices) / running_max
-    max_drawdown = np.max(drawdowns)
+    max_drawdown = np.max(as_series(prices).drawdowns)
     return float(max_drawdown)
 
 def calculate_sharpe_ratio(prices, risk_free_rate=0.01):
     """
     Calculate the Sharpe ratio of a price series.
     Args:
-        prices (list or np.array): List of prices.
+        prices (list or np.array or PriceSeries): List of prices.
         risk_free_rate (float): Annual risk-free rate (default 0.01).
     Returns:
         float: Sharpe ratio.
     """
-    returns = np.diff(prices) / prices[:-1]
+    returns = as_series(prices).returns
     excess_returns = returns - (risk_free_rate / 252)
     sharpe = np.mean(excess_returns) / np.std(excess_returns) * np.sqrt(252)
-    return float(sharpe) 
\ No newline at end of file
+    return float(sharpe) 
+
+def pad_series(series_list):
+    """
+    Stack price series of unequal length into a NaN-padded assets x time matrix.
+    Args:
+        series_list (list): List of price lists (None entries become NaN).
+    Returns:
+        np.array: 2-D float array, shorter series padded with NaN at the end.
+    """
+    length = max((len(s) for s in series_list), default=0)
+    matrix = np.full((len(series_list), length), np.nan)
+    for i, s in enumerate(series_list):
+        matrix[i, :len(s)] = np.asarray(s, dtype=float)
+    return matrix
+
+def batch_risk_metrics(price_matrix, risk_free_rate=0.01):
+    """
+    Calculate volatility, maximum drawdown and Sharpe ratio for many assets at once.
+    Returns are computed once for the whole matrix and every metric is a column-wise
+    NumPy reduction along the time axis. NaN entries (padding or gaps) are ignored.
+    Args:
+        price_matrix (np.array): 2-D array of prices, one row per asset.
+        risk_free_rate (float): Annual risk-free rate (default 0.01).
+    Returns:
+        dict: Arrays 'volatility', 'max_drawdown', 'sharpe_ratio' and 'observations',
+        one entry per asset (NaN where an asset has too few prices).
+    """
+    prices = np.asarray(price_matrix, dtype=float)
+    if prices.ndim == 1:
+        prices = prices[np.newaxis, :]
+    with np.errstate(divide='ignore', invalid='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+        returns = np.diff(prices, axis=1) / prices[:, :-1]
+        observations = np.sum(~np.isnan(returns), axis=1)
+        std = np.nanstd(returns, axis=1)
+        excess = np.nanmean(returns, axis=1) - risk_free_rate / 252
+        volatility = std * np.sqrt(252)
+        sharpe = excess / std * np.sqrt(252)
+        running_max = np.maximum.accumulate(np.where(np.isnan(prices), -np.inf, prices), axis=1)
+        drawdowns = (running_max - prices) / running_max
+        max_drawdown = np.nanmax(drawdowns, axis=1)
+    sharpe[~np.isfinite(sharpe)] = np.nan
+    volatility[observations == 0] = np.nan
+    return {
+        'volatility': volatility,
+        'max_drawdown': max_drawdown,
+        'sharpe_ratio': sharpe,
+        'observations': observations
+    }
+
+
+class RollingRisk:
+    """
+    Stateful risk metrics updated in constant time per tick.
+    Return mean and variance are kept with Welford's algorithm. In window mode the last
+    `window` returns live in a ring buffer and the running max is tracked with a monotonic
+    deque over the last `window + 1` prices (amortized O(1)); drawdown is then measured
+    against the peak of that window.
+    Args:
+        window (int, optional): Number of most recent returns to use; None for expanding.
+        risk_free_rate (float): Annual risk-free rate (default 0.01).
+    """
+
+    def __init__(self, window=None, risk_free_rate=0.01):
+        if window is not None and window < 1:
+            raise ValueError('window must be a positive integer')
+        self.window = window
+        self.risk_free_rate = risk_free_rate
+        self.ticks = 0
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.last_price = None
+        self.peak = None
+        self.drawdown = 0.0
+        self.max_drawdown = 0.0
+        if window is not None:
+            self._returns = np.zeros(window)
+            self._pos = 0
+            self._peaks = deque()
+
+    def update(self, price):
+        """
+        Append one price and update all metrics.
+        Args:
+            price (float): New price.
+        Returns:
+            dict: Current metrics (see metrics).
+        """
+        price = float(price)
+        if self.last_price is not None:
+            self._add_return((price - self.last_price) / self.last_price)
+        self._update_peak(price)
+        self.drawdown = (self.peak - price) / self.peak
+        self.max_drawdown = max(self.max_drawdown, self.drawdown)
+        self.last_price = price
+        self.ticks += 1
+        return self.metrics()
+
+    def extend(self, prices):
+        """
+        Append several prices in order.
+        Args:
+            prices (list or np.array): New prices.
+        Returns:
+            dict: Metrics after the last price.
+        """
+        for price in prices:
+            self.update(price)
+        return self.metrics()
+
+    def _add_return(self, r):
+        if self.window is None or self.count < self.window:
+            self.count += 1
+            delta = r - self.mean
+            self.mean += delta / self.count
+            self._m2 += delta * (r - self.mean)
+        else:
+            # Window full: replace the oldest return in a single Welford step
+            old = self._returns[self._pos]
+            old_mean = self.mean
+            self.mean += (r - old) / self.count
+            self._m2 += (r - old) * (r - self.mean + old - old_mean)
+            self._m2 = max(self._m2, 0.0)
+        if self.window is not None:
+            self._returns[self._pos] = r
+            self._pos = (self._pos + 1) % self.window
+
+    def _update_peak(self, price):
+        if self.window is None:
+            self.peak = price if self.peak is None else max(self.peak, price)
+            return
+        peaks = self._peaks
+        while peaks and peaks[-1][1] <= price:
+            peaks.pop()
+        peaks.append((self.ticks, price))
+        while peaks[0][0] <= self.ticks - (self.window + 1):
+            peaks.popleft()
+        self.peak = peaks[0][1]
+
+    def metrics(self):
+        """
+        Return the current metrics.
+        Returns:
+            dict: 'volatility', 'sharpe_ratio', 'drawdown', 'max_drawdown' and
+            'observations' (number of returns in the estimate).
+        """
+        std = np.sqrt(self._m2 / self.count) if self.count else 0.0
+        volatility = std * np.sqrt(252) if self.count else None
+        sharpe = None
+        if std > 0:
+            sharpe = (self.mean - self.risk_free_rate / 252) / std * np.sqrt(252)
+        return {
+            'volatility': None if volatility is None else float(volatility),
+            'sharpe_ratio': None if sharpe is None else float(sharpe),
+            'drawdown': float(self.drawdown),
+            'max_drawdown': float(self.max_drawdown),
+            'observations': self.count
+        }
+
+def rolling_risk_metrics(prices, window=20, risk_free_rate=0.01):
+    """
+    Rolling volatility, Sharpe ratio and drawdown over a full price history.
+    Window sums come from cumulative sums of (centered) returns, so every window is
+    computed in one vectorized pass. Entry i covers the `window` returns ending at
+    price index i + window.
+    Args:
+        prices (list or np.array or PriceSeries): Price series.
+        window (int): Number of returns per window.
+        risk_free_rate (float): Annual risk-free rate (default 0.01).
+    Returns:
+        dict: Arrays 'volatility', 'sharpe_ratio' and 'drawdown' of length len(prices) - window.
+    """
+    series = as_series(prices)
+    prices = series.values
+    if window < 1 or len(prices) <= window:
+        empty = np.empty(0)
+        return {'volatility': empty, 'sharpe_ratio': empty, 'drawdown': empty}
+    returns = series.returns
+    # Centering before the cumulative sums limits cancellation in the variance
+    center = returns.mean()
+    centered = returns - center
+    c1 = np.concatenate(([0.0], np.cumsum(centered)))
+    c2 = np.concatenate(([0.0], np.cumsum(centered ** 2)))
+    mean = (c1[window:] - c1[:-window]) / window
+    var = np.maximum((c2[window:] - c2[:-window]) / window - mean ** 2, 0.0)
+    std = np.sqrt(var)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = (mean + center - risk_free_rate / 252) / std * np.sqrt(252)
+    sharpe[~np.isfinite(sharpe)] = np.nan
+    peaks = np.lib.stride_tricks.sliding_window_view(prices, window + 1).max(axis=1)
+    drawdown = (peaks - prices[window:]) / peaks
+    return {'volatility': std * np.sqrt(252), 'sharpe_ratio': sharpe, 'drawdown': drawdown}
+
+def simulate_portfolio_paths(returns, n_paths=10000, horizon=10, weights=None, model='gbm', seed=None,
+                             chunk_paths=None):
+    """
+    Simulate buy-and-hold portfolio value paths, one chunk of paths at a time.
+    Each chunk is a single (paths x horizon x assets) array of log returns: 'gbm' draws
+    correlated normals with the historical mean and covariance of log returns (geometric
+    Brownian motion), 'bootstrap' resamples whole historical days so the cross-asset
+    dependence and fat tails of the sample are kept.
+    Args:
+        returns (np.array): T x N historical simple returns (T for a single asset).
+        n_paths (int): Number of paths.
+        horizon (int): Steps per path.
+        weights (np.array, optional): Initial portfolio weights (default equal).
+        model (str): 'gbm' or 'bootstrap'.
+        seed (int, optional): Seed for reproducible paths (for a given chunk size).
+        chunk_paths (int, optional): Paths per chunk (default: as many as fit in
+            SIMULATION_CHUNK_BYTES).
+    Yields:
+        np.array: Chunk of paths x horizon portfolio values, starting from 1.0.
+    """
+    if model not in SIMULATION_MODELS:
+        raise ValueError(f"Unknown simulation model: {model}")
+    log_returns = np.log1p(np.asarray(returns, dtype=float))
+    if log_returns.ndim == 1:
+        log_returns = log_returns[:, np.newaxis]
+    n_assets = log_returns.shape[1]
+    weights = np.full(n_assets, 1 / n_assets) if weights is None else np.asarray(weights, dtype=float)
+    rng = np.random.default_rng(seed)
+    if model == 'gbm':
+        mu = log_returns.mean(axis=0)
+        cov = np.atleast_2d(np.cov(log_returns, rowvar=False))
+        # Cholesky of a slightly regularized covariance copes with collinear or constant assets
+        chol = np.linalg.cholesky(cov + np.eye(n_assets) * 1e-12 * max(np.trace(cov), 1e-12))
+    # Three arrays of paths x horizon x assets are alive at once
+    chunk_paths = chunk_paths or max(1, SIMULATION_CHUNK_BYTES // (24 * horizon * n_assets))
+    for start in range(0, n_paths, chunk_paths):
+        size = min(chunk_paths, n_paths - start)
+        if model == 'gbm':
+            draws = mu + rng.standard_normal((size, horizon, n_assets)) @ chol.T
+        else:
+            draws = log_returns[rng.integers(0, len(log_returns), (size, horizon))]
+        np.cumsum(draws, axis=1, out=draws)
+        np.exp(draws, out=draws)
+        yield draws @ weights
+
+
+def monte_carlo_risk(returns, n_paths=10000, horizon=10, weights=None, model='gbm', seed=None,
+                     confidence=(0.95, 0.99), drawdown_threshold=0.1, chunk_paths=None):
+    """
+    Monte Carlo Value at Risk, Conditional VaR and drawdown breach probability.
+    Only the terminal value and maximum drawdown of each path are kept across chunks.
+    Args:
+        returns (np.array): T x N historical simple returns (T for a single asset).
+        n_paths, horizon, weights, model, seed, chunk_paths: See simulate_portfolio_paths.
+        confidence (tuple): VaR/CVaR confidence levels.
+        drawdown_threshold (float): Drawdown (fraction of peak value) whose breach
+            probability is reported.
+    Returns:
+        dict: 'var' and 'cvar' ({confidence: loss as a fraction of the initial value}),
+        'drawdown_breach_probability', 'expected_return', 'probability_of_loss',
+        'terminal_return_percentiles' and the simulation settings.
+    """
+    terminal = np.empty(n_paths)
+    max_drawdown = np.empty(n_paths)
+    pos = 0
+    for values in simulate_portfolio_paths(returns, n_paths, horizon, weights, model, seed, chunk_paths):
+        size = len(values)
+        peaks = np.maximum(np.maximum.accumulate(values, axis=1), 1.0)
+        max_drawdown[pos:pos + size] = ((peaks - values) / peaks).max(axis=1)
+        terminal[pos:pos + size] = values[:, -1]
+        pos += size
+    losses = 1.0 - terminal
+    var, cvar = {}, {}
+    for level in confidence:
+        threshold = np.quantile(losses, level)
+        var[str(level)] = float(threshold)
+        cvar[str(level)] = float(losses[losses >= threshold].mean())
+    percentiles = (5, 25, 50, 75, 95)
+    return {
+        'var': var,
+        'cvar': cvar,
+        'drawdown_threshold': drawdown_threshold,
+        'drawdown_breach_probability': float(np.mean(max_drawdown >= drawdown_threshold)),
+        'expected_return': float(terminal.mean() - 1.0),
+        'probability_of_loss': float(np.mean(losses > 0)),
+        'terminal_return_percentiles': dict(zip(map(str, percentiles), (np.percentile(terminal, percentiles) - 1.0).tolist())),
+        'paths': n_paths,
+        'horizon': horizon,
+        'model': model
+    }
+
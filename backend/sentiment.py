@@ -1,5 +1,179 @@
 import numpy as np
+import os
 import re
+import json
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+DEFAULT_LEXICON = {
+    'weights': {
+        'beat': 1, 'growth': 1, 'boost': 1, 'gain': 1, 'up': 1, 'positive': 1, 'record': 1,
+        'volatility': -1, 'regulatory': -1, 'loss': -1, 'down': -1, 'negative': -1, 'crash': -1
+    },
+    'negations': ['not', 'no', 'never', 'without', "don't", "doesn't", "didn't", "isn't", "wasn't", 'fails to'],
+    'negation_window': 3
+}
+SENTIMENT_LEXICON = os.environ.get('SENTIMENT_LEXICON', '')  # JSON lexicon file used instead of DEFAULT_LEXICON
+
+
+class SentimentScorer:
+    """
+    Lexicon-based sentiment scorer using one precompiled regex for all terms.
+    Each headline is lowercased and scanned once; a negation flips the sign of the next
+    lexicon term found within `negation_window` words after it.
+    Args:
+        weights (dict): Term (word or phrase) -> weight.
+        negations (list): Negation words or phrases.
+        negation_window (int): Max words between a negation and the term it flips.
+    Raises:
+        ValueError: If no weighted term is given.
+    """
+
+    def __init__(self, weights, negations=(), negation_window=3):
+        self.weights = {' '.join(term.lower().split()): float(w) for term, w in weights.items() if term.split()}
+        self.negations = {' '.join(term.lower().split()) for term in negations if term.split()}
+        if not self.weights:
+            raise ValueError('Lexicon must have at least one weighted term')
+        self.negation_window = negation_window
+        terms = sorted(set(self.weights) | self.negations, key=len, reverse=True)
+        alternation = '|'.join(re.escape(term).replace(r'\ ', r'\s+') for term in terms)
+        self._pattern = re.compile(rf'\b(?:{alternation})\b')
+
+    @classmethod
+    def from_dict(cls, lexicon):
+        return cls(lexicon['weights'], lexicon.get('negations', ()), lexicon.get('negation_window', 3))
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a lexicon from a JSON file with 'weights', 'negations' and 'negation_window'.
+        Args:
+            path (str): Path to the JSON lexicon.
+        Returns:
+            SentimentScorer: Scorer for that lexicon.
+        """
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+    def to_dict(self):
+        """Lexicon dict of this scorer, accepted by from_dict."""
+        return {'weights': dict(self.weights), 'negations': sorted(self.negations),
+                'negation_window': self.negation_window}
+
+    def raw_score(self, text):
+        """
+        Sum of matched term weights, with negated terms flipped.
+        Args:
+            text (str): Headline or text.
+        Returns:
+            float: Raw lexicon score.
+        """
+        text = text.lower()
+        score = 0.0
+        negated_at = None
+        for match in self._pattern.finditer(text):
+            term = match.group()
+            if term not in self.weights and term not in self.negations:
+                term = ' '.join(term.split())
+            if term in self.negations:
+                negated_at = match.end()
+                continue
+            weight = self.weights[term]
+            if negated_at is not None:
+                if len(text[negated_at:match.start()].split()) <= self.negation_window:
+                    weight = -weight
+                negated_at = None
+            score += weight
+        return score
+
+    def score(self, text):
+        """
+        Sentiment score squashed to (-1, 1).
+        Args:
+            text (str): Headline or text.
+        Returns:
+            float: Sentiment score (-1 to 1).
+        """
+        return float(np.tanh(self.raw_score(text) / 2))
+
+    def score_many(self, texts):
+        """
+        Score an iterable of texts.
+        Args:
+            texts (iterable): Headlines.
+        Returns:
+            np.array: Scores, one per text.
+        """
+        raw = np.fromiter((self.raw_score(t) for t in texts), dtype=float)
+        return np.tanh(raw / 2)
+
+
+_DEFAULT_SCORER = SentimentScorer.load(SENTIMENT_LEXICON) if SENTIMENT_LEXICON else SentimentScorer.from_dict(DEFAULT_LEXICON)
+_WORKER_SCORER = None
+
+
+def _init_worker(lexicon):
+    global _WORKER_SCORER
+    _WORKER_SCORER = SentimentScorer.from_dict(lexicon) if lexicon else _DEFAULT_SCORER
+
+
+def _score_chunk(texts):
+    return _WORKER_SCORER.score_many(texts)
+
+
+def _chunks(iterable, size):
+    it = iter(iterable)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def score_headlines(headlines, lexicon=None, processes=None, chunk_size=10000):
+    """
+    Score a list or streaming iterator of headlines, optionally across a process pool.
+    Args:
+        headlines (iterable): Headline strings.
+        lexicon (dict, optional): Lexicon dict (see DEFAULT_LEXICON); configured lexicon if None.
+        processes (int, optional): Worker processes; None or 1 scores in-process.
+        chunk_size (int): Headlines per chunk handed to a worker.
+    Yields:
+        np.array: Scores for each consecutive chunk of headlines, in input order.
+    """
+    if not processes or processes <= 1:
+        scorer = SentimentScorer.from_dict(lexicon) if lexicon else _DEFAULT_SCORER
+        for chunk in _chunks(headlines, chunk_size):
+            yield scorer.score_many(chunk)
+        return
+    # Workers get the lexicon explicitly so one set with set_default_lexicon reaches spawned processes
+    with ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(lexicon or _DEFAULT_SCORER.to_dict(),)) as pool:
+        # Keep a bounded number of chunks in flight so streaming input is never fully buffered
+        pending = deque()
+        for chunk in _chunks(headlines, chunk_size):
+            pending.append(pool.submit(_score_chunk, chunk))
+            if len(pending) >= 2 * processes:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def set_default_lexicon(lexicon=None):
+    """
+    Replace the lexicon used by simple_sentiment_score, batch_sentiment_analysis and
+    score_headlines (and so by /sentiment, /report and the stream hub).
+    Args:
+        lexicon (dict or str, optional): Lexicon dict, path to a JSON lexicon, or None
+            for DEFAULT_LEXICON.
+    Raises:
+        ValueError: If the lexicon has no weighted term.
+    """
+    global _DEFAULT_SCORER
+    if isinstance(lexicon, str):
+        _DEFAULT_SCORER = SentimentScorer.load(lexicon)
+    else:
+        _DEFAULT_SCORER = SentimentScorer.from_dict(lexicon or DEFAULT_LEXICON)
 
 def simple_sentiment_score(text):
     """
@@ -9,28 +183,17 @@ def simple_sentiment_score(text):
     Returns:
         float: Sentiment score (-1 to 1).
     """
-    positive_words = ['beat', 'growth', 'boost', 'gain', 'up', 'positive', 'record']
-    negative_words = ['volatility', 'regulatory', 'loss', 'down', 'negative', 'crash']
-    score = 0
-    for word in positive_words:
-        if re.search(rf'\\b{word}\\b', text, re.IGNORECASE):
-            score += 1
-    for word in negative_words:
-        if re.search(rf'\\b{word}\\b', text, re.IGNORECASE):
-            score -= 1
-    return np.tanh(score / 2)
+    return _DEFAULT_SCORER.score(text)
 
 def batch_sentiment_analysis(news_list):
     """
-    Analyze sentiment for a list of news headlines.
+    Analyze sentiment for a list of news headlines with the configured lexicon
+    (SENTIMENT_LEXICON or set_default_lexicon).
     Args:
         news_list (list): List of dicts with 'headline' key.
     Returns:
         list: List of dicts with 'headline' and 'score'.
     """
-    results = []
-    for item in news_list:
-        headline = item.get('headline', '')
-        score = simple_sentiment_score(headline)
-        results.append({'headline': headline, 'score': score})
-    return results 
\ No newline at end of file
+    headlines = [item.get('headline', '') for item in news_list]
+    scores = _DEFAULT_SCORER.score_many(headlines)
+    return [{'headline': h, 'score': float(s)} for h, s in zip(headlines, scores)]
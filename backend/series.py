@@ -0,0 +1,101 @@
+from functools import cached_property
+import numpy as np
+from metrics import stage
+
+
+def as_float_array(values, min_length=0, positive=False):
+    """
+    Convert a list or array of numbers to a read-only, contiguous float64 array.
+    Contiguous float64 input (including memory-mapped store columns) is not copied.
+    Args:
+        values (list or np.array): Numbers.
+        min_length (int): Minimum number of values.
+        positive (bool): Require every value to be > 0.
+    Returns:
+        np.array: 1-D float64 array.
+    Raises:
+        ValueError: If the input is not a 1-D sequence of finite numbers meeting the limits.
+    """
+    with stage('validate'):
+        if isinstance(values, np.ndarray):
+            array = values
+        elif isinstance(values, (list, tuple)) or hasattr(values, '__array__'):
+            array = np.asarray(values)
+        else:
+            raise ValueError('Prices must be a list of numbers')
+        if array.ndim != 1 or array.dtype.kind not in 'iuf':
+            raise ValueError('Prices must be a flat list of numbers')
+        array = np.ascontiguousarray(array, dtype=np.float64).view()
+        array.flags.writeable = False
+        if len(array) < min_length:
+            raise ValueError(f'At least {min_length} prices are required')
+        if not np.isfinite(array).all():
+            raise ValueError('Prices contain NaN or infinite values')
+        if positive and len(array) and array.min() <= 0:
+            raise ValueError('Prices must be positive')
+        return array
+
+
+class PriceSeries:
+    """
+    A validated price series with derived arrays computed on first use and then shared.
+    Ingest request prices once and pass the series to risk and analysis functions instead
+    of re-converting the raw list and recomputing returns in each of them.
+    Args:
+        values (np.array): Read-only, contiguous float64 prices (see ingest).
+    """
+
+    def __init__(self, values):
+        self.values = values
+
+    @classmethod
+    def ingest(cls, prices, min_length=2):
+        """
+        Parse prices into a series, validating them in one vectorized pass.
+        Args:
+            prices (list or np.array or PriceSeries): Positive, finite prices.
+            min_length (int): Minimum number of prices.
+        Returns:
+            PriceSeries: The series (prices itself if it already is one).
+        Raises:
+            ValueError: If prices are not a flat list of positive, finite numbers.
+        """
+        if isinstance(prices, cls):
+            if len(prices) < min_length:
+                raise ValueError(f'At least {min_length} prices are required')
+            return prices
+        return cls(as_float_array(prices, min_length, positive=True))
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, index):
+        return self.values[index]
+
+    def __array__(self, dtype=None, copy=None):
+        return self.values if dtype is None else self.values.astype(dtype)
+
+    @cached_property
+    def returns(self):
+        """Simple returns, one fewer than prices."""
+        return np.diff(self.values) / self.values[:-1]
+
+    @cached_property
+    def log_returns(self):
+        """Log returns, one fewer than prices."""
+        return np.diff(np.log(self.values))
+
+    @cached_property
+    def running_max(self):
+        """Highest price seen up to each index."""
+        return np.maximum.accumulate(self.values)
+
+    @cached_property
+    def drawdowns(self):
+        """Fractional decline from the running max at each index."""
+        return (self.running_max - self.values) / self.running_max
+
+
+def as_series(prices):
+    """Return prices as a PriceSeries, ingesting raw lists or arrays."""
+    return PriceSeries.ingest(prices, min_length=1)
@@ -0,0 +1,391 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from arima import ArimaStateStore, incremental_arima_forecast
+from data_gen import MarketSimulator, asset_names, generate_headlines
+from risk import RollingRisk
+from sentiment import batch_sentiment_analysis
+from utils import log_event
+
+STREAM_RISK_WINDOW = 20  # Returns in the rolling risk window of each ticker
+STREAM_FORECAST_EVERY = 50  # Ticks between forecast refreshes of a ticker
+STREAM_FORECAST_STEPS = 5  # Steps in each pushed forecast
+STREAM_MIN_FORECAST_PRICES = 30  # Prices a ticker needs before it is forecast
+STREAM_HISTORY = 5000  # Prices kept per ticker for forecasts; the oldest half is dropped when full
+SENTIMENT_DECAY = 0.8  # Weight of the previous value in the exponentially weighted headline score
+STATS_WINDOW = 10.0  # Seconds of ingestion used for the ticks-per-second rate
+LAG_SAMPLES = 1000  # Recent delivery lags kept for stats
+MAX_STREAM_TICKERS = 1000  # Tickers a hub keeps state for; ingesting beyond this is refused
+HEARTBEAT_SECONDS = 15.0  # Idle seconds before an SSE comment keeps the connection open
+
+
+class Subscriber:
+    """
+    Receiver of ticker snapshots. Pending updates are coalesced per ticker: a newer
+    snapshot replaces one the consumer has not read yet, so a slow consumer only ever
+    holds one update per ticker and never blocks publishing.
+    Args:
+        tickers (iterable, optional): Tickers to receive (default all).
+    """
+
+    def __init__(self, tickers=None):
+        self.tickers = None if tickers is None else set(tickers)
+        self.delivered = 0
+        self.coalesced = 0
+        self.closed = False
+        self._pending = {}
+        self._cond = threading.Condition()
+
+    def offer(self, snapshot):
+        """Queue a snapshot, replacing any unread one for the same ticker."""
+        if self.tickers is not None and snapshot['ticker'] not in self.tickers:
+            return
+        with self._cond:
+            if snapshot['ticker'] in self._pending:
+                self.coalesced += 1
+            self._pending[snapshot['ticker']] = snapshot
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """
+        Wait for pending snapshots and take all of them.
+        Args:
+            timeout (float, optional): Seconds to wait.
+        Returns:
+            list: Snapshots, one per ticker updated since the last call (empty on timeout
+            or once closed).
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._pending or self.closed, timeout)
+            updates = list(self._pending.values())
+            self._pending.clear()
+            self.delivered += len(updates)
+            return updates
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+class _TickerState:
+
+    def __init__(self, window):
+        self.risk = RollingRisk(window)
+        self.prices = np.empty(1024)
+        self.size = 0
+        self.ticks = 0
+        self.forecast = None
+        self.forecast_tick = None
+        self.forecast_due = STREAM_MIN_FORECAST_PRICES
+        self.sentiment = {'headlines': 0, 'mean': None, 'ewma': None, 'last': None}
+
+    def append(self, prices):
+        needed = self.size + len(prices)
+        if needed > STREAM_HISTORY:
+            # Keep the newest half, so the forecast state is rebuilt once per STREAM_HISTORY / 2 ticks
+            kept = np.concatenate([self.prices[:self.size], prices])[-(STREAM_HISTORY // 2):]
+            self.prices = np.empty(STREAM_HISTORY)
+            self.prices[:len(kept)] = kept
+            self.size = len(kept)
+            return
+        if needed > len(self.prices):
+            grown = np.empty(min(max(len(self.prices) * 2, needed), STREAM_HISTORY))
+            grown[:self.size] = self.prices[:self.size]
+            self.prices = grown
+        self.prices[self.size:needed] = prices
+        self.size = needed
+
+
+class StreamHub:
+    """
+    Per-ticker live analytics fed by pushed ticks and headlines. Ingestion updates
+    rolling risk in constant time per tick and headline sentiment aggregates, then
+    publishes one snapshot per touched ticker to every subscriber. Forecasts are refreshed
+    every `forecast_every` ticks on a background thread with incremental ARIMA state,
+    at most one queued per ticker, so ingestion never waits for a fit.
+    Args:
+        window (int): Returns in the rolling risk window.
+        forecast_every (int): Ticks between forecast refreshes (0 disables forecasts).
+        forecast_steps (int): Steps per forecast.
+        max_tickers (int): Tickers kept; batches that would add more are refused.
+    """
+
+    def __init__(self, window=STREAM_RISK_WINDOW, forecast_every=STREAM_FORECAST_EVERY,
+                 forecast_steps=STREAM_FORECAST_STEPS, max_tickers=MAX_STREAM_TICKERS):
+        self.window = window
+        self.max_tickers = max_tickers
+        self.forecast_every = forecast_every
+        self.forecast_steps = forecast_steps
+        self.arima_states = ArimaStateStore(maxsize=max_tickers)
+        self._states = {}
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._forecasting = set()
+        self._executor = None
+        self._started = time.time()
+        self._ticks = 0
+        self._headlines = 0
+        self._published = 0
+        self._forecasts = 0
+        self._closed = {'delivered': 0, 'coalesced': 0}
+        self._recent = deque()
+        self._lags = deque(maxlen=LAG_SAMPLES)
+
+    def ingest(self, ticks=None, news=None):
+        """
+        Absorb new ticks and headlines and publish the updated tickers.
+        Args:
+            ticks (dict, optional): {ticker: [prices]} in arrival order.
+            news (list, optional): Dicts with 'ticker' (or 'asset') and 'headline'.
+        Returns:
+            dict: Numbers of 'ticks', 'headlines' and 'tickers' accepted.
+        Raises:
+            ValueError: If prices are not positive finite numbers, a headline has no ticker
+                or the batch would take the hub past max_tickers (nothing is ingested then).
+        """
+        batches = {}
+        for ticker, prices in (ticks or {}).items():
+            prices = np.atleast_1d(np.asarray(prices, dtype=float))
+            if prices.ndim != 1 or not np.all(np.isfinite(prices)) or np.any(prices <= 0):
+                raise ValueError(f'Prices for {ticker} must be positive finite numbers')
+            if len(prices):
+                batches[str(ticker)] = prices
+        items = news or []
+        if any(not (item.get('ticker') or item.get('asset')) for item in items):
+            raise ValueError("Every headline needs a 'ticker'")
+        scores = batch_sentiment_analysis(items)
+        received = time.time()
+        due = []
+        touched = set(batches) | {str(item.get('ticker') or item.get('asset')) for item in items}
+        with self._lock:
+            if len(self._states) + len(touched - self._states.keys()) > self.max_tickers:
+                raise ValueError(f'Stream is limited to {self.max_tickers} tickers')
+            for ticker, prices in batches.items():
+                state = self._state(ticker)
+                for price in prices:
+                    state.risk.update(price)
+                state.append(prices)
+                state.ticks += len(prices)
+                if self.forecast_every and state.ticks >= state.forecast_due and ticker not in self._forecasting:
+                    self._forecasting.add(ticker)
+                    due.append(ticker)
+            for item, scored in zip(items, scores):
+                self._add_headline(self._state(str(item.get('ticker') or item.get('asset'))), scored)
+            snapshots = [self._snapshot(ticker, received) for ticker in touched]
+            count = sum(len(p) for p in batches.values())
+            self._ticks += count
+            self._headlines += len(items)
+            self._recent.append((received, count))
+        for ticker in due:
+            self._forecast_pool().submit(self._refresh_forecast, ticker)
+        self._publish(snapshots)
+        return {'ticks': count, 'headlines': len(items), 'tickers': len(touched)}
+
+    def _state(self, ticker):
+        state = self._states.get(ticker)
+        if state is None:
+            state = self._states[ticker] = _TickerState(self.window)
+        return state
+
+    def _add_headline(self, state, scored):
+        agg = state.sentiment
+        score = scored['score']
+        agg['headlines'] += 1
+        agg['mean'] = score if agg['mean'] is None else agg['mean'] + (score - agg['mean']) / agg['headlines']
+        agg['ewma'] = score if agg['ewma'] is None else SENTIMENT_DECAY * agg['ewma'] + (1 - SENTIMENT_DECAY) * score
+        agg['last'] = scored
+
+    def _snapshot(self, ticker, received):
+        state = self._states[ticker]
+        return {
+            'ticker': ticker,
+            'ticks': state.ticks,
+            'price': state.risk.last_price,
+            'risk': state.risk.metrics(),
+            'forecast': state.forecast,
+            'forecast_tick': state.forecast_tick,
+            'sentiment': dict(state.sentiment),
+            'received': received
+        }
+
+    def _publish(self, snapshots):
+        with self._lock:
+            subscribers = list(self._subscribers)
+            self._published += len(snapshots)
+        for snapshot in snapshots:
+            for subscriber in subscribers:
+                subscriber.offer(snapshot)
+
+    def _forecast_pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='stream-forecast')
+            return self._executor
+
+    def _refresh_forecast(self, ticker):
+        try:
+            with self._lock:
+                state = self._states[ticker]
+                prices = state.prices[:state.size].copy()
+                tick = state.ticks
+            result = incremental_arima_forecast(prices, self.forecast_steps, series_id=f'stream:{ticker}',
+                                                store=self.arima_states)
+            with self._lock:
+                state.forecast = {'values': result['forecast'], 'state': result['state']}
+                state.forecast_tick = tick
+                state.forecast_due = tick + self.forecast_every
+                self._forecasts += 1
+                snapshot = self._snapshot(ticker, time.time())
+            self._publish([snapshot])
+        except Exception as e:
+            log_event('Stream forecast failed', {'ticker': ticker, 'error': str(e)})
+        finally:
+            with self._lock:
+                self._forecasting.discard(ticker)
+
+    def subscribe(self, tickers=None):
+        """
+        Register a subscriber; it first receives the current snapshot of its tickers.
+        Args:
+            tickers (iterable, optional): Tickers to receive (default all).
+        Returns:
+            Subscriber: Call get() to receive updates and unsubscribe() when done.
+        """
+        subscriber = Subscriber(tickers)
+        with self._lock:
+            self._subscribers.add(subscriber)
+            snapshots = [self._snapshot(t, time.time()) for t in self._states
+                         if subscriber.tickers is None or t in subscriber.tickers]
+        for snapshot in snapshots:
+            subscriber.offer(snapshot)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        subscriber.close()
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.discard(subscriber)
+                self._closed['delivered'] += subscriber.delivered
+                self._closed['coalesced'] += subscriber.coalesced
+
+    def record_delivery(self, snapshots):
+        """Record the ingestion-to-delivery lag of snapshots handed to a client."""
+        now = time.time()
+        with self._lock:
+            self._lags.extend(now - s['received'] for s in snapshots)
+
+    def snapshot(self, ticker):
+        """Current snapshot of a ticker, or None if it has no data."""
+        with self._lock:
+            return self._snapshot(ticker, time.time()) if ticker in self._states else None
+
+    def stats(self):
+        """
+        Throughput and lag statistics.
+        Returns:
+            dict: Totals, 'ticks_per_second' over the last STATS_WINDOW seconds, delivered
+            and coalesced updates across all subscribers, and delivery lag in seconds.
+        """
+        now = time.time()
+        with self._lock:
+            while self._recent and self._recent[0][0] < now - STATS_WINDOW:
+                self._recent.popleft()
+            lags = np.array(self._lags) if self._lags else None
+            subscribers = list(self._subscribers)
+            elapsed = min(STATS_WINDOW, now - self._started)
+            return {
+                'tickers': len(self._states),
+                'ticks': self._ticks,
+                'headlines': self._headlines,
+                'ticks_per_second': sum(c for _, c in self._recent) / elapsed if elapsed > 0 else 0.0,
+                'published': self._published,
+                'forecasts': self._forecasts,
+                'forecasts_in_flight': len(self._forecasting),
+                'subscribers': len(subscribers),
+                'delivered': self._closed['delivered'] + sum(s.delivered for s in subscribers),
+                'coalesced': self._closed['coalesced'] + sum(s.coalesced for s in subscribers),
+                'lag_seconds': None if lags is None else {
+                    'mean': float(lags.mean()), 'p95': float(np.percentile(lags, 95)), 'max': float(lags.max())
+                }
+            }
+
+    def reset(self):
+        """Drop all ticker state (subscribers stay connected)."""
+        with self._lock:
+            self._states.clear()
+            self.arima_states.clear()
+
+
+class ReplaySource:
+    """
+    Local tick source: simulated prices and headlines from data_gen pushed into a hub in
+    batches at a fixed rate on a background thread.
+    Args:
+        hub (StreamHub): Hub to feed.
+        n_assets (int): Number of simulated tickers.
+        n_ticks (int): Ticks per ticker before the replay stops (None runs until stopped).
+        rate (float): Ticks per ticker per second (0 replays as fast as possible).
+        batch (int): Ticks per ticker in each ingest call.
+        news_per_batch (float): Expected headlines per batch.
+        seed (int, optional): Seed for reproducible prices.
+    Raises:
+        ValueError: If batch or n_ticks is below 1 or rate is negative.
+    """
+
+    def __init__(self, hub, n_assets=3, n_ticks=None, rate=10.0, batch=10, news_per_batch=0.5, seed=None):
+        if batch < 1:
+            raise ValueError('batch must be at least 1')
+        if rate < 0:
+            raise ValueError('rate must not be negative')
+        if n_ticks is not None and n_ticks < 1:
+            raise ValueError('ticks must be at least 1')
+        self.hub = hub
+        self.assets = asset_names(n_assets)
+        self.n_ticks = n_ticks
+        self.rate = rate
+        self.batch = batch
+        self.news_per_batch = news_per_batch
+        self.simulator = MarketSimulator(n_assets, seed=seed)
+        self.sent = 0
+        self.error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start replaying on a daemon thread; returns self."""
+        self._thread = threading.Thread(target=self._run, name='stream-replay', daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        rng = self.simulator.rng
+        while not self._stop.is_set() and (self.n_ticks is None or self.sent < self.n_ticks):
+            size = self.batch if self.n_ticks is None else min(self.batch, self.n_ticks - self.sent)
+            started = time.perf_counter()
+            prices, returns, _ = self.simulator.step(size)
+            news = generate_headlines(returns, int(rng.poisson(self.news_per_batch)), self.assets, rng, self.sent)
+            try:
+                self.hub.ingest({asset: prices[:, i] for i, asset in enumerate(self.assets)}, news)
+            except Exception as e:
+                self.error = str(e)
+                log_event('Stream replay failed', {'assets': len(self.assets), 'ticks_sent': self.sent, 'error': self.error})
+                return
+            self.sent += size
+            if self.rate:
+                self._stop.wait(max(size / self.rate - (time.perf_counter() - started), 0))
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def status(self):
+        return {'running': self.running, 'assets': self.assets, 'ticks_sent': self.sent, 'rate': self.rate,
+                'error': self.error}
@@ -1,38 +1,189 @@
-import logging
+import atexit
 import json
+import logging
+import os
+import queue
+import random
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+import numpy as np
+from series import PriceSeries
+
+LOG_MAX_BYTES = 10 * 1024 * 1024  # Rotate the log file at this size
+LOG_BACKUPS = 5  # Rotated files kept (backend.log.1 ... backend.log.5)
+LOG_QUEUE_SIZE = 10000  # Records buffered for the writer thread before new ones are dropped
+MAX_LOG_ITEMS = 20  # Items kept per list/dict in a logged payload
+MAX_LOG_STRING = 200  # Characters kept per string in a logged payload
+MAX_LOG_PAYLOAD = 4096  # Characters kept of a payload's serialized JSON
+
+_pipeline = {'listener': None, 'handler': None, 'file_handler': None, 'sample_rates': {}, 'dropped': 0}
+_pipeline_lock = threading.Lock()
 
-def setup_logging(logfile='backend.log'):
+
+def truncate_payload(value, max_items=MAX_LOG_ITEMS, max_string=MAX_LOG_STRING):
     """
-    Set up logging to a file.
+    Bound the size of a log payload: long lists, dicts and strings are cut and NumPy
+    values converted to plain Python.
+    Args:
+        value: Payload (any JSON-like structure, possibly with NumPy values).
+        max_items (int): Items kept per list or dict; the rest are summarized.
+        max_string (int): Characters kept per string.
+    Returns:
+        object: JSON-serializable payload.
+    """
+    if isinstance(value, np.ndarray):
+        if value.size <= max_items:
+            return value.tolist()
+        return value.ravel()[:max_items].tolist() + [f'... (+{value.size - max_items} items)']
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, str):
+        return value if len(value) <= max_string else value[:max_string] + f'... (+{len(value) - max_string} chars)'
+    if isinstance(value, dict):
+        items = list(value.items())
+        out = {str(k): truncate_payload(v, max_items, max_string) for k, v in items[:max_items]}
+        if len(items) > max_items:
+            out['...'] = f'+{len(items) - max_items} keys'
+        return out
+    if isinstance(value, (list, tuple)):
+        out = [truncate_payload(v, max_items, max_string) for v in value[:max_items]]
+        if len(value) > max_items:
+            out.append(f'... (+{len(value) - max_items} items)')
+        return out
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    return truncate_payload(str(value), max_items, max_string)
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line, with bounded 'data' payloads."""
+
+    def format(self, record):
+        entry = {'ts': self.formatTime(record, '%Y-%m-%dT%H:%M:%S') + f'.{int(record.msecs):03d}',
+                 'level': record.levelname, 'event': record.getMessage()}
+        data = getattr(record, 'data', None)
+        if data is not None:
+            payload = json.dumps(truncate_payload(data))
+            if len(payload) > MAX_LOG_PAYLOAD:
+                entry['data_truncated'] = payload[:MAX_LOG_PAYLOAD]
+            else:
+                entry['data'] = json.loads(payload)
+        if getattr(record, 'sample_rate', 1.0) < 1.0:
+            entry['sample_rate'] = record.sample_rate
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry)
+
+
+class _NonBlockingQueueHandler(QueueHandler):
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            _pipeline['dropped'] += 1
+
+
+def setup_logging(logfile='backend.log', max_bytes=LOG_MAX_BYTES, backups=LOG_BACKUPS, sample_rates=None):
+    """
+    Set up non-blocking JSON-lines logging to a rotating file.
+    Records are put on a bounded queue and written by a background thread; the queue is
+    drained on interpreter exit (or shutdown_logging). Calling it again replaces the
+    previous pipeline.
     Args:
         logfile (str): Path to log file.
+        max_bytes (int): Size at which the file is rotated (0 disables rotation).
+        backups (int): Rotated files to keep.
+        sample_rates (dict, optional): Event -> fraction of occurrences to log (default 1).
+    """
+    shutdown_logging()
+    file_handler = RotatingFileHandler(logfile, maxBytes=max_bytes, backupCount=backups, delay=True)
+    file_handler.setFormatter(JsonFormatter())
+    log_queue = queue.Queue(LOG_QUEUE_SIZE)
+    handler = _NonBlockingQueueHandler(log_queue)
+    listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+    with _pipeline_lock:
+        _pipeline.update(listener=listener, handler=handler, file_handler=file_handler,
+                         sample_rates=dict(sample_rates or {}), dropped=0)
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(handler)
+    listener.start()
+
+
+def parse_sample_rates(spec):
+    """
+    Parse 'Event one=0.1,Event two=0.5' into {'Event one': 0.1, 'Event two': 0.5}.
+    Args:
+        spec (str): Comma-separated event=rate pairs.
+    Returns:
+        dict: Event -> sampling rate.
     """
-    logging.basicConfig(
-        filename=logfile,
-        level=logging.INFO,
-        format='%(asctime)s %(levelname)s %(message)s'
-    )
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        event, rate = item.rsplit('=', 1)
+        rates[event.strip()] = float(rate)
+    return rates
+
+
+def shutdown_logging():
+    """Write every queued record, then stop the background writer."""
+    with _pipeline_lock:
+        listener, handler, file_handler = _pipeline['listener'], _pipeline['handler'], _pipeline['file_handler']
+        _pipeline.update(listener=None, handler=None, file_handler=None)
+    if handler is None:
+        return
+    logging.getLogger().removeHandler(handler)
+    if listener is not None:
+        listener.stop()
+    if _pipeline['dropped']:
+        file_handler.handle(logging.makeLogRecord(
+            {'msg': 'Log records dropped (queue full)', 'levelname': 'WARNING', 'levelno': logging.WARNING,
+             'data': {'dropped': _pipeline['dropped']}}))
+    file_handler.close()
+
+
+def _log_directly_in_child():
+    # A forked worker has no writer thread; write its records straight to the file instead
+    handler, file_handler = _pipeline['handler'], _pipeline['file_handler']
+    if handler is None:
+        return
+    root = logging.getLogger()
+    root.removeHandler(handler)
+    root.addHandler(file_handler)
+    _pipeline.update(listener=None, handler=None, file_handler=None)
+
+
+atexit.register(shutdown_logging)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_log_directly_in_child)
+
 
 def log_event(event, data=None):
     """
     Log an event with optional data.
+    The payload is serialized (and truncated) on the writer thread, so it must not be
+    mutated after logging.
     Args:
         event (str): Event description.
         data (dict, optional): Additional data.
     """
-    if data:
-        logging.info(f"{event}: {json.dumps(data)}")
-    else:
-        logging.info(event)
+    rate = _pipeline['sample_rates'].get(event, 1.0)
+    if rate < 1.0 and random.random() >= rate:
+        return
+    logging.info(event, extra={'data': data or None, 'sample_rate': rate})
 
 def validate_prices(prices):
     """
-    Validate that prices is a list of numbers.
+    Validate that prices is a list or 1-D array of positive, finite numbers.
+    Use PriceSeries.ingest instead when the prices are used afterwards, so they are
+    converted only once.
     Args:
-        prices (list): List to validate.
+        prices (list or np.array): Prices to validate.
     Returns:
         bool: True if valid, False otherwise.
     """
-    if not isinstance(prices, list):
+    try:
+        PriceSeries.ingest(prices, min_length=0)
+    except ValueError:
         return False
-    return all(isinstance(x, (int, float)) for x in prices) 
\ No newline at end of file
+    return True 
\ No newline at end of file
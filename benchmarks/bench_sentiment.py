@@ -0,0 +1,69 @@
+"""
+Throughput benchmark: compiled lexicon scorer vs the original per-word regex scorer.
+
+Usage (from the repository root):
+    python benchmarks/bench_sentiment.py --headlines 200000 --processes 4
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+from sentiment import score_headlines, batch_sentiment_analysis  # noqa: E402
+
+HEADLINES = [
+    'Company X beats earnings expectations',
+    'Market volatility increases',
+    'New product launch boosts stock',
+    'Regulatory changes impact sector',
+    'Analysts predict growth',
+    'Shares down after record loss',
+    'Profit not up despite positive guidance',
+]
+
+
+def legacy_sentiment_score(text):
+    """Original implementation: one re.search per lexicon word, pattern built per call."""
+    positive_words = ['beat', 'growth', 'boost', 'gain', 'up', 'positive', 'record']
+    negative_words = ['volatility', 'regulatory', 'loss', 'down', 'negative', 'crash']
+    score = 0
+    for word in positive_words:
+        if re.search(rf'\\b{word}\\b', text, re.IGNORECASE):
+            score += 1
+    for word in negative_words:
+        if re.search(rf'\\b{word}\\b', text, re.IGNORECASE):
+            score -= 1
+    return np.tanh(score / 2)
+
+
+def timed(label, n, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f'{label:<28} {elapsed:8.3f}s {n / elapsed:14,.0f} headlines/s')
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--headlines', type=int, default=100000)
+    parser.add_argument('--processes', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+    n = args.headlines
+    headlines = [HEADLINES[i % len(HEADLINES)] for i in range(n)]
+    news = [{'headline': h} for h in headlines]
+
+    timed('legacy loop', n, lambda: [legacy_sentiment_score(h) for h in headlines])
+    timed('batch_sentiment_analysis', n, lambda: batch_sentiment_analysis(news))
+    timed('score_headlines (stream)', n, lambda: sum(len(c) for c in score_headlines(iter(headlines))))
+    if args.processes and args.processes > 1:
+        timed(f'score_headlines ({args.processes} procs)', n,
+              lambda: sum(len(c) for c in score_headlines(iter(headlines), processes=args.processes)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+"""
+Benchmark suite: timing and peak memory of backend functions and Flask endpoints across input sizes.
+
+Usage (from the repository root):
+    python benchmarks/bench_suite.py --output bench.json
+    python benchmarks/bench_suite.py --quick --filter risk
+    python benchmarks/bench_suite.py --compare bench.json --threshold 0.25
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+# Log events are still produced and serialized, but not kept
+os.environ.setdefault('LOG_FILE', os.devnull)
+
+from data_gen import generate_synthetic_data  # noqa: E402
+from covariance import sample_covariance, correlation_rows, top_peers  # noqa: E402
+from streaming import StreamHub  # noqa: E402
+from risk import calculate_volatility, calculate_sharpe_ratio, calculate_drawdown, batch_risk_metrics, pad_series, rolling_risk_metrics, monte_carlo_risk  # noqa: E402
+from sentiment import batch_sentiment_analysis  # noqa: E402
+from forecast import arima_forecast, xgboost_forecast, MODEL_CACHE  # noqa: E402
+from explain import explain_xgboost_forecast  # noqa: E402
+from portfolio import ShrunkCovariance, efficient_frontier, align_returns  # noqa: E402
+from app import app  # noqa: E402
+
+SIZES = {
+    'prices': [250, 2500, 25000],
+    'forecast': [100, 500, 2000],
+    'assets': [10, 100, 500],
+    'headlines': [1000, 10000, 100000],
+}
+QUICK_SIZES = {key: values[:2] for key, values in SIZES.items()}
+
+
+def prices(n, seed=0):
+    return generate_synthetic_data(n_prices=n, n_news=0, n_assets=1, seed=seed)['prices']
+
+
+def headlines(n):
+    return generate_synthetic_data(n_prices=1, n_news=n, n_assets=1, seed=0)['news']
+
+
+def histories(assets, length=260):
+    return [prices(length, seed=i) for i in range(assets)]
+
+
+def uncached(fn):
+    """Clear the fitted-model cache first so every run times a full fit."""
+    def run():
+        MODEL_CACHE.clear()
+        return fn()
+    return run
+
+
+def post(path, payload):
+    client = app.test_client()
+
+    def run():
+        response = client.post(path, json=payload)
+        assert response.status_code == 200, response.status_code
+        return response.data
+    return run
+
+
+def post_npy(path, values, accept='application/x-npy'):
+    """POST values as a raw .npy body."""
+    client = app.test_client()
+    buffer = io.BytesIO()
+    np.save(buffer, np.asarray(values, dtype=np.float64))
+    body = buffer.getvalue()
+
+    def run():
+        response = client.post(path, data=body, headers={'Content-Type': 'application/x-npy', 'Accept': accept})
+        assert response.status_code == 200, response.status_code
+        return response.data
+    return run
+
+
+def cases(sizes):
+    """Yield (name, size_label, size, setup) where setup(size) returns the zero-argument call to time."""
+    for n in sizes['prices']:
+        yield 'risk.calculate_volatility', 'prices', n, lambda n: (lambda p=prices(n): calculate_volatility(p))
+        yield 'risk.calculate_sharpe_ratio', 'prices', n, lambda n: (lambda p=prices(n): calculate_sharpe_ratio(p))
+        yield 'risk.calculate_drawdown', 'prices', n, lambda n: (lambda p=prices(n): calculate_drawdown(p))
+        yield 'risk.rolling_risk_metrics', 'prices', n, lambda n: (lambda p=prices(n): rolling_risk_metrics(p, 20))
+        yield 'POST /risk', 'prices', n, lambda n: post('/risk', {'prices': prices(n)})
+        yield 'POST /risk/rolling (npy)', 'prices', n, lambda n: post_npy('/risk/rolling', prices(n), 'application/json')
+    for n in sizes['assets']:
+        yield 'risk.batch_risk_metrics', 'assets', n, lambda n: (lambda m=pad_series(histories(n)): batch_risk_metrics(m))
+        yield 'portfolio.efficient_frontier', 'assets', n, lambda n: (
+            lambda c=ShrunkCovariance(align_returns(histories(n))): efficient_frontier(c, np.logspace(-1, 3, 20)))
+        yield 'risk.monte_carlo_risk (10k paths x 20)', 'assets', n, lambda n: (
+            lambda r=align_returns(histories(n)): monte_carlo_risk(r, 10000, 20, seed=0))
+        yield 'covariance.sample_covariance', 'assets', n, lambda n: (
+            lambda r=align_returns(histories(n)): sample_covariance(r))
+        yield 'covariance.top_peers (all tickers)', 'assets', n, lambda n: (
+            lambda r=align_returns(histories(n)): top_peers(correlation_rows(r, list(range(n))), list(range(n))))
+        yield 'streaming.StreamHub.ingest (1 tick per ticker)', 'assets', n, lambda n: (
+            lambda hub=StreamHub(forecast_every=0), ticks={f'A{i}': [100.0] for i in range(n)}: hub.ingest(ticks))
+        yield 'POST /risk/batch', 'assets', n, lambda n: post('/risk/batch', {'prices': histories(n)})
+        yield 'POST /optimize/frontier', 'assets', n, lambda n: post(
+            '/optimize/frontier', {'price_history': {f'A{i}': h for i, h in enumerate(histories(n))}})
+    for n in sizes['headlines']:
+        yield 'sentiment.batch_sentiment_analysis', 'headlines', n, lambda n: (
+            lambda h=headlines(n): batch_sentiment_analysis(h))
+        yield 'POST /sentiment', 'headlines', n, lambda n: post('/sentiment', {'news': headlines(n)})
+    for n in sizes['forecast']:
+        yield 'forecast.arima_forecast', 'prices', n, lambda n: uncached(lambda p=prices(n): arima_forecast(p, 5))
+        yield 'forecast.xgboost_forecast', 'prices', n, lambda n: uncached(lambda p=prices(n): xgboost_forecast(p, 5))
+        yield 'explain.explain_xgboost_forecast', 'prices', n, lambda n: uncached(
+            lambda p=prices(n): explain_xgboost_forecast(p, 5))
+        yield 'explain.explain_xgboost_forecast(series)', 'prices', n, lambda n: (
+            lambda p=prices(n): explain_xgboost_forecast(p, 5, scope='series', html=False))
+        yield 'POST /forecast?method=xgboost', 'prices', n, lambda n: uncached(
+            post('/forecast?method=xgboost&steps=5', {'prices': prices(n)}))
+        yield 'POST /forecast?method=xgboost (npy)', 'prices', n, lambda n: uncached(
+            post_npy('/forecast?method=xgboost&steps=5', prices(n)))
+
+
+def measure(fn, repeat):
+    """Return per-run timings (after one warm-up call) and the peak traced memory of one extra run."""
+    fn()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return timings, peak
+
+
+def compare(results, baseline, threshold):
+    """
+    Flag cases whose median time or peak memory grew by more than `threshold` (a fraction).
+    Returns:
+        list: Regression dicts with 'name', 'size', 'metric', 'baseline' and 'current'.
+    """
+    previous = {(r['name'], r['size']): r for r in baseline['results']}
+    regressions = []
+    for r in results:
+        old = previous.get((r['name'], r['size']))
+        if old is None:
+            continue
+        for metric in ('median_seconds', 'peak_kib'):
+            if old[metric] and r[metric] > old[metric] * (1 + threshold):
+                regressions.append({'name': r['name'], 'size': r['size'], 'metric': metric,
+                                    'baseline': old[metric], 'current': r[metric]})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--quick', action='store_true', help='Only the two smallest sizes per case')
+    parser.add_argument('--filter', default='', help='Only cases whose name contains this text')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='Write results to this JSON file')
+    parser.add_argument('--compare', help='Baseline JSON file to check for regressions')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Allowed slowdown/memory growth (0.2 = 20%%)')
+    args = parser.parse_args()
+
+    results = []
+    for name, label, size, setup in cases(QUICK_SIZES if args.quick else SIZES):
+        if args.filter not in name:
+            continue
+        timings, peak = measure(setup(size), args.repeat)
+        result = {'name': name, 'size': size, 'size_label': label, 'median_seconds': statistics.median(timings),
+                  'min_seconds': min(timings), 'peak_kib': peak / 1024}
+        results.append(result)
+        print(f"{name:<36} {label:>9}={size:<7} {result['median_seconds'] * 1e3:10.2f} ms {result['peak_kib']:12,.0f} KiB")
+
+    report = {
+        'meta': {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'python': platform.python_version(),
+                 'numpy': np.__version__, 'machine': platform.machine(), 'repeat': args.repeat},
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for r in regressions:
+            print(f"REGRESSION {r['name']} size={r['size']} {r['metric']}: {r['baseline']:.4g} -> {r['current']:.4g}")
+        if regressions:
+            sys.exit(1)
+        print('No regressions')
+
+
+if __name__ == '__main__':
+    main()
@@ -5,8 +5,116 @@ import pandas as pd
 import plotly.graph_objs as go
 import io
 import json
+import msgpack
+import numpy as np
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from charts import downsample, MAX_CHART_POINTS
 
 BACKEND_URL = 'http://localhost:5000'
+MSGPACK = 'application/msgpack'
+NPY = 'application/x-npy'
+EXT_NDARRAY = 1  # Backend MessagePack extension type for .npy-encoded arrays
+CACHE_TTL = 600  # Seconds a memoized backend response is reused
+CACHE_ENTRIES = 64  # Memoized backend responses kept
+
+
+class BackendError(Exception):
+    """Failed backend request; raised inside memoized calls so failures are not cached."""
+
+
+@st.cache_resource
+def get_session():
+    """Pooled HTTP session shared by every rerun and browser session."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_maxsize=8, max_retries=Retry(total=2, backoff_factor=0.3, allowed_methods=('GET',)))
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def decode_response(content_type, content):
+    """Decode a backend response body sent as MessagePack (arrays become NumPy) or JSON."""
+    if content_type.startswith(MSGPACK):
+        def ext_hook(code, data):
+            return np.load(io.BytesIO(data), allow_pickle=False) if code == EXT_NDARRAY else msgpack.ExtType(code, data)
+        return msgpack.unpackb(content, ext_hook=ext_hook, raw=False)
+    return json.loads(content)
+
+
+def _send(method, path, params, body, content_type, accept):
+    headers = {'Accept': accept}
+    if content_type:
+        headers['Content-Type'] = content_type
+    r = get_session().request(method, f'{BACKEND_URL}{path}', params=dict(params), data=body, headers=headers)
+    if not r.ok:
+        try:
+            message = decode_response(r.headers.get('Content-Type', ''), r.content).get('error')
+        except (ValueError, AttributeError):
+            message = None
+        raise BackendError(message or f'Backend returned {r.status_code}')
+    return r.headers.get('Content-Type', ''), r.content
+
+
+_send_memoized = st.cache_data(ttl=CACHE_TTL, max_entries=CACHE_ENTRIES, show_spinner=False)(_send)
+
+
+def _json_default(obj):
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return obj.tolist()
+    raise TypeError(f'{type(obj).__name__} is not JSON serializable')
+
+
+def call(method, path, params=None, payload=None, prices=None, accept='application/json', cache=True):
+    """
+    Call the backend, memoizing successful responses by method, path, params and body.
+    Args:
+        payload (dict, optional): JSON body (NumPy arrays allowed).
+        prices (np.array, optional): Body sent as a raw .npy buffer instead.
+        accept (str): Response media type to ask for.
+        cache (bool): Memoize the response (off for non-deterministic endpoints).
+    Returns:
+        tuple: (ok, decoded result or {'error': message}).
+    """
+    if prices is not None:
+        buffer = io.BytesIO()
+        np.save(buffer, np.asarray(prices, dtype=np.float64))
+        body, content_type = buffer.getvalue(), NPY
+    elif payload is not None:
+        body, content_type = json.dumps(payload, default=_json_default).encode(), 'application/json'
+    else:
+        body, content_type = None, None
+    params = tuple(sorted((params or {}).items()))
+    try:
+        result = (_send_memoized if cache else _send)(method, path, params, body, content_type, accept)
+    except (BackendError, requests.RequestException) as e:
+        return False, {'error': str(e)}
+    return True, decode_response(*result)
+
+
+def as_arrays(data):
+    """Keep price lists as NumPy arrays so session state holds one compact copy."""
+    if data.get('prices') is not None:
+        data['prices'] = np.asarray(data['prices'], dtype=float)
+    if isinstance(data.get('price_history'), dict):
+        data['price_history'] = {k: np.asarray(v, dtype=float) for k, v in data['price_history'].items()}
+    return data
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def chart_points(values, max_points=MAX_CHART_POINTS):
+    """LTTB-downsampled (positions, values) of a series, computed once per series."""
+    positions, _, points = downsample(values, max_points)
+    return positions, points
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def prices_csv(prices, dates=None):
+    """Full-resolution CSV of a price series for download."""
+    frame = pd.DataFrame({'price': prices})
+    if dates is not None and len(dates) == len(prices):
+        frame.insert(0, 'date', dates)
+    return frame.to_csv(index=False)
 
 st.set_page_config(page_title='💰 Autonomous Financial Analyst', layout='wide')
 
@@ -24,37 +132,37 @@ if data_source == 'Real':
     period = st.sidebar.selectbox('Period', ['1y', '6mo', '3mo', '1mo'])
     interval = st.sidebar.selectbox('Interval', ['1d', '1wk', '1mo'])
     if st.sidebar.button('Fetch Stock Data'):
-        r = requests.get(f'{BACKEND_URL}/stock', params={'ticker': ticker, 'period': period, 'interval': interval})
-        if r.ok and 'prices' in r.json():
-            st.session_state['data'] = {'prices': r.json()['prices'], 'dates': r.json()['dates'], 'assets': [ticker]}
+        ok, stock = call('GET', '/stock', params={'ticker': ticker, 'period': period, 'interval': interval}, accept=MSGPACK)
+        if ok and 'prices' in stock:
+            st.session_state['data'] = as_arrays({'prices': stock['prices'], 'dates': stock['dates'], 'assets': [ticker]})
             st.success(f'Loaded {ticker} stock data!')
         else:
-            st.error(r.json().get('error', 'Failed to fetch stock data.'))
+            st.error(stock.get('error', 'Failed to fetch stock data.'))
     st.sidebar.subheader('News Data')
     news_query = st.sidebar.text_input('News Query', 'stock market')
     news_count = st.sidebar.slider('Number of News', 1, 10, 5)
     if st.sidebar.button('Fetch News'):
-        r = requests.get(f'{BACKEND_URL}/news', params={'query': news_query, 'page_size': news_count})
-        if r.ok:
-            st.session_state['news'] = r.json()
+        ok, result = call('GET', '/news', params={'query': news_query, 'page_size': news_count})
+        if ok:
+            st.session_state['news'] = result
             st.success('Loaded news!')
         else:
             st.error('Failed to fetch news.')
     st.sidebar.subheader('SEC Filings')
     sec_ticker = st.sidebar.text_input('SEC Ticker', 'AAPL')
     if st.sidebar.button('Fetch SEC Filings'):
-        r = requests.get(f'{BACKEND_URL}/sec-filings', params={'ticker': sec_ticker})
-        if r.ok:
-            st.session_state['sec_filings'] = r.json()['filings']
+        ok, result = call('GET', '/sec-filings', params={'ticker': sec_ticker})
+        if ok:
+            st.session_state['sec_filings'] = result['filings']
             st.success('Loaded SEC filings!')
         else:
             st.error('Failed to fetch SEC filings.')
 else:
     st.sidebar.header('Data')
     if st.sidebar.button('Generate Synthetic Data'):
-        response = requests.get(f'{BACKEND_URL}/generate-data')
-        if response.ok:
-            st.session_state['data'] = response.json()
+        ok, result = call('GET', '/generate-data', cache=False)
+        if ok:
+            st.session_state['data'] = as_arrays(result)
         else:
             st.error('Failed to generate data.')
     uploaded = st.sidebar.file_uploader('Upload CSV (prices)', type=['csv'])
@@ -62,14 +170,28 @@ else:
         df = pd.read_csv(uploaded)
         if 'price' in df.columns:
             st.session_state['data'] = st.session_state.get('data', {})
-            st.session_state['data']['prices'] = df['price'].tolist()
+            st.session_state['data']['prices'] = df['price'].to_numpy(dtype=float)
             st.success('Uploaded price data!')
 
 # --- User Settings ---
 st.sidebar.header('Settings')
-forecast_method = st.sidebar.selectbox('Forecast Method', ['arima', 'lstm', 'prophet', 'xgboost'])
+forecast_method = st.sidebar.selectbox('Forecast Method', ['arima', 'arima_incremental', 'lstm', 'prophet', 'xgboost'])
 forecast_steps = st.sidebar.slider('Forecast Steps', 1, 30, 5)
 risk_aversion = st.sidebar.slider('Risk Aversion', 0.0, 1.0, 0.5)
+if st.session_state.get('data') and st.sidebar.button('Run Full Report'):
+    # One request fills the Analysis, Forecast, Sentiment, Risk and Portfolio pages
+    ok, report = call('POST', '/report', params={'method': forecast_method, 'steps': forecast_steps,
+                                                 'risk_aversion': risk_aversion}, payload=st.session_state['data'])
+    if ok:
+        timings = report.pop('timings')
+        for section, result in report.items():
+            if 'error' in result:
+                st.sidebar.error(f'{section}: ' + result['error'])
+            else:
+                st.session_state[section] = result
+        st.sidebar.caption(f"Report built in {timings['total']:.2f}s")
+    else:
+        st.sidebar.error('Failed to build report.')
 
 # --- Main Pages ---
 data = st.session_state.get('data', None)
@@ -83,22 +205,39 @@ if page == 'Data':
         st.subheader('Loaded Data')
         st.write('**Assets:**', data.get('assets', []))
         st.write('**Stock Prices:**')
-        st.line_chart(pd.Series(data.get('prices', []), name='Price'))
+        prices = data.get('prices')
+        if prices is not None and len(prices):
+            positions, points = chart_points(prices)
+            st.line_chart(pd.Series(points, index=positions, name='Price'))
+            if len(points) < len(prices):
+                st.caption(f'Showing {len(points):,} of {len(prices):,} prices (shape-preserving downsampling)')
+            st.download_button('Download Prices (CSV)', data=prices_csv(prices, data.get('dates')), file_name='prices.csv',
+                               mime='text/csv')
         if 'dates' in data:
             st.write('**Dates:**', data['dates'][:5], '...')
     else:
         st.info('Load data using the sidebar to get started.')
     if news:
         st.subheader('News Headlines')
+        summaries = st.session_state.setdefault('summaries', {})
+        if st.button('Summarize All Headlines'):
+            headlines = [n['headline'] for n in news]
+            ok, result = call('POST', '/summarize/batch', payload={'texts': headlines})
+            if ok:
+                summaries.update(zip(headlines, result['summaries']))
+            else:
+                st.error('Failed to summarize.')
         for i, n in enumerate(news):
             st.write('-', n['headline'])
-            # LLM Summarization for news
-            if st.button(f'Summarize News {i+1}', key=f'sum_news_{i}'):
-                r = requests.post(f'{BACKEND_URL}/summarize', json={'text': n['headline']})
-                if r.ok:
-                    st.info('Summary: ' + r.json()['summary'])
+            # LLM Summarization for news (kept for the session; the backend also caches summaries)
+            if n['headline'] not in summaries and st.button(f'Summarize News {i+1}', key=f'sum_news_{i}'):
+                ok, result = call('POST', '/summarize', payload={'text': n['headline']})
+                if ok:
+                    summaries[n['headline']] = result['summary']
                 else:
                     st.error('Failed to summarize.')
+            if n['headline'] in summaries:
+                st.info('Summary: ' + summaries[n['headline']])
     else:
         st.info('Load news using the sidebar.')
 if page == 'SEC Filings':
@@ -107,12 +246,15 @@ if page == 'SEC Filings':
         for i, filing in enumerate(sec_filings):
             st.write(f"[{filing['type']} - {filing['date']}]({filing['url']})")
             # LLM Summarization for SEC filings (URL only, placeholder)
-            if st.button(f'Summarize Filing {i+1}', key=f'sum_filing_{i}'):
-                r = requests.post(f'{BACKEND_URL}/summarize', json={'text': filing['url']})
-                if r.ok:
-                    st.info('Summary: ' + r.json()['summary'])
+            summaries = st.session_state.setdefault('summaries', {})
+            if filing['url'] not in summaries and st.button(f'Summarize Filing {i+1}', key=f'sum_filing_{i}'):
+                ok, result = call('POST', '/summarize', payload={'text': filing['url']})
+                if ok:
+                    summaries[filing['url']] = result['summary']
                 else:
                     st.error('Failed to summarize.')
+            if filing['url'] in summaries:
+                st.info('Summary: ' + summaries[filing['url']])
     else:
         st.info('Load SEC filings using the sidebar.')
 
@@ -120,8 +262,8 @@ if data:
     if page == 'Analysis':
         st.header('📊 Financial Analysis')
         if st.button('Run Analysis'):
-            r = requests.post(f'{BACKEND_URL}/analyze', json=data)
-            st.session_state['analysis'] = r.json() if r.ok else None
+            ok, result = call('POST', '/analyze', payload=data)
+            st.session_state['analysis'] = result if ok else None
         if 'analysis' in st.session_state:
             st.json(st.session_state['analysis'])
             analysis_json = json.dumps(st.session_state['analysis'], indent=2)
@@ -129,13 +271,15 @@ if data:
     if page == 'Forecast':
         st.header('📈 Price Forecast')
         if st.button('Run Forecast'):
-            r = requests.post(f'{BACKEND_URL}/forecast?method='+forecast_method+'&steps='+str(forecast_steps), json=data)
-            st.session_state['forecast'] = r.json() if r.ok else None
+            ok, result = call('POST', '/forecast', params={'method': forecast_method, 'steps': forecast_steps},
+                              prices=data['prices'], accept=MSGPACK)
+            st.session_state['forecast'] = result if ok else None
         if 'forecast' in st.session_state:
             forecast = st.session_state['forecast']['forecast']
             actual = data['prices']
             fig = go.Figure()
-            fig.add_trace(go.Scatter(y=actual, mode='lines', name='Actual'))
+            positions, points = chart_points(actual)
+            fig.add_trace(go.Scatter(x=positions, y=points, mode='lines', name='Actual'))
             fig.add_trace(go.Scatter(y=forecast, mode='lines', name='Forecast'))
             st.plotly_chart(fig, use_container_width=True)
             min_len = min(len(actual), len(forecast))
@@ -145,12 +289,14 @@ if data:
             # XGBoost Explainability
             if forecast_method == 'xgboost':
                 if st.button('Explain XGBoost Forecast'):
-                    r = requests.post(f'{BACKEND_URL}/explain-forecast', json={'prices': actual, 'steps': forecast_steps, 'window': 5})
-                    if r.ok:
-                        shap_vals = r.json().get('shap_values', [])
-                        eli5_html = r.json().get('eli5_html', '')
-                        st.subheader('SHAP Values')
-                        st.write(shap_vals)
+                    ok, explanation = call('POST', '/explain-forecast',
+                                           payload={'prices': actual, 'steps': forecast_steps, 'window': 5, 'scope': 'horizons'})
+                    if ok:
+                        eli5_html = explanation.get('eli5_html', '')
+                        st.subheader('SHAP Values per Forecast Step')
+                        st.dataframe(pd.DataFrame(explanation.get('shap_values', []), columns=explanation.get('feature_names'),
+                                                  index=[f'step {i+1}' for i in range(len(explanation.get('shap_values', [])))]))
+                        st.bar_chart(pd.Series(explanation.get('importance', {}).get('mean_abs', {}), name='Mean |SHAP|'))
                         st.subheader('ELI5 Explanation')
                         components.html(eli5_html, height=400, scrolling=True)
                     else:
@@ -158,22 +304,22 @@ if data:
     if page == 'Sentiment':
         st.header('📰 Sentiment Analysis')
         if st.button('Run Sentiment Analysis'):
-            r = requests.post(f'{BACKEND_URL}/sentiment', json=data)
-            st.session_state['sentiment'] = r.json() if r.ok else None
+            ok, result = call('POST', '/sentiment', payload=data)
+            st.session_state['sentiment'] = result if ok else None
         if 'sentiment' in st.session_state:
             st.json(st.session_state['sentiment'])
     if page == 'Risk':
         st.header('⚠️ Risk Metrics')
         if st.button('Calculate Risk Metrics'):
-            r = requests.post(f'{BACKEND_URL}/risk', json=data)
-            st.session_state['risk'] = r.json() if r.ok else None
+            ok, result = call('POST', '/risk', prices=data['prices'], accept=MSGPACK)
+            st.session_state['risk'] = result if ok else None
         if 'risk' in st.session_state:
             st.json(st.session_state['risk'])
     if page == 'Portfolio':
         st.header('💼 Portfolio Optimization')
         if st.button('Optimize Portfolio'):
-            r = requests.post(f'{BACKEND_URL}/optimize?risk_aversion='+str(risk_aversion), json=data)
-            st.session_state['optimize'] = r.json() if r.ok else None
+            ok, result = call('POST', '/optimize', params={'risk_aversion': risk_aversion}, payload=data)
+            st.session_state['optimize'] = result if ok else None
         if 'optimize' in st.session_state:
             st.json(st.session_state['optimize'])
             portfolio_json = json.dumps(st.session_state['optimize'], indent=2)
@@ -0,0 +1,54 @@
+import numpy as np
+
+MAX_CHART_POINTS = 2000  # Points drawn per series; longer series are downsampled for display only
+
+
+def lttb_indices(y, threshold, x=None):
+    """
+    Indices of the points kept by Largest-Triangle-Three-Buckets downsampling.
+    The first and last points are always kept; in between, each bucket keeps the point
+    forming the largest triangle with the previously kept point and the next bucket's
+    average, which preserves peaks, troughs and the overall shape of the series.
+    Args:
+        y (np.array): Values.
+        threshold (int): Number of points to keep.
+        x (np.array, optional): Positions of the values (default 0..len(y)-1).
+    Returns:
+        np.array: Sorted indices into y; all of them when len(y) <= threshold.
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.arange(n, dtype=float) if x is None else np.asarray(x, dtype=float)
+    # Bucket edges over the points between the fixed first and last ones
+    edges = (np.arange(threshold - 1) * ((n - 2) / (threshold - 2))).astype(int) + 1
+    edges[-1] = n - 1
+    indices = np.empty(threshold, dtype=int)
+    indices[0], indices[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        indices[i + 1] = a
+    return indices
+
+
+def downsample(values, max_points=MAX_CHART_POINTS, index=None):
+    """
+    Downsample a series for plotting with LTTB.
+    Args:
+        values (list or np.array): Values to plot.
+        max_points (int): Maximum points returned.
+        index (list, optional): Labels of the values (e.g. dates).
+    Returns:
+        tuple: (positions, labels or None, values) of the kept points.
+    """
+    values = np.asarray(values, dtype=float)
+    keep = lttb_indices(values, max_points)
+    labels = None if index is None else [index[i] for i in keep]
+    return keep, labels, values[keep]
@@ -1,5 +1,7 @@
 import pytest
-from backend.analysis import analyze_financials, forecast_prices, analyze_sentiment, risk_metrics, optimize_portfolio
+import numpy as np
+from backend.analysis import analyze_financials, forecast_prices, analyze_sentiment, risk_metrics, optimize_portfolio, risk_metrics_batch, portfolio_frontier, build_report, simulate_risk, correlation_peers
+from backend.risk import MAX_SIMULATED_STEPS
 
 def sample_data():
     return {
@@ -38,4 +40,77 @@ def test_optimize_portfolio():
     data = sample_data()
     result = optimize_portfolio(data, risk_aversion=0.5)
     assert 'weights' in result
-    assert abs(sum(result['weights'].values()) - 1) < 1e-6 
\ No newline at end of file
+    assert abs(sum(result['weights'].values()) - 1) < 1e-6
+
+def test_risk_metrics_batch():
+    data = {'assets': ['AAPL', 'GOOG'], 'prices': [[100, 102, 101, 105, 107, 110], [50, None, 52]]}
+    result = risk_metrics_batch(data)
+    assert result['assets'] == ['AAPL', 'GOOG']
+    assert len(result['volatility']) == 2
+    assert result['sharpe_ratio'][1] is None
+    assert 'error' in risk_metrics_batch({'prices': [[1, 'a']]})
+
+
+def test_optimize_portfolio_mean_variance():
+    data = {'price_history': {'AAPL': [100, 102, 101, 105, 107, 110], 'GOOG': [50, 51, 49, 52, 53, 52], 'TSLA': [20, 22, 19, 23, 21, 24]}}
+    result = optimize_portfolio(data, risk_aversion=5)
+    assert set(result['weights']) == {'AAPL', 'GOOG', 'TSLA'}
+    assert abs(sum(result['weights'].values()) - 1) < 1e-6
+    assert min(result['weights'].values()) >= 0
+    frontier = portfolio_frontier(data, points=5)
+    assert len(frontier['frontier']) == 5
+    for kwargs in ({'points': 0}, {'points': 10 ** 6}, {'min_risk_aversion': 0}, {'min_risk_aversion': 10, 'max_risk_aversion': 1}):
+        assert 'error' in portfolio_frontier(data, **kwargs)
+
+def test_build_report_runs_selected_sections():
+    data = sample_data()
+    report = build_report(data, sections=['forecast', 'risk', 'sentiment'], steps=3)
+    assert set(report) == {'forecast', 'risk', 'sentiment', 'timings'}
+    assert len(report['forecast']['forecast']) == 3
+    assert report['risk'] == risk_metrics(data)
+    assert set(report['timings']) == {'forecast', 'risk', 'sentiment', 'total'}
+    assert data['prices'] == [100, 102, 101, 105, 107, 110]  # The payload is not modified
+
+def test_build_report_errors():
+    assert 'error' in build_report(sample_data(), sections=['risk', 'bogus'])
+    data = sample_data()
+    data['prices'] = [100, 'x']
+    report = build_report(data)
+    assert 'error' in report['forecast'] and 'error' in report['risk']
+    assert 'financial_ratios' in report['analysis'] and 'weights' in report['optimize']
+
+
+def test_forecast_prices_arima_incremental():
+    data = sample_data()
+    data['prices'] = [100 + i + (i % 3) for i in range(40)]
+    data['series_id'] = 'test-incremental'
+    first = forecast_prices(data, method='arima_incremental', steps=2)
+    assert len(first['forecast']) == 2 and first['state']['action'] in ('fit', 'unchanged')
+    data['prices'] = data['prices'] + [141, 143]
+    assert forecast_prices(data, method='arima_incremental', steps=2)['state']['action'] in ('update', 'fit')
+
+def test_simulate_risk_portfolio_and_errors():
+    rng = np.random.default_rng(0)
+    history = {name: (100 * np.cumprod(1 + rng.normal(0, 0.01, 200))).tolist() for name in ('A', 'B')}
+    result = simulate_risk({'price_history': history, 'weights': {'A': 3, 'B': 1}}, paths=2000, horizon=5, seed=1)
+    assert result['assets'] == ['A', 'B']
+    assert np.allclose(result['weights'], [0.75, 0.25])
+    assert set(result['var']) == {'0.95', '0.99'}
+    single = simulate_risk({'prices': history['A']}, paths=2000, horizon=5, model='bootstrap', seed=1)
+    assert single['paths'] == 2000 and 'assets' not in single
+    assert 'error' in simulate_risk({'prices': history['A']}, model='garch')
+    assert 'error' in simulate_risk({'prices': [100, 101]})
+    assert 'error' in simulate_risk({'price_history': history}, paths=MAX_SIMULATED_STEPS // 8, horizon=5)
+
+def test_correlation_peers():
+    rng = np.random.default_rng(0)
+    returns = {f'T{i}': rng.normal(0, 0.01, 100).tolist() for i in range(6)}
+    returns['T5'] = (np.array(returns['T0']) + rng.normal(0, 0.001, 100)).tolist()
+    result = correlation_peers({'returns': returns}, tickers=['T0'], k=2)
+    assert [p['asset'] for p in result['peers']['T0']][0] == 'T5'
+    assert len(result['peers']['T0']) == 2
+    ewma = correlation_peers({'returns': returns}, k=3, method='ewma', dtype='float32')
+    assert set(ewma['peers']) == set(returns) and ewma['peers']['T5'][0]['asset'] == 'T0'
+    assert 'error' in correlation_peers({'returns': returns}, tickers=['XYZ'])
+    assert 'error' in correlation_peers({'returns': returns}, method='kendall')
+
@@ -0,0 +1,45 @@
+import numpy as np
+from backend.arima import ArimaStateStore, incremental_arima_forecast, search_arima_order, candidate_orders
+
+def sample_prices(n=300, seed=0):
+    return 100 * np.cumprod(1 + np.random.default_rng(seed).normal(0, 0.01, n))
+
+def test_incremental_updates_without_refit():
+    prices = sample_prices()
+    store = ArimaStateStore(refit_every=50)
+    first = incremental_arima_forecast(prices[:250], steps=3, store=store)
+    assert first['state']['action'] == 'fit'
+    assert incremental_arima_forecast(prices[:250], steps=3, store=store)['state']['action'] == 'unchanged'
+    updated = incremental_arima_forecast(prices[:260], steps=3, store=store)
+    assert updated['state'] == {'action': 'update', 'reason': None, 'observations_since_fit': 10}
+    # Filtering the new ticks with fixed parameters matches appending them to the original fit
+    reference = ArimaStateStore().update('ref', prices[:250])['results'].append(prices[250:260])
+    assert np.allclose(updated['forecast'], reference.forecast(3))
+
+def test_series_locks_are_striped():
+    store = ArimaStateStore()
+    locks = {id(store._lock((f'series{i}', (1, 1, 1)))) for i in range(1000)}
+    assert len(locks) <= len(store._locks)
+    assert store._lock(('a', (1, 1, 1))) is store._lock(('a', (1, 1, 1)))
+
+def test_refit_on_schedule_history_change_and_drift():
+    prices = sample_prices()
+    store = ArimaStateStore(refit_every=20)
+    incremental_arima_forecast(prices[:200], series_id='A', store=store)
+    assert incremental_arima_forecast(prices[:225], series_id='A', store=store)['state']['reason'] == 'schedule'
+    changed = prices[:230].copy()
+    changed[10] += 1
+    assert incremental_arima_forecast(changed, series_id='A', store=store)['state']['reason'] == 'history changed'
+    jumped = np.concatenate([changed, changed[-1] * np.array([1.2, 1.4])])
+    assert incremental_arima_forecast(jumped, series_id='A', store=store)['state']['reason'] == 'drift'
+
+def test_order_search_in_processes():
+    prices = sample_prices(150)
+    orders = candidate_orders(1, 1, 1)
+    result = search_arima_order(prices, orders, processes=2)
+    assert len(result['candidates']) == len(orders) == 8
+    assert result['best_order'] == result['candidates'][0]['order']
+    aics = [c['aic'] for c in result['candidates'] if c['aic'] is not None]
+    assert result['best_aic'] == min(aics)
+    assert all(c['seconds'] > 0 for c in result['candidates'])
+    assert search_arima_order(prices, orders, processes=1)['best_order'] == result['best_order']
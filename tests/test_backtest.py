@@ -0,0 +1,39 @@
+import json
+import pytest
+from backend.backtest import forecast_origins, evaluate_series, run_backtest, validate_settings
+
+PRICES = [100 + i + (i % 4) for i in range(40)]
+
+def test_forecast_origins():
+    assert forecast_origins(20, horizon=5) == [10, 15]
+    assert forecast_origins(20, horizon=5, initial=12, step=2) == [12, 14]
+
+def test_validate_settings():
+    validate_settings(['xgboost', 'lstm'], horizon=3, mode='rolling', initial=20, step=1)
+    for kwargs in ({'horizon': 0}, {'step': 0}, {'initial': -1}, {'mode': 'bogus'}):
+        with pytest.raises(ValueError):
+            validate_settings(['xgboost'], **kwargs)
+    with pytest.raises(ValueError):
+        validate_settings(['garch'])
+    with pytest.raises(ValueError):
+        run_backtest({'a': PRICES}, methods=['xgboost'], horizon=0)
+
+def test_evaluate_series_metrics():
+    result = evaluate_series(PRICES, 'xgboost', horizon=3, mode='rolling', initial=20)
+    assert result['origins'] == 6
+    assert result['failures'] == 0
+    assert result['mae'] >= 0 and result['mape'] >= 0
+    assert 0 <= result['directional_accuracy'] <= 1
+    assert result['fit_seconds'] > 0 and result['predict_seconds'] > 0
+
+def test_run_backtest_resumes_from_checkpoint(tmp_path):
+    checkpoint = str(tmp_path / 'backtest.jsonl')
+    series = {'a': PRICES, 'b': PRICES[::-1]}
+    first = run_backtest(series, methods=['xgboost'], horizon=3, processes=2, checkpoint=checkpoint)
+    assert set(first['best'].values()) == {'xgboost'}
+    with open(checkpoint) as f:
+        assert len(f.readlines()) == 2
+    resumed = run_backtest(series, methods=['xgboost', 'lstm'], horizon=3, processes=1, checkpoint=checkpoint)
+    assert resumed['results']['a']['xgboost'] == first['results']['a']['xgboost']
+    with open(checkpoint) as f:
+        assert {json.loads(line)['method'] for line in f} == {'xgboost', 'lstm'}
@@ -0,0 +1,26 @@
+import time
+from backend.cache import ModelCache, series_key
+
+def test_series_key_depends_on_content_and_params():
+    assert series_key([1, 2, 3], 'arima', order=(1, 1, 1)) == series_key([1.0, 2.0, 3.0], 'arima', order=(1, 1, 1))
+    assert series_key([1, 2, 3], 'arima', order=(1, 1, 1)) != series_key([1, 2, 4], 'arima', order=(1, 1, 1))
+    assert series_key([1, 2, 3], 'arima', order=(1, 1, 1)) != series_key([1, 2, 3], 'arima', order=(2, 1, 1))
+    assert series_key([1, 2, 3], 'xgboost', window=5) != series_key([1, 2, 3], 'prophet')
+
+def test_model_cache_hits_and_evicts():
+    cache = ModelCache(maxsize=2, ttl=None)
+    fits = []
+    for key in ['a', 'b', 'a', 'c', 'b']:
+        cache.get_or_fit(key, lambda: fits.append(1) or key)
+    stats = cache.stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 4
+    assert stats['evictions'] == 2
+    assert len(fits) == 4
+
+def test_model_cache_ttl_expires():
+    cache = ModelCache(maxsize=2, ttl=0.01)
+    cache.put('a', 1)
+    time.sleep(0.02)
+    assert cache.get('a') is None
+    assert cache.stats()['expirations'] == 1
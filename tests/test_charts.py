@@ -0,0 +1,22 @@
+import numpy as np
+from dashboard.charts import lttb_indices, downsample
+
+def test_lttb_keeps_endpoints_and_order():
+    y = np.cumsum(np.random.default_rng(0).normal(size=10000))
+    indices = lttb_indices(y, 500)
+    assert len(indices) == 500
+    assert indices[0] == 0 and indices[-1] == len(y) - 1
+    assert np.all(np.diff(indices) > 0)
+    assert list(lttb_indices(y[:100], 500)) == list(range(100))
+
+def test_lttb_preserves_spikes():
+    y = np.zeros(5000)
+    y[1234], y[3210] = 50.0, -40.0
+    indices = lttb_indices(y, 100)
+    assert 1234 in indices and 3210 in indices
+
+def test_downsample_labels():
+    dates = [f'd{i}' for i in range(1000)]
+    positions, labels, values = downsample(np.arange(1000.0), 10, index=dates)
+    assert labels == [dates[i] for i in positions]
+    assert np.array_equal(values, positions.astype(float))
@@ -0,0 +1,50 @@
+import numpy as np
+from backend.covariance import (sample_covariance, ewma_covariance, correlation, correlation_rows, top_peers,
+                                EwmaCovariance, EwmaStateStore)
+
+def returns(t=120, n=37, seed=0):
+    return np.random.default_rng(seed).normal(0, 0.01, (t, n))
+
+def test_blocked_sample_covariance_matches_numpy():
+    x = returns()
+    assert np.allclose(sample_covariance(x, block=8), np.cov(x, rowvar=False))
+    cov32 = sample_covariance(x, block=8, dtype=np.float32)
+    assert cov32.dtype == np.float32
+    assert np.allclose(cov32, np.cov(x, rowvar=False), atol=1e-8)
+    assert np.allclose(correlation(sample_covariance(x)), np.corrcoef(x, rowvar=False))
+
+def test_ewma_updates_match_batch():
+    x = returns()
+    expected = ewma_covariance(x, decay=0.9, block=8)
+    model = EwmaCovariance(x.shape[1], decay=0.9, block=8)
+    for row in x[:50]:
+        model.update(row)
+    model.extend(x[50:])
+    assert model.n_obs == len(x)
+    assert np.allclose(model.matrix, expected)
+    assert np.allclose(model.correlation_rows([2, 5]), correlation(expected)[[2, 5]])
+
+def test_ewma_state_store_updates_in_place():
+    x = returns()
+    assets = [f'A{i}' for i in range(x.shape[1])]
+    store = EwmaStateStore()
+    model, action, _ = store.update(assets, x[:100])
+    assert action == 'fit'
+    same, action, rows = store.update(assets, x, columns=[0])
+    assert same is model and action == 'update'
+    assert np.allclose(model.matrix, ewma_covariance(x))
+    assert rows.shape == (1, len(assets))
+    assert store.update(assets, x)[1] == 'unchanged'
+    assert store.update(assets, x[::-1])[1] == 'fit'
+
+def test_top_peers_matches_full_sort():
+    x = returns()
+    x[:, 7] = x[:, 3] + np.random.default_rng(1).normal(0, 0.001, len(x))
+    rows = correlation_rows(x, [3, 10])
+    assert np.allclose(rows, np.corrcoef(x, rowvar=False)[[3, 10]])
+    indices, values = top_peers(rows, [3, 10], k=5)
+    assert indices[0, 0] == 7
+    for q, col in enumerate([3, 10]):
+        ranked = [j for j in np.argsort(-rows[q]) if j != col][:5]
+        assert list(indices[q]) == ranked
+        assert np.all(np.diff(values[q]) <= 0)
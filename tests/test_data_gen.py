@@ -0,0 +1,34 @@
+import json
+import numpy as np
+from backend.data_gen import MarketSimulator, generate_market, generate_market_to_disk, generate_synthetic_data
+
+def test_generate_market_is_seeded_and_correlated():
+    cov = np.array([[1.0, 0.9], [0.9, 1.0]]) * 1e-4
+    first = generate_market(n_assets=2, n_ticks=5000, n_news=20, cov=cov, seed=7)
+    second = generate_market(n_assets=2, n_ticks=5000, n_news=20, cov=cov, seed=7)
+    assert np.array_equal(first['prices'], second['prices'])
+    assert first['news'] == second['news']
+    assert first['prices'].shape == (5000, 2)
+    assert set(np.unique(first['regimes'])) <= {0, 1}
+    assert np.corrcoef(np.log(first['prices']).T[:, 1:] - np.log(first['prices']).T[:, :-1])[0, 1] > 0.7
+
+def test_simulator_chunks_continue_the_path():
+    sim = MarketSimulator(n_assets=3, seed=1)
+    prices = np.concatenate([sim.step(n)[0] for n in (10, 0, 25)])
+    assert prices.shape == (35, 3)
+    assert np.all(np.abs(np.diff(np.log(prices), axis=0)) < 0.5)
+
+def test_generate_market_to_disk(tmp_path):
+    paths = generate_market_to_disk(str(tmp_path), n_assets=4, n_ticks=1000, news_per_chunk=3, seed=0, chunk_ticks=300)
+    prices = np.load(paths['prices.npy'], mmap_mode='r')
+    assert prices.shape == (1000, 4) and np.all(prices > 0)
+    with open(paths['news.jsonl']) as f:
+        assert len(f.readlines()) == 12
+    with open(paths['meta.json']) as f:
+        assert json.load(f)['assets'] == ['AAPL', 'GOOG', 'TSLA', 'SYN0003']
+
+def test_generate_synthetic_data_sizes():
+    data = generate_synthetic_data(n_prices=50, n_news=7, n_assets=5, seed=3)
+    assert len(data['prices']) == 50 and len(data['news']) == 7
+    assert len(data['assets']) == 5 and len(data['price_history']) == 5
+    assert generate_synthetic_data(seed=3) == generate_synthetic_data(seed=3)
@@ -0,0 +1,111 @@
+import datetime
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import numpy as np
+import pytest
+from backend import data_sources
+from backend.price_store import PriceStore
+from backend.data_sources import DiskCache, fetch_stock_data, fetch_stock_data_bulk, fetch_news, set_stock_provider
+
+class FakeProvider:
+    def __init__(self, failures=0, days=30):
+        self.calls = []
+        self.failures = failures
+        self.days = days
+
+    def ohlcv(self, ticker, interval='1d', start=None, period=None):
+        self.calls.append((ticker, start, period))
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError('temporary failure')
+        today = np.datetime64(datetime.date.today(), 'D')
+        dates = np.arange(today - self.days + 1, today + 1)
+        if start is not None:
+            dates = dates[dates >= np.datetime64(start, 'D')]
+        close = 100.0 + (dates - today).astype(float)
+        return {'date': dates.astype('datetime64[s]'), 'open': close, 'high': close + 1,
+                'low': close - 1, 'close': close, 'volume': np.full(len(dates), 1000.0)}
+
+@pytest.fixture
+def offline(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_sources, 'CACHE', DiskCache(str(tmp_path / 'cache')))
+    monkeypatch.setattr(data_sources, 'STORE', PriceStore(str(tmp_path / 'store')))
+    monkeypatch.setattr(data_sources, 'RETRY_BACKOFF', 0)
+    provider = FakeProvider()
+    set_stock_provider(provider)
+    yield provider
+    set_stock_provider(data_sources.YFinanceProvider())
+
+def test_fetch_stock_data_is_cached(offline):
+    data = fetch_stock_data('AAPL', period='5d')
+    assert data['prices'] == [95.0, 96.0, 97.0, 98.0, 99.0, 100.0]
+    assert data['dates'][-1] == str(datetime.date.today())
+    assert fetch_stock_data('AAPL', period='5d') == data
+    assert len(offline.calls) == 1
+
+def test_fetch_stock_data_appends_only_tail(offline):
+    fetch_stock_data('AAPL', period='1mo', use_cache=False)
+    data_sources.STORE.write('AAPL', {k: v[:-3] for k, v in data_sources.STORE.read('AAPL').items()},
+                             covered_from=data_sources.period_start('1mo'))
+    data = fetch_stock_data('AAPL', period='5d', use_cache=False)
+    assert data['prices'] == [95.0, 96.0, 97.0, 98.0, 99.0, 100.0]
+    assert offline.calls[-1][1] == str(datetime.date.today() - datetime.timedelta(days=3))
+    fetch_stock_data('AAPL', period='1y', use_cache=False)
+    assert offline.calls[-1] == ('AAPL', None, '1y')
+
+def test_fetch_stock_data_replaces_partial_last_bar(offline, monkeypatch):
+    fetch_stock_data('AAPL', period='5d', use_cache=False)
+    ohlcv = offline.ohlcv
+
+    def closed(ticker, interval='1d', start=None, period=None):
+        bars = ohlcv(ticker, interval, start, period)
+        bars['close'] = bars['close'] + 0.5  # The bar fetched mid-session has since closed higher
+        return bars
+    monkeypatch.setattr(offline, 'ohlcv', closed)
+    data = fetch_stock_data('AAPL', period='5d', use_cache=False)
+    assert offline.calls[-1][1] == str(datetime.date.today())
+    assert data['prices'] == [95.0, 96.0, 97.0, 98.0, 99.0, 100.5]
+    assert len(data['dates']) == 6
+
+def test_fetch_stock_data_retries(offline, monkeypatch):
+    monkeypatch.setattr(offline, 'failures', 2)
+    assert 'prices' in fetch_stock_data('MSFT', use_cache=False)
+    assert len(offline.calls) == 3
+
+def test_fetch_stock_data_bulk(offline):
+    result = fetch_stock_data_bulk(['AAPL', 'MSFT', 'AAPL', 'TSLA'], max_workers=2)
+    assert sorted(result) == ['AAPL', 'MSFT', 'TSLA']
+    assert sorted(call[0] for call in offline.calls) == ['AAPL', 'MSFT', 'TSLA']
+
+def test_disk_cache_ttl(tmp_path):
+    cache = DiskCache(str(tmp_path), ttl=-1)
+    cache.set(['news', 'q', 5], [1])
+    assert cache.get(['news', 'q', 5]) is None
+
+def test_fetch_news_against_stub_server(offline, monkeypatch):
+    requests_seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests_seen.append(self.path)
+            body = json.dumps({'articles': [{'title': 'Stocks rally', 'url': 'http://example.com/a'}]}).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(data_sources, 'NEWS_API_URL', f'http://127.0.0.1:{server.server_port}/v2/everything')
+    try:
+        assert fetch_news('rates', 3) == [{'headline': 'Stocks rally', 'url': 'http://example.com/a'}]
+        assert fetch_news('rates', 3)[0]['headline'] == 'Stocks rally'
+    finally:
+        server.shutdown()
+    assert len(requests_seen) == 1
+    assert 'q=rates' in requests_seen[0] and 'pageSize=3' in requests_seen[0]
@@ -0,0 +1,47 @@
+import numpy as np
+from backend import explain
+from backend.explain import explain_xgboost_forecast, EXPLAINER_CACHE
+
+def sample_prices(n=120):
+    return (100 * np.cumprod(1 + np.random.default_rng(0).normal(0, 0.01, n))).tolist()
+
+def test_explain_last_window_reuses_explainer():
+    prices = sample_prices()
+    EXPLAINER_CACHE.clear()
+    result = explain_xgboost_forecast(prices, window=5, html=False)
+    assert np.shape(result['shap_values']) == (1, 5)
+    assert 'eli5_html' not in result
+    assert result['feature_names'] == [f'lag_{i+1}' for i in range(5)]
+    explain_xgboost_forecast(prices, window=5, html=False)
+    assert EXPLAINER_CACHE.stats()['size'] == 1 and EXPLAINER_CACHE.stats()['hits'] >= 1
+
+def test_explain_batch_scopes_are_additive():
+    prices = sample_prices()
+    horizons = explain_xgboost_forecast(prices, steps=4, window=5, scope='horizons', html=False)
+    assert np.shape(horizons['shap_values']) == (4, 5)
+    series = explain_xgboost_forecast(prices, window=5, scope='series', html=False)
+    values = np.array(series['shap_values'])
+    assert values.shape == (len(prices) - 5 + 1, 5)
+    last = explain_xgboost_forecast(prices, window=5, html=False)
+    assert np.allclose(values[-1], last['shap_values'][0], atol=1e-4)
+    assert np.allclose(horizons['shap_values'][0], last['shap_values'][0], atol=1e-4)
+    importance = series['importance']
+    assert np.isclose(importance['mean_abs']['lag_1'], np.abs(values[:, 0]).mean())
+    assert sorted(importance['ranking']) == series['feature_names']
+
+def test_explain_sampling_and_errors(monkeypatch):
+    monkeypatch.setattr(explain, 'EXPLAIN_MAX_ROWS', 10)
+    result = explain_xgboost_forecast(sample_prices(), window=5, scope='series', html=False)
+    assert len(result['shap_values']) == 10
+    assert 'error' in explain_xgboost_forecast(sample_prices(), scope='bogus')
+    assert 'error' in explain_xgboost_forecast([1.0, 2.0], window=5)
+    assert 'error' in explain_xgboost_forecast(sample_prices(), steps=0, scope='horizons')
+    assert 'error' in explain_xgboost_forecast(sample_prices(), steps=-2, scope='horizons')
+
+def test_eli5_html_is_cached():
+    prices = sample_prices()
+    explain.HTML_CACHE.clear()
+    first = explain_xgboost_forecast(prices, window=5)
+    second = explain_xgboost_forecast(prices, window=5, scope='horizons')
+    assert first['eli5_html'] and second['eli5_html'] is first['eli5_html']
+    assert explain.HTML_CACHE.stats()['hits'] == 1
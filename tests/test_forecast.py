@@ -1,4 +1,4 @@
-from backend.forecast import arima_forecast, lstm_forecast_placeholder
+from backend.forecast import arima_forecast, lstm_forecast_placeholder, xgboost_forecast, xgboost_forecast_many, lag_features, MODEL_CACHE
 
 def test_arima_forecast():
     prices = [100, 102, 101, 105, 107, 110]
@@ -10,4 +10,27 @@ def test_lstm_forecast_placeholder():
     prices = [100, 102, 101, 105, 107, 110]
     forecast = lstm_forecast_placeholder(prices, steps=3)
     assert isinstance(forecast, list)
-    assert len(forecast) == 3 
\ No newline at end of file
+    assert len(forecast) == 3 
+
+def test_xgboost_forecast_reuses_cached_model():
+    prices = [100, 102, 101, 105, 107, 110, 108, 111, 115, 113]
+    first = xgboost_forecast(prices, steps=3)
+    hits = MODEL_CACHE.stats()['hits']
+    assert xgboost_forecast(prices, steps=3) == first
+    assert MODEL_CACHE.stats()['hits'] == hits + 1
+
+def test_lag_features_are_strided_windows():
+    X, y = lag_features([1, 2, 3, 4, 5, 6], window=3)
+    assert X.tolist() == [[1, 2, 3], [2, 3, 4], [3, 4, 5]]
+    assert y.tolist() == [4, 5, 6]
+    X, y = lag_features([1, 2, 3, 4, 5, 6], window=3, horizon=2)
+    assert X.tolist() == [[1, 2, 3], [2, 3, 4]]
+    assert y.tolist() == [[4, 5], [5, 6]]
+
+def test_xgboost_direct_and_global_forecasts():
+    prices = [100 + i + (i % 3) for i in range(40)]
+    assert len(xgboost_forecast(prices, steps=4, strategy='direct')) == 4
+    forecasts = xgboost_forecast_many([prices, [p * 10 for p in prices], [1, 2]], steps=3)
+    assert [len(f) for f in forecasts] == [3, 3, 3]
+    assert forecasts[2] == [2.0, 2.0, 2.0]
+    assert abs(forecasts[1][0] / forecasts[0][0] - 10) < 1e-6
@@ -0,0 +1,42 @@
+import time
+import pytest
+from backend.jobs import JobQueue, QueueFull
+
+def wait_for(queue, job_id, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        info = queue.status(job_id)
+        if info['status'] not in ('queued', 'running'):
+            return info
+        time.sleep(0.05)
+    raise AssertionError('job did not finish')
+
+def test_job_result_and_stats():
+    queue = JobQueue(max_workers=1)
+    try:
+        ok = queue.submit('pow', pow, 2, 10)
+        bad = queue.submit('int', int, 'not a number')
+        assert wait_for(queue, ok)['result'] == 1024
+        failed = wait_for(queue, bad)
+        assert failed['status'] == 'failed' and 'invalid literal' in failed['error']
+        stats = queue.stats()
+        assert stats['methods']['pow']['count'] == 1
+        assert 'int' not in stats['methods']
+        assert queue.status('unknown') is None
+    finally:
+        queue.shutdown()
+
+def test_cancel_queued_job_and_queue_full():
+    queue = JobQueue(max_workers=1, max_pending=4)
+    try:
+        # One call runs and the pool hands up to max_workers + 1 more to its workers; later ones stay queued
+        for _ in range(3):
+            queue.submit('sleep', time.sleep, 1)
+        queued = queue.submit('sleep', time.sleep, 1)
+        with pytest.raises(QueueFull):
+            queue.submit('sleep', time.sleep, 1)
+        assert queue.cancel(queued)
+        assert queue.status(queued)['status'] == 'cancelled'
+        assert not queue.cancel('unknown')
+    finally:
+        queue.shutdown(wait=False)
@@ -0,0 +1,16 @@
+import sys
+from backend.lazy import lazy_import, warm_up, import_report
+
+def test_lazy_import_defers_loading():
+    sys.modules.pop('colorsys', None)
+    mod = lazy_import('colorsys')
+    assert not mod.loaded
+    assert 'colorsys' not in sys.modules
+    assert mod.rgb_to_hsv(1.0, 0.0, 0.0)[0] == 0.0
+    assert mod.loaded
+
+def test_warm_up_reports_import_cost():
+    report = warm_up(['calendar'])
+    assert report['modules']['calendar']['loaded']
+    assert report['modules']['calendar']['seconds'] >= 0
+    assert 'calendar' in import_report()['modules']
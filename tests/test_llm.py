@@ -0,0 +1,63 @@
+import pytest
+from backend import llm
+from backend.cache import DiskCache
+from backend.llm import CompletionClient, summarize_batch, summarize_text
+from backend.mock_llm import MockCompletionServer, mock_summary
+
+@pytest.fixture
+def server():
+    server = MockCompletionServer().start()
+    yield server
+    server.stop()
+
+@pytest.fixture
+def cache(tmp_path):
+    return DiskCache(str(tmp_path / 'summaries'))
+
+def test_summarize_text_is_cached(server, cache):
+    client = CompletionClient(server.base_url)
+    text = 'Company X beats earnings expectations. Shares rise.'
+    assert summarize_text(text, client=client, cache=cache) == mock_summary(text)
+    assert summarize_text(text, client=client, cache=cache) == mock_summary(text)
+    assert len(server.requests) == 1
+    assert server.requests[0]['messages'][-1]['content'] == text
+
+def test_summarize_batch_packs_short_texts(server, cache, monkeypatch):
+    monkeypatch.setattr(llm, 'MAX_BATCH_ITEMS', 10)
+    client = CompletionClient(server.base_url)
+    headlines = [f'Headline number {i} moves markets' for i in range(25)]
+    texts = headlines + ['A long filing. ' * 40, headlines[0]]
+    summaries = summarize_batch(texts, client=client, cache=cache)
+    assert summaries == [mock_summary(t) for t in texts]
+    assert len(server.requests) == 4  # Three packed batches plus the long text on its own
+    assert summarize_batch(headlines[:3], client=client, cache=cache) == summaries[:3]
+    assert len(server.requests) == 4
+
+def test_malformed_batch_reply_falls_back(server, cache, monkeypatch):
+    monkeypatch.setattr(llm, '_parse_batch', lambda content, count: None)
+    client = CompletionClient(server.base_url)
+    texts = ['First headline', 'Second headline']
+    assert summarize_batch(texts, client=client, cache=cache) == [mock_summary(t) for t in texts]
+    assert len(server.requests) == 3
+
+def test_retries_and_errors(cache):
+    flaky = MockCompletionServer(fail_first=2).start()
+    try:
+        client = CompletionClient(flaky.base_url, max_retries=2)
+        assert summarize_text('Rates unchanged.', client=client, cache=cache) == mock_summary('Rates unchanged.')
+        assert len(flaky.requests) == 3
+    finally:
+        flaky.stop()
+    down = CompletionClient(flaky.base_url, max_retries=0, timeout=(0.5, 0.5))
+    assert summarize_text('Rates cut.', client=down, cache=cache).startswith('Error:')
+    assert cache.get(llm._cache_key('Rates cut.', down.model, 128)) is None
+
+def test_concurrency_is_bounded(cache):
+    slow = MockCompletionServer(delay=0.05).start()
+    try:
+        client = CompletionClient(slow.base_url, max_concurrency=2)
+        texts = ['A long filing. ' * 40 + str(i) for i in range(6)]
+        assert summarize_batch(texts, client=client, cache=cache) == [mock_summary(t) for t in texts]
+        assert slow.max_active <= 2
+    finally:
+        slow.stop()
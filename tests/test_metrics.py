@@ -0,0 +1,29 @@
+from backend.metrics import MetricsRegistry
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry(buckets=(0.1, 1.0))
+    registry.describe('requests_total', 'counter', 'Requests.')
+    registry.describe('latency_seconds', 'histogram', 'Latency.')
+    registry.inc('requests_total', route='/risk', status=200)
+    registry.inc('requests_total', route='/risk', status=200)
+    for value in (0.05, 0.1, 0.5, 3.0):
+        registry.observe('latency_seconds', value, route='/risk')
+    text = registry.render()
+    assert '# TYPE requests_total counter' in text
+    assert 'requests_total{route="/risk",status="200"} 2' in text
+    assert 'latency_seconds_bucket{route="/risk",le="0.1"} 2' in text
+    assert 'latency_seconds_bucket{route="/risk",le="1.0"} 3' in text
+    assert 'latency_seconds_bucket{route="/risk",le="+Inf"} 4' in text
+    assert 'latency_seconds_count{route="/risk"} 4' in text
+    assert 'latency_seconds_sum{route="/risk"} 3.65' in text
+
+def test_time_context_manager_records_on_error():
+    registry = MetricsRegistry()
+    try:
+        with registry.time('stage_seconds', stage='fit'):
+            raise ValueError
+    except ValueError:
+        pass
+    assert 'stage_seconds_count{stage="fit"} 1' in registry.render()
+    registry.inc('n', label='a "quoted"\nvalue')
+    assert 'n{label="a \\"quoted\\"\\nvalue"} 1' in registry.render()
@@ -0,0 +1,65 @@
+import io
+import numpy as np
+import pytest
+from backend.payloads import (JSON, NPY, MSGPACK, ARROW, PayloadError, UnsupportedMediaType, decode_payload,
+                              encode_payload, json_dumps, media_type)
+
+def npy_bytes(array):
+    buffer = io.BytesIO()
+    np.save(buffer, array)
+    return buffer.getvalue()
+
+def test_media_type_aliases():
+    assert media_type(None) == JSON
+    assert media_type('application/json; charset=utf-8') == JSON
+    assert media_type('application/x-msgpack') == MSGPACK
+    assert media_type('application/octet-stream') == NPY
+
+def test_json_round_trip_with_numpy_values():
+    result = {'forecast': np.array([1.5, 2.5]), 'mean': np.float64(2.0), 'count': np.int64(2)}
+    assert decode_payload(encode_payload(result, JSON), JSON) == {'forecast': [1.5, 2.5], 'mean': 2.0, 'count': 2}
+    assert json_dumps({'b': 1, 'a': 2}) in ('{"a":2,"b":1}', '{"a": 2, "b": 1}')
+
+def test_npy_request_and_response():
+    prices = np.array([100.0, 101.0, 99.5])
+    assert np.array_equal(decode_payload(npy_bytes(prices), NPY)['prices'], prices)
+    rows = decode_payload(npy_bytes(np.vstack([prices, prices * 2])), NPY)['prices']
+    assert len(rows) == 2 and np.array_equal(rows[1], prices * 2)
+    body = encode_payload({'forecast': [1.0, 2.0], 'method': 'arima'}, NPY)
+    assert np.array_equal(np.load(io.BytesIO(body)), [1.0, 2.0])
+
+def test_npy_response_needs_one_array():
+    with pytest.raises(UnsupportedMediaType):
+        encode_payload({'volatility': 0.2, 'sharpe_ratio': 1.0}, NPY)
+    with pytest.raises(UnsupportedMediaType):
+        encode_payload({'volatility': [0.2], 'sharpe_ratio': [1.0]}, NPY)
+
+def test_invalid_bodies():
+    with pytest.raises(UnsupportedMediaType):
+        decode_payload(b'a,b', 'text/csv')
+    with pytest.raises(PayloadError):
+        decode_payload(b'{bad', JSON)
+    with pytest.raises(PayloadError):
+        decode_payload(b'[1, 2]', JSON)
+    with pytest.raises(PayloadError):
+        decode_payload(b'not npy', NPY)
+
+def test_msgpack_round_trip():
+    pytest.importorskip('msgpack')
+    prices = np.linspace(100, 110, 50)
+    payload = decode_payload(encode_payload({'prices': prices, 'ticker': 'AAPL', 'steps': 5}, MSGPACK), MSGPACK)
+    assert np.array_equal(payload['prices'], prices)
+    assert payload['ticker'] == 'AAPL' and payload['steps'] == 5
+
+def test_arrow_round_trip():
+    pa = pytest.importorskip('pyarrow')
+    result = {'volatility': [0.1, None], 'assets': ['A', 'B'], 'window': 20}
+    payload = decode_payload(encode_payload(result, ARROW), ARROW)
+    assert payload['window'] == 20 and payload['assets'] == ['A', 'B']
+    assert payload['volatility'][0] == 0.1 and np.isnan(payload['volatility'][1])
+    table = pa.table({'prices': [[1.0, 2.0, 3.0], [4.0, 5.0]]})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    series = decode_payload(sink.getvalue().to_pybytes(), ARROW)['prices']
+    assert [s.tolist() for s in series] == [[1.0, 2.0, 3.0], [4.0, 5.0]]
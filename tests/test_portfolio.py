@@ -0,0 +1,42 @@
+import numpy as np
+from backend.portfolio import ShrunkCovariance, efficient_frontier, project_simplex, align_returns
+
+def sample_returns(t=120, n=6, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.normal(0.0005, 0.01, (t, n)) + rng.normal(0, 0.01, (t, 1))
+
+def ledoit_wolf_reference(returns):
+    x = returns - returns.mean(axis=0)
+    t, n = x.shape
+    sample = x.T @ x / t
+    target = np.trace(sample) / n
+    d2 = np.sum((sample - target * np.eye(n)) ** 2)
+    b2 = sum(np.sum((np.outer(row, row) - sample) ** 2) for row in x) / t ** 2
+    shrinkage = min(b2, d2) / d2
+    return 252 * (shrinkage * target * np.eye(n) + (1 - shrinkage) * sample)
+
+def test_shrunk_covariance_matches_ledoit_wolf():
+    for t, n in [(20, 30), (40, 10)]:
+        returns = sample_returns(t=t, n=n)
+        cov = ShrunkCovariance(returns)
+        assert 0 <= cov.shrinkage <= 1
+        assert np.allclose(cov.dense(), ledoit_wolf_reference(returns))
+
+def test_project_simplex():
+    w = project_simplex(np.array([[0.5, 0.2, -1.0], [3.0, 0.0, 0.0]]))
+    assert np.allclose(w.sum(axis=1), 1)
+    assert np.all(w >= 0)
+    assert np.allclose(w[1], [1, 0, 0])
+
+def test_efficient_frontier_long_only():
+    cov = ShrunkCovariance(sample_returns())
+    result = efficient_frontier(cov, [0.1, 1, 10, 100])
+    assert np.allclose(result['weights'].sum(axis=1), 1)
+    assert np.all(result['weights'] >= 0)
+    assert np.all(np.diff(result['volatility']) <= 1e-9)
+    assert np.all(np.diff(result['expected_return']) <= 1e-9)
+
+def test_align_returns_uses_common_tail():
+    matrix = align_returns([[1, 2, 4], [10, 11]])
+    assert matrix.shape == (1, 2)
+    assert np.allclose(matrix[0], [1.0, 0.1])
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+from backend.price_store import PriceStore, load_prices
+
+def bars(start, n, first=0.0):
+    dates = np.arange(np.datetime64(start, 'D'), np.datetime64(start, 'D') + n).astype('datetime64[s]')
+    close = first + np.arange(n, dtype=float)
+    return {'date': dates, 'open': close, 'high': close + 1, 'low': close - 1, 'close': close, 'volume': close * 10}
+
+def test_append_skips_existing_bars_and_grows(tmp_path):
+    store = PriceStore(str(tmp_path))
+    store.write('AAPL', bars('2024-01-01', 10), covered_from='2024-01-01')
+    assert store.append('AAPL', bars('2024-01-06', 10, first=5.0)) == 5
+    assert store.append('AAPL', bars('2024-01-16', 3000, first=15.0)) == 3000
+    close = store.read('AAPL')['close']
+    assert isinstance(close, np.memmap)
+    assert np.array_equal(close, np.arange(3015, dtype=float))
+    covered, last = store.date_range('AAPL')
+    assert covered == np.datetime64('2024-01-01')
+    assert last == np.datetime64('2024-01-01') + 3014
+
+def test_append_replaces_last_bar(tmp_path):
+    store = PriceStore(str(tmp_path))
+    store.write('AAPL', bars('2024-01-01', 5))
+    update = bars('2024-01-04', 3, first=30.0)
+    assert store.append('AAPL', update) == 1
+    assert store.read('AAPL')['close'].tolist() == [0.0, 1.0, 2.0, 3.0, 31.0, 32.0]
+    assert store.append('AAPL', bars('2024-01-06', 1, first=7.0)) == 0
+    assert store.read('AAPL')['close'].tolist()[-1] == 7.0
+
+def test_range_query_returns_views(tmp_path):
+    store = PriceStore(str(tmp_path))
+    store.append('MSFT', bars('2024-03-01', 31))
+    columns = store.read('MSFT', start='2024-03-10', end='2024-03-12')
+    assert columns['close'].tolist() == [9.0, 10.0, 11.0]
+    assert columns['date'][0] == np.datetime64('2024-03-10')
+    assert not columns['close'].flags.writeable
+    assert load_prices('MSFT', '2024-03-30', store=store).tolist() == [29.0, 30.0]
+    assert store.read('TSLA') == {}
+
+def test_path_rejects_unsafe_symbols(tmp_path):
+    store = PriceStore(str(tmp_path))
+    for ticker, interval in (('../../etc/x', '1d'), ('AAPL', '../1d'), ('AA PL', '1d'), ('AAPL', '2h')):
+        with pytest.raises(ValueError):
+            store.path(ticker, interval)
+    assert store.path('brk.b', '1wk').endswith('BRK.B_1wk.bin')
+    assert store.path('^GSPC').endswith('^GSPC_1d.bin')
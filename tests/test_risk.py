@@ -1,4 +1,5 @@
-from backend.risk import calculate_volatility, calculate_drawdown, calculate_sharpe_ratio
+import numpy as np
+from backend.risk import calculate_volatility, calculate_drawdown, calculate_sharpe_ratio, batch_risk_metrics, pad_series, RollingRisk, rolling_risk_metrics, monte_carlo_risk, simulate_portfolio_paths
 
 def test_calculate_volatility():
     prices = [100, 102, 101, 105, 107, 110]
@@ -15,4 +16,64 @@ def test_calculate_drawdown():
 def test_calculate_sharpe_ratio():
     prices = [100, 102, 101, 105, 107, 110]
     sharpe = calculate_sharpe_ratio(prices)
-    assert isinstance(sharpe, float) 
\ No newline at end of file
+    assert isinstance(sharpe, float)
+
+def test_batch_risk_metrics_matches_single_series():
+    series = [[100, 102, 101, 105, 107, 110], [50, 48, 52, 47]]
+    metrics = batch_risk_metrics(pad_series(series))
+    for i, prices in enumerate(series):
+        prices = np.array(prices, dtype=float)
+        assert np.isclose(metrics['volatility'][i], calculate_volatility(prices))
+        assert np.isclose(metrics['max_drawdown'][i], calculate_drawdown(prices))
+        assert np.isclose(metrics['sharpe_ratio'][i], calculate_sharpe_ratio(prices))
+    assert list(metrics['observations']) == [5, 3]
+
+def test_rolling_risk_matches_full_recompute():
+    prices = [100, 102, 101, 105, 107, 110, 104, 103, 108]
+    rolling = RollingRisk(window=4)
+    for price in prices:
+        metrics = rolling.update(price)
+    window_prices = np.array(prices[-5:], dtype=float)
+    assert np.isclose(metrics['volatility'], calculate_volatility(window_prices))
+    assert np.isclose(metrics['sharpe_ratio'], calculate_sharpe_ratio(window_prices))
+    assert np.isclose(metrics['drawdown'], (110 - 108) / 110)
+    expanding = RollingRisk()
+    metrics = expanding.extend(prices)
+    assert np.isclose(metrics['max_drawdown'], calculate_drawdown(prices))
+    assert metrics['observations'] == len(prices) - 1
+
+def test_rolling_risk_metrics_series():
+    prices = np.array([100, 102, 101, 105, 107, 110, 104, 103, 108], dtype=float)
+    result = rolling_risk_metrics(prices, window=4)
+    assert len(result['volatility']) == len(prices) - 4
+    assert np.isclose(result['volatility'][-1], calculate_volatility(prices[-5:]))
+    assert np.isclose(result['sharpe_ratio'][0], calculate_sharpe_ratio(prices[:5]))
+
+def test_monte_carlo_gbm_var_matches_closed_form():
+    returns = np.random.default_rng(0).normal(0.0005, 0.01, 5000)
+    result = monte_carlo_risk(returns, n_paths=50000, horizon=10, seed=1, confidence=(0.95,))
+    log_returns = np.log1p(returns)
+    var = 1 - np.exp(10 * log_returns.mean() - 1.6448536 * np.sqrt(10) * log_returns.std())
+    assert np.isclose(result['var']['0.95'], var, rtol=0.05)
+    assert result['cvar']['0.95'] > result['var']['0.95']
+    assert 0 <= result['drawdown_breach_probability'] <= 1
+
+def test_monte_carlo_is_reproducible_and_chunked():
+    returns = np.random.default_rng(1).normal(0, 0.02, (300, 2))
+    chunks = list(simulate_portfolio_paths(returns, n_paths=1000, horizon=5, seed=3, chunk_paths=300))
+    assert [len(c) for c in chunks] == [300, 300, 300, 100]
+    assert all(c.shape[1] == 5 for c in chunks)
+    first = monte_carlo_risk(returns, n_paths=1000, horizon=5, model='bootstrap', seed=3, chunk_paths=300)
+    second = monte_carlo_risk(returns, n_paths=1000, horizon=5, model='bootstrap', seed=3, chunk_paths=300)
+    assert first == second
+
+def test_monte_carlo_bootstrap_keeps_correlation():
+    base = np.random.default_rng(2).normal(0, 0.01, 500)
+    returns = np.column_stack([base, base])
+    paths = next(simulate_portfolio_paths(returns, n_paths=200, horizon=3, weights=[1.0, 0.0], model='bootstrap', seed=0))
+    other = next(simulate_portfolio_paths(returns, n_paths=200, horizon=3, weights=[0.0, 1.0], model='bootstrap', seed=0))
+    assert np.allclose(paths, other)
+    crash = monte_carlo_risk(np.full(50, -0.05), n_paths=100, horizon=3, model='bootstrap', drawdown_threshold=0.1)
+    assert crash['drawdown_breach_probability'] == 1.0
+    assert np.isclose(crash['var']['0.95'], 1 - 0.95 ** 3)
+
@@ -1 +1,48 @@
- 
\ No newline at end of file
+import json
+import numpy as np
+import pytest
+from backend.sentiment import (simple_sentiment_score, batch_sentiment_analysis, score_headlines, SentimentScorer,
+                               set_default_lexicon)
+
+def test_simple_sentiment_score_matches_words():
+    assert simple_sentiment_score('Company X beat earnings, record growth') > 0
+    assert simple_sentiment_score('Market volatility increases') < 0
+    assert simple_sentiment_score('Analysts upgrade outlook') == 0
+
+def test_negation_flips_next_term():
+    assert simple_sentiment_score('Shares not up today') < 0
+    assert simple_sentiment_score('No crash expected') > 0
+    assert simple_sentiment_score('Not that anyone expected a record quarter') > 0
+
+def test_batch_sentiment_analysis():
+    results = batch_sentiment_analysis([{'headline': 'Stocks up'}, {'headline': 'Stocks down'}, {}])
+    assert [r['headline'] for r in results] == ['Stocks up', 'Stocks down', '']
+    assert results[0]['score'] > 0 > results[1]['score']
+
+def test_score_headlines_streams_and_loads_lexicon(tmp_path):
+    path = tmp_path / 'lexicon.json'
+    path.write_text(json.dumps({'weights': {'rally': 2, 'sell off': -2}, 'negations': ['no']}))
+    scorer = SentimentScorer.load(str(path))
+    assert scorer.raw_score('Big rally after the SELL  OFF') == 0
+    lexicon = json.loads(path.read_text())
+    chunks = list(score_headlines(iter(['rally', 'no rally', 'flat']), lexicon=lexicon, chunk_size=2))
+    assert [len(c) for c in chunks] == [2, 1]
+    assert np.allclose(np.concatenate(chunks), np.tanh(np.array([2, -2, 0]) / 2))
+
+def test_empty_lexicon_rejected():
+    with pytest.raises(ValueError):
+        SentimentScorer({})
+    with pytest.raises(ValueError):
+        SentimentScorer.from_dict({'weights': {' ': 1}, 'negations': ['']})
+
+def test_set_default_lexicon(tmp_path):
+    path = tmp_path / 'lexicon.json'
+    path.write_text(json.dumps({'weights': {'rally': 2}}))
+    try:
+        set_default_lexicon(str(path))
+        assert batch_sentiment_analysis([{'headline': 'Stocks rally'}])[0]['score'] > 0
+        assert simple_sentiment_score('Stocks up') == 0
+        assert np.allclose(next(score_headlines(['rally', 'up'], processes=2)), [np.tanh(1), 0])
+    finally:
+        set_default_lexicon()
+    assert simple_sentiment_score('Stocks up') > 0
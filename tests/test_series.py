@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+from backend.series import PriceSeries, as_float_array
+from backend.risk import calculate_volatility, calculate_drawdown
+
+def test_ingest_converts_once_and_caches_derived_arrays():
+    series = PriceSeries.ingest([100, 102, 101, 105])
+    assert series.values.dtype == np.float64 and series.values.flags.c_contiguous
+    assert not series.values.flags.writeable
+    assert np.allclose(series.returns, [0.02, -1 / 102, 4 / 101])
+    assert np.allclose(series.log_returns, np.diff(np.log([100, 102, 101, 105])))
+    assert series.returns is series.returns
+    assert series.running_max.tolist() == [100, 102, 102, 105]
+    assert np.isclose(calculate_drawdown(series), 1 / 102)
+    assert calculate_volatility(series) == calculate_volatility([100, 102, 101, 105])
+
+def test_ingest_does_not_copy_float_arrays():
+    prices = np.array([1.0, 2.0, 3.0])
+    series = PriceSeries.ingest(prices)
+    assert np.shares_memory(series.values, prices)
+    assert prices.flags.writeable
+    assert PriceSeries.ingest(series) is series
+
+@pytest.mark.parametrize('prices, message', [
+    ([1, 'a', 3], 'flat list'),
+    ('not a list', 'list of numbers'),
+    ([1, None], 'flat list'),
+    ([1, float('nan')], 'NaN'),
+    ([1, float('inf')], 'NaN'),
+    ([1, 0, 2], 'positive'),
+    ([5], 'At least 2'),
+    ([[1, 2], [3, 4]], 'flat list'),
+])
+def test_ingest_rejects_invalid_prices(prices, message):
+    with pytest.raises(ValueError, match=message):
+        PriceSeries.ingest(prices)
+
+def test_as_float_array_allows_negative_returns():
+    assert as_float_array([0.01, -0.02]).tolist() == [0.01, -0.02]
@@ -0,0 +1,84 @@
+import time
+import numpy as np
+import pytest
+from backend.risk import RollingRisk
+from backend.streaming import StreamHub, ReplaySource, Subscriber
+
+def test_ingest_updates_risk_and_sentiment():
+    hub = StreamHub(window=5, forecast_every=0)
+    prices = [100, 102, 101, 105, 107, 110, 104]
+    hub.ingest({'X': prices[:3]})
+    result = hub.ingest({'X': prices[3:]}, [{'ticker': 'X', 'headline': 'X shares gain on record revenue'}])
+    assert result == {'ticks': 4, 'headlines': 1, 'tickers': 1}
+    snapshot = hub.snapshot('X')
+    assert snapshot['ticks'] == len(prices) and snapshot['price'] == 104
+    assert snapshot['risk'] == RollingRisk(5).extend(prices)
+    assert snapshot['sentiment']['headlines'] == 1 and snapshot['sentiment']['mean'] > 0
+    with pytest.raises(ValueError):
+        hub.ingest({'X': [100, float('nan')]})
+
+def test_slow_subscriber_gets_coalesced_snapshots():
+    hub = StreamHub(forecast_every=0)
+    subscriber = hub.subscribe(['A', 'B'])
+    for i in range(100):
+        hub.ingest({'A': [100 + i], 'B': [50 + i], 'C': [1 + i]})
+    updates = subscriber.get(timeout=1)
+    assert sorted(u['ticker'] for u in updates) == ['A', 'B']
+    assert all(u['ticks'] == 100 for u in updates)
+    assert subscriber.coalesced == 198
+    hub.record_delivery(updates)
+    hub.unsubscribe(subscriber)
+    stats = hub.stats()
+    assert stats['ticks'] == 300 and stats['delivered'] == 2 and stats['coalesced'] == 198
+    assert stats['subscribers'] == 0 and stats['lag_seconds']['max'] >= 0
+
+def test_closed_subscriber_returns_immediately():
+    subscriber = Subscriber()
+    subscriber.close()
+    assert subscriber.get(timeout=5) == []
+
+def test_forecasts_refresh_in_background():
+    hub = StreamHub(forecast_every=20, forecast_steps=3)
+    subscriber = hub.subscribe(['X'])
+    prices = 100 * np.cumprod(1 + np.random.default_rng(0).normal(0, 0.01, 60))
+    hub.ingest({'X': prices[:40]})
+    deadline = time.time() + 30
+    while hub.snapshot('X')['forecast'] is None and time.time() < deadline:
+        time.sleep(0.05)
+    snapshot = hub.snapshot('X')
+    assert len(snapshot['forecast']['values']) == 3 and snapshot['forecast_tick'] == 40
+    assert any(u['forecast'] for u in subscriber.get(timeout=1))
+
+def test_replay_source_feeds_hub():
+    hub = StreamHub(forecast_every=0)
+    source = ReplaySource(hub, n_assets=2, n_ticks=50, rate=0, batch=10, seed=1).start()
+    source._thread.join(10)
+    assert not source.running and source.sent == 50
+    assert hub.stats()['ticks'] == 100
+    assert hub.snapshot(source.assets[0])['ticks'] == 50
+    assert source.status()['error'] is None
+
+def test_replay_source_reports_ingest_errors():
+    hub = StreamHub(forecast_every=0, max_tickers=2)
+    assert hub.arima_states._states.maxsize == 2
+    source = ReplaySource(hub, n_assets=3, n_ticks=50, rate=0, batch=10, seed=1).start()
+    source._thread.join(10)
+    status = source.status()
+    assert not status['running'] and status['ticks_sent'] == 0
+    assert 'tickers' in status['error']
+
+def test_replay_source_rejects_invalid_settings():
+    hub = StreamHub(forecast_every=0)
+    for kwargs in ({'batch': 0}, {'rate': -1}, {'n_ticks': 0}):
+        with pytest.raises(ValueError):
+            ReplaySource(hub, **kwargs)
+
+def test_ticker_cap_and_empty_batches():
+    hub = StreamHub(forecast_every=0, max_tickers=2)
+    assert hub.ingest({'A': [100.0], 'B': []}) == {'ticks': 1, 'headlines': 0, 'tickers': 1}
+    assert hub.snapshot('B') is None
+    hub.ingest({'B': [50.0]})
+    with pytest.raises(ValueError):
+        hub.ingest({'A': [101.0], 'C': [10.0]})
+    assert hub.snapshot('A')['ticks'] == 1 and hub.stats()['tickers'] == 2
+    hub.ingest({'A': [101.0]})
@@ -1,5 +1,7 @@
-from backend.utils import setup_logging, log_event, validate_prices
+from backend.utils import setup_logging, shutdown_logging, log_event, validate_prices, truncate_payload, parse_sample_rates
+import json
 import os
+import numpy as np
 
 def test_setup_logging(tmp_path):
     logfile = tmp_path / 'test.log'
@@ -15,4 +17,32 @@ def test_log_event(tmp_path):
 def test_validate_prices():
     assert validate_prices([1, 2, 3.5])
     assert not validate_prices('not a list')
-    assert not validate_prices([1, 'a', 3]) 
\ No newline at end of file
+    assert not validate_prices([1, 'a', 3]) 
+
+def test_logging_pipeline_writes_json_lines(tmp_path):
+    logfile = tmp_path / 'events.log'
+    setup_logging(str(logfile), sample_rates={'Sampled out': 0.0})
+    log_event('Forecast performed', {'forecast': list(range(1000)), 'method': 'arima'})
+    log_event('Sampled out', {'foo': 'bar'})
+    shutdown_logging()
+    lines = [json.loads(line) for line in logfile.read_text().splitlines()]
+    assert [line['event'] for line in lines] == ['Forecast performed']
+    assert lines[0]['data']['method'] == 'arima'
+    assert len(lines[0]['data']['forecast']) == 21
+
+def test_logging_pipeline_rotates(tmp_path):
+    logfile = tmp_path / 'rotating.log'
+    setup_logging(str(logfile), max_bytes=500, backups=2)
+    for i in range(50):
+        log_event('Event', {'i': i})
+    shutdown_logging()
+    assert os.path.exists(str(logfile) + '.1')
+    assert not os.path.exists(str(logfile) + '.3')
+
+def test_truncate_payload():
+    payload = truncate_payload({'a': np.arange(100), 'b': 'x' * 500, 'c': np.float64(1.5)}, max_items=3, max_string=10)
+    assert payload['a'] == [0, 1, 2, '... (+97 items)']
+    assert payload['b'].startswith('x' * 10) and '+490 chars' in payload['b']
+    assert payload['c'] == 1.5
+    assert parse_sample_rates('Forecast performed=0.1, Risk metrics calculated=0.5') == {
+        'Forecast performed': 0.1, 'Risk metrics calculated': 0.5}